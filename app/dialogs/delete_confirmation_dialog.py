@@ -66,6 +66,12 @@ class DeleteConfirmationDialog(QDialog):
         items_label.setStyleSheet("font-weight: bold; margin: 5px;")
         scroll_layout.addWidget(items_label)
         
+        archived_count = self.deletion_info.get('archived_items', 0)
+        if archived_count > 0:
+            archived_label = QLabel(f"🗄️ De ellos archivados: {archived_count}")
+            archived_label.setStyleSheet("color: #666; margin-left: 20px;")
+            scroll_layout.addWidget(archived_label)
+        
         # Archivos de audio
         audio_count = self.deletion_info['audio_files_count']
         audio_label = QLabel(f"🎵 Archivos de audio: {audio_count}")
@@ -16,9 +16,14 @@ from app.widgets.data_source_widget import DataSourceWidget
 from app.widgets.content_list_widget import ContentListWidget
 from app.widgets.audio_player_widget import AudioPlayerWidget
 from models.database import DatabaseManager
+from models.content_repository import content_repository
+from models.query_profiler import query_profiler
+from services.database_maintenance import DatabaseMaintenance
+from services.feed_refresher import FeedRefresher
 from services.rss_manager import RSSManager
 from utils.config import config_manager
 from utils.logger import get_logger
+from utils.trash_reclaimer import trash_reclaimer
 
 logger = get_logger(__name__)
 
@@ -28,76 +33,54 @@ class FeedUpdateThread(QThread):
     progress_updated = Signal(int, str)
     update_finished = Signal(bool, str)
     
-    def __init__(self):
+    def __init__(self, due_only: bool = False):
         super().__init__()
+        # due_only: solo las fuentes cuya próxima consulta planificada ya llegó
+        self.due_only = due_only
         self.db_manager = DatabaseManager()
         self.rss_manager = RSSManager()
+        self.refresher = FeedRefresher(self.db_manager, self.rss_manager)
+    
+    def cancel(self):
+        """Deja de lanzar fuentes nuevas; las descargas en curso terminan"""
+        self.refresher.cancel()
     
     def run(self):
-        """Actualiza todos los feeds RSS"""
+        """Actualiza todos los feeds RSS de forma concurrente"""
         try:
-            sources = self.db_manager.get_data_sources()
+            if self.due_only:
+                sources = self.db_manager.get_due_sources()
+            else:
+                sources = self.db_manager.get_data_sources()
             total_sources = len(sources)
             
             if total_sources == 0:
-                self.update_finished.emit(True, "No hay fuentes para actualizar")
+                if self.due_only:
+                    self.update_finished.emit(True, "No hay fuentes pendientes de consulta")
+                else:
+                    self.update_finished.emit(True, "No hay fuentes para actualizar")
                 return
             
-            updated_count = 0
-            new_items_count = 0
+            self.progress_updated.emit(0, f"Actualizando {total_sources} fuentes...")
             
-            for i, source in enumerate(sources):
-                source_id = source['id']
-                source_name = source['name']
-                source_type = source['type']
-                source_url = source['url']
-                
-                progress = int((i / total_sources) * 100)
-                self.progress_updated.emit(progress, f"Actualizando {source_name}...")
-                
-                try:
-                    if source_type in ['youtube', 'rss']:
-                        # Obtener URL de RSS si es YouTube
-                        if source_type == 'youtube':
-                            rss_url = self.rss_manager.get_youtube_rss_url(source_url)
-                        else:
-                            rss_url = source_url
-                        
-                        # Parsear feed
-                        feed_data = self.rss_manager.parse_feed(rss_url)
-                        
-                        # Añadir nuevos items
-                        for entry in feed_data['entries']:
-                            try:
-                                item_id = self.db_manager.add_content_item(
-                                    source_id=source_id,
-                                    title=entry['title'],
-                                    url=entry['url'],
-                                    description=entry['description'],
-                                    published_date=entry['published_date']
-                                )
-                                if item_id:
-                                    new_items_count += 1
-                            except Exception:
-                                # Item ya existe, continuar
-                                pass
-                        
-                        updated_count += 1
-                        
-                    elif source_type == 'web':
-                        # Para páginas web individuales, verificar si cambió
-                        # TODO: Implementar detección de cambios en páginas web
-                        pass
-                        
-                except Exception as e:
-                    logger.error(f"Error actualizando fuente {source_name}: {e}")
-                    continue
+            def on_progress(completed: int, total: int, source_name: str, error: Optional[str]):
+                progress = int((completed / total) * 100)
+                if error:
+                    self.progress_updated.emit(progress, f"Error en {source_name} ({completed}/{total})")
+                else:
+                    self.progress_updated.emit(progress, f"Actualizado {source_name} ({completed}/{total})")
+            
+            summary = self.refresher.refresh_all(sources, progress_callback=on_progress)
             
             self.progress_updated.emit(100, "Actualización completada")
             
             message = f"Actualización completada.\n"
-            message += f"Fuentes actualizadas: {updated_count}/{total_sources}\n"
-            message += f"Nuevos elementos: {new_items_count}"
+            message += f"Fuentes actualizadas: {summary['updated']}/{total_sources}\n"
+            message += f"Nuevos elementos: {summary['new_items']}"
+            if summary['not_modified']:
+                message += f"\nFuentes sin cambios: {summary['not_modified']}"
+            if summary['errors']:
+                message += f"\nFuentes con errores: {len(summary['errors'])}"
             
             self.update_finished.emit(True, message)
             
@@ -165,6 +148,13 @@ class MainWindow(QMainWindow):
         self.current_source_id = None
         self.feed_update_thread = None
         
+        # Copias de seguridad, optimización y retención en segundo plano
+        self.db_maintenance = DatabaseMaintenance(self.db_manager)
+        self.db_maintenance.start()
+        
+        # Borrado en segundo plano de los audios descartados (y de lo pendiente)
+        trash_reclaimer.start()
+        
         self.setup_ui()
         self.setup_menu()
         self.setup_status_bar()
@@ -264,14 +254,15 @@ class MainWindow(QMainWindow):
     
     def setup_timers(self):
         """Configura timers para actualizaciones automáticas"""
-        # Timer para actualización automática de feeds
+        # Timer para actualización automática de feeds: en cada tick solo se
+        # consultan las fuentes cuya próxima consulta planificada ya llegó
         if config_manager.get('ui.auto_refresh', True):
             self.auto_refresh_timer = QTimer()
-            self.auto_refresh_timer.timeout.connect(self.update_all_feeds)
+            self.auto_refresh_timer.timeout.connect(self.update_due_feeds)
             
             # Intervalo en minutos
-            interval_minutes = config_manager.get('ui.refresh_interval_minutes', 60)
-            self.auto_refresh_timer.start(interval_minutes * 60 * 1000)
+            tick_minutes = config_manager.get('ui.scheduler_tick_minutes', 5)
+            self.auto_refresh_timer.start(int(tick_minutes * 60 * 1000))
     
     def connect_signals(self):
         """Conecta señales entre widgets"""
@@ -309,21 +300,15 @@ class MainWindow(QMainWindow):
     def on_item_selected(self, item_id: int):
         """Maneja la selección de un item de contenido"""
         try:
-            # Obtener información del item
-            items = self.db_manager.get_content_items()
-            selected_item = None
-            
-            for item in items:
-                if item['id'] == item_id:
-                    selected_item = item
-                    break
+            # Obtener el item (caché o búsqueda indexada por id)
+            selected_item = content_repository.get(item_id)
             
-            if selected_item and selected_item['audio_file']:
-                audio_file = selected_item['audio_file']
+            if selected_item and selected_item.audio_file:
+                audio_file = selected_item.audio_file
                 if Path(audio_file).exists():
                     # Cargar en el reproductor
-                    if self.audio_player_widget.load_audio_file(audio_file, selected_item['title']):
-                        self.status_bar.showMessage(f"Audio cargado: {selected_item['title']}")
+                    if self.audio_player_widget.load_audio_file(audio_file, selected_item.title):
+                        self.status_bar.showMessage(f"Audio cargado: {selected_item.title}")
                     else:
                         self.status_bar.showMessage("Error cargando audio")
                 else:
@@ -349,12 +334,22 @@ class MainWindow(QMainWindow):
         
         # Iniciar actualización en hilo separado
         self.feed_update_thread = FeedUpdateThread()
+        self.progress_dialog.canceled.connect(self.feed_update_thread.cancel)
         self.feed_update_thread.progress_updated.connect(self.on_update_progress)
         self.feed_update_thread.update_finished.connect(self.on_update_finished)
         self.feed_update_thread.start()
         
         self.feeds_status_label.setText("Feeds: Actualizando...")
     
+    def update_due_feeds(self):
+        """Actualiza en segundo plano las fuentes pendientes, sin diálogos"""
+        if self.feed_update_thread and self.feed_update_thread.isRunning():
+            return
+        
+        self.feed_update_thread = FeedUpdateThread(due_only=True)
+        self.feed_update_thread.update_finished.connect(self.on_update_finished)
+        self.feed_update_thread.start()
+    
     def on_update_progress(self, progress: int, message: str):
         """Actualiza progreso de actualización"""
         if hasattr(self, 'progress_dialog'):
@@ -366,14 +361,26 @@ class MainWindow(QMainWindow):
         if hasattr(self, 'progress_dialog'):
             self.progress_dialog.close()
         
+        # Las actualizaciones planificadas solo informan en la barra de estado
+        if self.feed_update_thread and self.feed_update_thread.due_only:
+            if success:
+                self.data_source_widget.apply_changes()
+                if self.current_source_id:
+                    self.content_list_widget.apply_changes()
+                self.status_bar.showMessage(message.replace("\n", " "))
+            else:
+                logger.error(f"Error en la actualización planificada: {message}")
+                self.feeds_status_label.setText("Feeds: Error")
+            return
+        
         if success:
             self.feeds_status_label.setText("Feeds: Actualizados")
             self.status_bar.showMessage("Feeds actualizados correctamente")
             
-            # Refrescar widgets
-            self.data_source_widget.refresh_sources()
+            # Refrescar widgets aplicando solo los cambios
+            self.data_source_widget.apply_changes()
             if self.current_source_id:
-                self.content_list_widget.load_content_items()
+                self.content_list_widget.apply_changes()
             
             # Mostrar resumen si hay nuevos items
             if "Nuevos elementos:" in message:
@@ -392,18 +399,13 @@ class MainWindow(QMainWindow):
         """Muestra estadísticas de la base de datos"""
         try:
             sources = self.db_manager.get_data_sources()
-            all_items = self.db_manager.get_content_items()
-            
-            # Contar por estado
-            status_counts = {}
-            for item in all_items:
-                status = item['status']
-                status_counts[status] = status_counts.get(status, 0) + 1
+            stats = self.db_manager.get_content_stats()
+            status_counts = stats['by_status']
             
             stats_text = f"""Estadísticas de PyPodcast:
 
 Fuentes de datos: {len(sources)}
-Total de elementos: {len(all_items)}
+Total de elementos: {stats['total']}
 
 Por estado:
 • Nuevos: {status_counts.get('nuevo', 0)}
@@ -434,9 +436,17 @@ Por estado:
                 self.feed_update_thread.terminate()
                 self.feed_update_thread.wait(3000)  # Esperar máximo 3 segundos
             
-            # Limpiar reproductor de audio
+            # Limpiar reproductor de audio y cancelar lecturas en curso
             self.audio_player_widget.cleanup()
-            
+            self.content_list_widget.cancel_queries()
+
+            # Detener el mantenimiento y cerrar conexiones del pool de base de datos
+            self.db_maintenance.stop()
+            trash_reclaimer.stop()
+            self.db_manager.close_connections()
+            if query_profiler.enabled:
+                logger.info(f"Latencia de la base de datos:\n{query_profiler.dump()}")
+
             # Guardar configuración de ventana
             config_manager.set('ui.window_width', self.width())
             config_manager.set('ui.window_height', self.height())
@@ -5,19 +5,26 @@ Widget de lista de items de contenido
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget,
                               QListWidgetItem, QLabel, QPushButton, QFrame,
                               QComboBox, QLineEdit, QTextEdit, QMessageBox,
-                              QProgressBar, QMenu)
+                              QProgressBar, QMenu, QCheckBox, QAbstractItemView)
 from PySide6.QtCore import Qt, Signal, QThread, QTimer
 from PySide6.QtGui import QPixmap, QIcon, QAction
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 import os
+import threading
 from pathlib import Path
 
-from models.database import DatabaseManager
+from models.database import DatabaseManager, QueryCancelled
 from models.content_item import ContentItem
+from models.content_repository import content_repository
+from utils.config import config_manager
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Estados de un item con su nombre para mostrar
+STATUS_CHOICES = [('nuevo', 'Nuevo'), ('procesado', 'Procesado'),
+                  ('escuchado', 'Escuchado'), ('ignorar', 'Ignorar')]
+
 class ContentItemWidget(QFrame):
     """Widget para mostrar un item de contenido"""
     
@@ -181,8 +188,7 @@ class ContentItemWidget(QFrame):
         # Cambiar estado
         status_menu = menu.addMenu("Cambiar estado")
         
-        for status, display in [('nuevo', 'Nuevo'), ('procesado', 'Procesado'), 
-                               ('escuchado', 'Escuchado'), ('ignorar', 'Ignorar')]:
+        for status, display in STATUS_CHOICES:
             if status != self.content_item.status:
                 action = QAction(display, self)
                 action.triggered.connect(lambda checked, s=status: self.action_requested.emit(self.content_item.id, f'status_{s}'))
@@ -234,8 +240,10 @@ class ContentProcessorThread(QThread):
             
             self.progress_updated.emit(50, "Generando resumen...")
             
-            # Actualizar resumen en base de datos
-            db_manager.update_content_item_files(self.content_item.id, summary=content_text)
+            # Actualizar resumen en base de datos (sin esperar: se agrupa con el resto)
+            pending_writes = [
+                db_manager.update_content_item_files(self.content_item.id, summary=content_text, wait=False)
+            ]
             
             self.progress_updated.emit(70, "Generando audio...")
             
@@ -250,8 +258,12 @@ class ContentProcessorThread(QThread):
             self.progress_updated.emit(90, "Finalizando...")
             
             # Actualizar archivo de audio y estado
-            db_manager.update_content_item_files(self.content_item.id, audio_file=audio_file)
-            db_manager.update_content_item_status(self.content_item.id, 'procesado')
+            pending_writes.append(
+                db_manager.update_content_item_files(self.content_item.id, audio_file=audio_file, wait=False)
+            )
+            pending_writes.append(
+                db_manager.update_content_item_status(self.content_item.id, 'procesado', wait=False)
+            )
             
             # Log de procesamiento
             db_manager.log_processing_action(
@@ -261,6 +273,10 @@ class ContentProcessorThread(QThread):
                 'Contenido procesado correctamente'
             )
             
+            # Esperar a que el escritor confirme antes de avisar a la interfaz
+            for future in pending_writes:
+                future.result()
+            
             self.progress_updated.emit(100, "Completado")
             self.processing_finished.emit(self.content_item.id, True, "Procesamiento completado")
             
@@ -281,6 +297,36 @@ class ContentProcessorThread(QThread):
             
             self.processing_finished.emit(self.content_item.id, False, str(e))
 
+class ContentQueryThread(QThread):
+    """Hilo que ejecuta una lectura de la lista y se cancela si queda obsoleta"""
+    
+    results_ready = Signal(object)
+    
+    def __init__(self, kind: str, query: Callable[[], Any], on_result: Callable[[Any], None]):
+        super().__init__()
+        self.kind = kind
+        self.query = query
+        self.on_result = on_result
+        self.cancel_event = threading.Event()
+    
+    def cancel(self):
+        """Interrumpe la consulta en curso; su resultado se descarta"""
+        self.cancel_event.set()
+    
+    def run(self):
+        """Ejecuta la consulta con lecturas cancelables"""
+        try:
+            with DatabaseManager.cancellable_reads(self.cancel_event):
+                result = self.query()
+        except QueryCancelled:
+            return
+        except Exception as e:
+            logger.error(f"Error en consulta de la lista de contenido: {e}")
+            return
+        
+        if not self.cancel_event.is_set():
+            self.results_ready.emit(result)
+
 class ContentListWidget(QWidget):
     """Widget principal para la lista de contenido"""
     
@@ -291,7 +337,14 @@ class ContentListWidget(QWidget):
         self.db_manager = DatabaseManager()
         self.current_source_id = None
         self.content_items = []
+        self.next_cursor = None
+        self.search_results = None
+        self.change_version = 0
+        self.page_size = config_manager.get('ui.page_size', 100)
         self.processing_threads = {}
+        # Consulta vigente de cada tipo ('list', 'search') y todas las que siguen vivas
+        self.current_queries = {}
+        self.query_threads = set()
         self.setup_ui()
     
     def setup_ui(self):
@@ -315,7 +368,7 @@ class ContentListWidget(QWidget):
         
         self.status_filter = QComboBox()
         self.status_filter.addItems(["Todos", "Nuevo", "Procesado", "Escuchado", "Ignorar"])
-        self.status_filter.currentTextChanged.connect(self.apply_filters)
+        self.status_filter.currentTextChanged.connect(self.load_content_items)
         filters_layout.addWidget(self.status_filter)
         
         filters_layout.addStretch()
@@ -325,10 +378,21 @@ class ContentListWidget(QWidget):
         filters_layout.addWidget(search_label)
         
         self.search_edit = QLineEdit()
-        self.search_edit.setPlaceholderText("Título, descripción...")
-        self.search_edit.textChanged.connect(self.apply_filters)
+        self.search_edit.setPlaceholderText("Título, descripción, contenido...")
+        self.search_edit.textChanged.connect(self.on_search_text_changed)
         filters_layout.addWidget(self.search_edit)
         
+        self.search_all_checkbox = QCheckBox("Toda la biblioteca")
+        self.search_all_checkbox.setToolTip("Buscar en todas las fuentes, no solo en la seleccionada")
+        self.search_all_checkbox.toggled.connect(self.run_search)
+        filters_layout.addWidget(self.search_all_checkbox)
+        
+        # Retardo para no lanzar una búsqueda en cada pulsación
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.run_search)
+        
         header_layout.addLayout(filters_layout)
         layout.addLayout(header_layout)
         
@@ -345,8 +409,16 @@ class ContentListWidget(QWidget):
                 padding: 2px;
             }
         """)
+        # Selección múltiple para cambiar el estado de varios items a la vez
+        self.content_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
         layout.addWidget(self.content_list)
         
+        # Carga de la siguiente página del listado
+        self.load_more_button = QPushButton("Cargar más")
+        self.load_more_button.setVisible(False)
+        self.load_more_button.clicked.connect(self.load_more_items)
+        layout.addWidget(self.load_more_button)
+        
         # Barra de progreso para procesamiento
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -359,6 +431,16 @@ class ContentListWidget(QWidget):
         self.process_all_button.clicked.connect(self.process_all_new)
         actions_layout.addWidget(self.process_all_button)
         
+        # Cambio de estado de todos los items visibles en una sola escritura
+        self.mark_all_button = QPushButton("Marcar todos como")
+        mark_all_menu = QMenu(self.mark_all_button)
+        for status, display in STATUS_CHOICES:
+            action = QAction(display, self)
+            action.triggered.connect(lambda checked, s=status: self.mark_all(s))
+            mark_all_menu.addAction(action)
+        self.mark_all_button.setMenu(mark_all_menu)
+        actions_layout.addWidget(self.mark_all_button)
+        
         actions_layout.addStretch()
         
         refresh_button = QPushButton("Actualizar")
@@ -373,74 +455,296 @@ class ContentListWidget(QWidget):
         self.current_source_id = source_id
         self.load_content_items()
     
+    def _start_query(self, kind: str, query: Callable[[], Any], on_result: Callable[[Any], None]):
+        """Lanza una lectura en segundo plano cancelando la anterior del mismo tipo
+        
+        Las lecturas usan conexiones de solo lectura (no esperan a los
+        escritores) y la que queda obsoleta se interrumpe en SQLite.
+        """
+        previous = self.current_queries.get(kind)
+        if previous is not None:
+            previous.cancel()
+        
+        thread = ContentQueryThread(kind, query, on_result)
+        self.current_queries[kind] = thread
+        self.query_threads.add(thread)
+        thread.results_ready.connect(self._on_query_result)
+        thread.finished.connect(self._on_query_finished)
+        thread.start()
+    
+    def _on_query_result(self, result: Any):
+        """Aplica el resultado de una lectura si sigue siendo la vigente"""
+        thread = self.sender()
+        if self.current_queries.get(thread.kind) is not thread or thread.cancel_event.is_set():
+            return
+        try:
+            thread.on_result(result)
+        except Exception as e:
+            logger.error(f"Error mostrando resultados de la lista de contenido: {e}")
+    
+    def _on_query_finished(self):
+        """Olvida un hilo de lectura terminado y programa su destrucción"""
+        thread = self.sender()
+        self.query_threads.discard(thread)
+        if self.current_queries.get(thread.kind) is thread:
+            del self.current_queries[thread.kind]
+        thread.deleteLater()
+    
+    def cancel_queries(self, timeout_ms: int = 1000):
+        """Cancela las lecturas en curso y espera a que terminen sus hilos"""
+        for thread in list(self.query_threads):
+            thread.cancel()
+        for thread in list(self.query_threads):
+            thread.wait(timeout_ms)
+        self.current_queries.clear()
+    
     def load_content_items(self):
-        """Carga los items de contenido"""
+        """Carga la primera página de items de contenido"""
         if not self.current_source_id:
             return
         
-        try:
-            items_data = self.db_manager.get_content_items(source_id=self.current_source_id)
-            self.content_items = []
-            
-            for item_data in items_data:
-                content_item = ContentItem(
-                    id=item_data['id'],
-                    source_id=item_data['source_id'],
-                    title=item_data['title'],
-                    url=item_data['url'],
-                    description=item_data['description'],
-                    content=item_data['content'],
-                    summary=item_data['summary'],
-                    audio_file=item_data['audio_file'],
-                    thumbnail_url=item_data['thumbnail_url'],
-                    status=item_data['status'],
-                    source_name=item_data['source_name'],
-                    source_type=item_data['source_type']
+        db_manager = self.db_manager
+        source_id = self.current_source_id
+        status = self._get_status_filter()
+        limit = self.page_size
+        
+        def query():
+            # Versión y página de la misma instantánea: los cambios posteriores se aplican después
+            with db_manager.read_snapshot():
+                version = db_manager.get_change_version()
+                page = db_manager.get_content_list(
+                    source_id=source_id, status=status, limit=limit, as_items=True
                 )
-                self.content_items.append(content_item)
-            
+            ContentItem.check_audio_files(page['items'])
+            return version, page
+        
+        self._start_query('list', query, self._on_content_loaded)
+    
+    def _on_content_loaded(self, result):
+        """Muestra la primera página cargada"""
+        self.change_version, page = result
+        self.content_items = page['items']
+        self.next_cursor = page['next_cursor']
+        
+        # Mantener la búsqueda activa al cambiar de fuente o de estado
+        if self.search_edit.text().strip():
+            self.run_search()
+        else:
             self.apply_filters()
-            
-            # Actualizar título
-            source_name = items_data[0]['source_name'] if items_data else "Fuente"
-            self.title_label.setText(f"Contenido - {source_name}")
-            
-        except Exception as e:
-            logger.error(f"Error cargando items de contenido: {e}")
+        
+        # Actualizar título
+        source_name = self.content_items[0].source_name if self.content_items else "Fuente"
+        self.title_label.setText(f"Contenido - {source_name}")
+    
+    def load_more_items(self):
+        """Carga la siguiente página de items usando el cursor actual"""
+        # Con una carga en curso el cursor actual ya no es válido
+        if not self.current_source_id or self.next_cursor is None or 'list' in self.current_queries:
+            return
+        
+        db_manager = self.db_manager
+        source_id = self.current_source_id
+        status = self._get_status_filter()
+        limit = self.page_size
+        cursor = self.next_cursor
+        
+        def query():
+            page = db_manager.get_content_list(
+                source_id=source_id, status=status, limit=limit, cursor=cursor, as_items=True
+            )
+            ContentItem.check_audio_files(page['items'])
+            return page
+        
+        self._start_query('list', query, self._on_more_loaded)
+    
+    def _on_more_loaded(self, page):
+        """Añade la página siguiente a la lista"""
+        self.content_items.extend(page['items'])
+        self.next_cursor = page['next_cursor']
+        self.apply_filters()
+    
+    def _get_status_filter(self) -> Optional[str]:
+        """Obtiene el estado seleccionado en el filtro (None si son todos)"""
+        status_filter = self.status_filter.currentText().lower()
+        return None if status_filter == "todos" else status_filter
+    
+    def _build_list_item(self, item_data: Dict[str, Any]) -> ContentItem:
+        """Crea un ContentItem a partir de una fila del listado (sin texto completo)"""
+        return ContentItem.from_dict(item_data)
+    
+    def _get_full_item(self, item_id: int) -> Optional[ContentItem]:
+        """Obtiene un item con su contenido y resumen completos"""
+        return content_repository.get(item_id)
+    
+    def on_search_text_changed(self, text: str):
+        """Programa la búsqueda tras una breve pausa en la escritura"""
+        self.search_timer.start()
+    
+    def run_search(self):
+        """Busca en el índice de texto completo de la base de datos"""
+        search_text = self.search_edit.text().strip()
+        
+        if not search_text:
+            previous = self.current_queries.get('search')
+            if previous is not None:
+                previous.cancel()
+            self.search_results = None
+            self.apply_filters()
+            return
+        
+        source_id = None if self.search_all_checkbox.isChecked() else self.current_source_id
+        if not source_id and not self.search_all_checkbox.isChecked():
+            return
+        
+        db_manager = self.db_manager
+        status = self._get_status_filter()
+        limit = self.page_size
+        
+        def query():
+            items = []
+            for result in db_manager.search(search_text, source_id=source_id, status=status, limit=limit):
+                item = self._build_list_item(result)
+                # Mostrar el fragmento con las coincidencias en lugar de la descripción
+                item.description = result['snippet']
+                items.append(item)
+            ContentItem.check_audio_files(items)
+            return items
+        
+        self._start_query('search', query, self._on_search_finished)
+    
+    def _on_search_finished(self, items: List[ContentItem]):
+        """Muestra los resultados de la búsqueda"""
+        # La búsqueda se pudo vaciar mientras se ejecutaba
+        if not self.search_edit.text().strip():
+            return
+        self.search_results = items
+        self.apply_filters()
     
     def apply_filters(self):
-        """Aplica filtros a la lista"""
+        """Muestra los items cargados o los resultados de la búsqueda actual"""
         self.content_list.clear()
         
-        status_filter = self.status_filter.currentText().lower()
-        search_text = self.search_edit.text().lower()
+        searching = self.search_results is not None
+        visible_items = self.search_results if searching else self.content_items
         
-        filtered_items = []
+        # Añadir items a la lista
+        for item in visible_items:
+            self._insert_row(self.content_list.count(), item)
         
-        for item in self.content_items:
-            # Filtro por estado
-            if status_filter != "todos" and item.status != status_filter:
-                continue
+        self.load_more_button.setVisible(not searching and self.next_cursor is not None)
+    
+    def _create_item_widget(self, item: ContentItem) -> ContentItemWidget:
+        """Crea el widget de una fila con sus señales conectadas"""
+        item_widget = ContentItemWidget(item)
+        item_widget.clicked.connect(self.on_item_clicked)
+        item_widget.double_clicked.connect(self.edit_item_content)
+        item_widget.action_requested.connect(self.handle_item_action)
+        return item_widget
+    
+    def _insert_row(self, index: int, item: ContentItem):
+        """Inserta la fila de un item en la posición indicada de la lista"""
+        item_widget = self._create_item_widget(item)
+        list_item = QListWidgetItem()
+        list_item.setSizeHint(item_widget.sizeHint())
+        self.content_list.insertItem(index, list_item)
+        self.content_list.setItemWidget(list_item, item_widget)
+    
+    def apply_changes(self):
+        """Aplica a la lista solo las filas insertadas, modificadas o eliminadas
+        
+        Lee el registro de cambios desde la última versión vista; si se ha
+        recortado o hay demasiados cambios, recarga la lista completa.
+        """
+        # Una carga en curso ya incluirá los cambios
+        if not self.current_source_id or 'list' in self.current_queries:
+            return
+        
+        try:
+            changes = self.db_manager.get_changes_since(self.change_version)
+            if changes['reset']:
+                self.load_content_items()
+                return
             
-            # Filtro por búsqueda
-            if search_text:
-                searchable_text = f"{item.title} {item.description or ''}".lower()
-                if search_text not in searchable_text:
-                    continue
+            self.change_version = changes['version']
+            item_changes = changes['content_items']
+            if not item_changes:
+                return
             
-            filtered_items.append(item)
-        
-        # Añadir items filtrados a la lista
-        for item in filtered_items:
-            item_widget = ContentItemWidget(item)
-            item_widget.clicked.connect(self.on_item_clicked)
-            item_widget.double_clicked.connect(self.edit_item_content)
-            item_widget.action_requested.connect(self.handle_item_action)
+            removed = {item_id for item_id, op in item_changes.items() if op == 'delete'}
+            upserted_ids = [item_id for item_id, op in item_changes.items() if op == 'upsert']
+            items = self.db_manager.get_content_list_items(upserted_ids, as_items=True)
             
-            list_item = QListWidgetItem()
-            list_item.setSizeHint(item_widget.sizeHint())
-            self.content_list.addItem(list_item)
-            self.content_list.setItemWidget(list_item, item_widget)
+            # Filas que ya no existen o no cumplen los filtros actuales
+            removed.update(set(upserted_ids) - {item.id for item in items})
+            status_filter = self._get_status_filter()
+            for item in items:
+                if item.source_id != self.current_source_id or \
+                        (status_filter and item.status != status_filter):
+                    removed.add(item.id)
+            
+            # Durante una búsqueda la lista muestra sus resultados: los cambios
+            # se aplican solo a los items cargados (visibles al quitar la
+            # búsqueda) y la búsqueda se repite, porque depende del ranking
+            searching = self.search_results is not None
+            for item_id in removed:
+                self._remove_row(item_id, update_rows=not searching)
+            items = [item for item in items if item.id not in removed]
+            ContentItem.check_audio_files(items)
+            for item in items:
+                self._upsert_row(item, update_rows=not searching)
+            if searching:
+                self.run_search()
+            
+        except Exception as e:
+            logger.error(f"Error aplicando cambios a la lista de contenido: {e}")
+    
+    @staticmethod
+    def _sort_key(item: ContentItem):
+        """Clave del orden del listado (fecha descendente con los NULL al final, id)"""
+        return (item.published_ts is not None, item.published_ts or 0, item.id)
+    
+    def _remove_row(self, item_id: int, update_rows: bool = True):
+        """Quita un item de los cargados (y su fila si ``update_rows``)"""
+        for index, content_item in enumerate(self.content_items):
+            if content_item.id == item_id:
+                del self.content_items[index]
+                if update_rows:
+                    self.content_list.takeItem(index)
+                return
+    
+    def _upsert_row(self, item: ContentItem, update_rows: bool = True):
+        """Actualiza un item cargado o lo inserta en su posición (con su fila si ``update_rows``)"""
+        for index, content_item in enumerate(self.content_items):
+            if content_item.id == item.id:
+                self.content_items[index] = item
+                if not update_rows:
+                    return
+                list_item = self.content_list.item(index)
+                item_widget = self._create_item_widget(item)
+                list_item.setSizeHint(item_widget.sizeHint())
+                self.content_list.setItemWidget(list_item, item_widget)
+                return
+        
+        key = self._sort_key(item)
+        index = next(
+            (i for i, content_item in enumerate(self.content_items) if self._sort_key(content_item) < key),
+            len(self.content_items)
+        )
+        
+        # Más allá de la última página cargada: llegará con "Cargar más"
+        if index == len(self.content_items) and self.next_cursor is not None:
+            return
+        
+        self.content_items.insert(index, item)
+        if update_rows:
+            self._insert_row(index, item)
+    
+    def _find_item(self, item_id: int) -> Optional[ContentItem]:
+        """Busca un item entre los cargados y los resultados de búsqueda"""
+        for content_item in self.content_items + (self.search_results or []):
+            if content_item.id == item_id:
+                return content_item
+        return None
     
     def on_item_clicked(self, item_id: int):
         """Maneja el click en un item"""
@@ -465,12 +769,7 @@ class ContentListWidget(QWidget):
     
     def process_item(self, item_id: int):
         """Procesa un item individual"""
-        # Buscar el item
-        item = None
-        for content_item in self.content_items:
-            if content_item.id == item_id:
-                item = content_item
-                break
+        item = self._find_item(item_id)
         
         if not item:
             return
@@ -507,12 +806,8 @@ class ContentListWidget(QWidget):
     
     def edit_item_content(self, item_id: int):
         """Abre el diálogo de edición de contenido"""
-        # Buscar el item
-        item = None
-        for content_item in self.content_items:
-            if content_item.id == item_id:
-                item = content_item
-                break
+        # Obtener el item con su texto completo
+        item = self._get_full_item(item_id)
         
         if not item:
             QMessageBox.warning(self, "Error", "Item no encontrado")
@@ -527,12 +822,8 @@ class ContentListWidget(QWidget):
     
     def analyze_item_content(self, item_id: int):
         """Abre el diálogo de análisis de contenido"""
-        # Buscar el item
-        item = None
-        for content_item in self.content_items:
-            if content_item.id == item_id:
-                item = content_item
-                break
+        # Obtener el item con su texto completo
+        item = self._get_full_item(item_id)
         
         if not item:
             QMessageBox.warning(self, "Error", "Item no encontrado")
@@ -553,17 +844,63 @@ class ContentListWidget(QWidget):
     
     def on_content_updated(self, item_id: int):
         """Se ejecuta cuando se actualiza el contenido de un item"""
-        # Recargar la lista para reflejar cambios
-        self.load_content_items()
+        # Aplicar solo las filas modificadas
+        self.apply_changes()
     
     def change_item_status(self, item_id: int, new_status: str):
-        """Cambia el estado de un item"""
+        """Cambia el estado de un item, o de toda la selección si el item está en ella"""
         try:
-            self.db_manager.update_content_item_status(item_id, new_status)
-            self.load_content_items()
+            selected_ids = self._selected_item_ids()
+            item_ids = selected_ids if item_id in selected_ids else [item_id]
+            self.db_manager.update_status_by_ids(item_ids, new_status)
+            self.apply_changes()
         except Exception as e:
             logger.error(f"Error cambiando estado: {e}")
     
+    def _selected_item_ids(self) -> List[int]:
+        """Ids de los items seleccionados en la lista"""
+        visible_items = self.search_results if self.search_results is not None else self.content_items
+        rows = sorted(self.content_list.row(list_item) for list_item in self.content_list.selectedItems())
+        return [visible_items[row].id for row in rows if 0 <= row < len(visible_items)]
+    
+    def mark_all(self, new_status: str):
+        """Cambia el estado de todos los items de la vista actual con un único UPDATE
+        
+        Sin búsqueda se aplica a todos los items de la fuente que cumplen el
+        filtro de estado (también los de páginas aún no cargadas); con una
+        búsqueda activa, a sus resultados.
+        """
+        if not self.current_source_id:
+            return
+        
+        searching = self.search_results is not None
+        status_display = dict(STATUS_CHOICES)[new_status]
+        target = f"los {len(self.search_results)} resultados de la búsqueda" if searching \
+            else "todos los items de la fuente que cumplen el filtro"
+        
+        reply = QMessageBox.question(self, "Confirmar",
+            f"¿Marcar {target} como '{status_display}'?",
+            QMessageBox.Yes | QMessageBox.No)
+        if reply != QMessageBox.Yes:
+            return
+        
+        try:
+            if searching:
+                changed = self.db_manager.update_status_by_ids(
+                    [item.id for item in self.search_results], new_status
+                )
+            else:
+                changed = self.db_manager.update_status_by_filter(
+                    new_status,
+                    source_id=self.current_source_id,
+                    current_status=self._get_status_filter()
+                )
+            logger.info(f"{changed} items marcados como '{new_status}'")
+            self.apply_changes()
+        except Exception as e:
+            logger.error(f"Error marcando items: {e}")
+            QMessageBox.critical(self, "Error", f"Error cambiando el estado: {str(e)}")
+    
     def on_processing_progress(self, progress: int, message: str):
         """Actualiza progreso de procesamiento"""
         self.progress_bar.setValue(progress)
@@ -578,7 +915,7 @@ class ContentListWidget(QWidget):
             self.progress_bar.setVisible(False)
         
         if success:
-            self.load_content_items()
+            self.apply_changes()
         else:
             QMessageBox.warning(self, "Error de Procesamiento", message)
     
@@ -5,7 +5,7 @@ Widget de lista de fuentes de datos
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget, 
                               QListWidgetItem, QLabel, QPushButton, QFrame,
                               QDialog, QFormLayout, QLineEdit, QComboBox,
-                              QTextEdit, QMessageBox)
+                              QTextEdit, QMessageBox, QProgressDialog)
 from PySide6.QtCore import Qt, Signal, QThread
 from PySide6.QtGui import QPixmap, QIcon
 import requests
@@ -17,10 +17,46 @@ from models.data_source import DataSource
 from services.rss_manager import RSSManager
 from utils.logger import get_logger
 from utils.file_manager import FileManager
+from utils.trash_reclaimer import trash_reclaimer
 from app.dialogs.delete_confirmation_dialog import DeleteConfirmationDialog
 
 logger = get_logger(__name__)
 
+class SourceDeletionThread(QThread):
+    """Hilo que elimina una fuente por lotes sin bloquear la interfaz"""
+    
+    progress_updated = Signal(int, int)  # deleted, total
+    deletion_finished = Signal(int, bool)  # source_id, success
+    
+    def __init__(self, source_id: int):
+        super().__init__()
+        self.source_id = source_id
+    
+    def run(self):
+        """Borra los items por lotes y manda sus audios a la papelera"""
+        try:
+            db_manager = DatabaseManager()
+            
+            def on_batch(deleted: int, total: int, audio_files: List[str]):
+                # Los archivos solo se mueven; el borrado físico es asíncrono
+                trash_reclaimer.discard(audio_files)
+                self.progress_updated.emit(deleted, total)
+            
+            success = db_manager.delete_data_source_and_content(
+                self.source_id, progress_callback=on_batch
+            )
+            
+            if success:
+                deleted_dirs = FileManager.clean_empty_directories(FileManager.get_audio_directory())
+                if deleted_dirs > 0:
+                    logger.info(f"Se eliminaron {deleted_dirs} directorios vacíos")
+            
+            self.deletion_finished.emit(self.source_id, success)
+            
+        except Exception as e:
+            logger.error(f"Error durante eliminación completa: {e}")
+            self.deletion_finished.emit(self.source_id, False)
+
 class DataSourceItem(QFrame):
     """Widget para mostrar una fuente de datos"""
     
@@ -79,9 +115,9 @@ class DataSourceItem(QFrame):
         info_layout.addWidget(type_label)
         
         # Número de items
-        count_label = QLabel(f"{self.item_count} elementos")
-        count_label.setStyleSheet("color: #666; font-size: 11px;")
-        info_layout.addWidget(count_label)
+        self.count_label = QLabel(f"{self.item_count} elementos")
+        self.count_label.setStyleSheet("color: #666; font-size: 11px;")
+        info_layout.addWidget(self.count_label)
         
         layout.addLayout(info_layout)
         layout.addStretch()
@@ -92,6 +128,12 @@ class DataSourceItem(QFrame):
         if self.data_source.thumbnail_url:
             self.load_thumbnail()
     
+    def set_item_count(self, item_count: int):
+        """Actualiza el número de items mostrado"""
+        if item_count != self.item_count:
+            self.item_count = item_count
+            self.count_label.setText(f"{item_count} elementos")
+    
     def load_thumbnail(self):
         """Carga el thumbnail de manera asíncrona"""
         # TODO: Implementar carga asíncrona de imágenes
@@ -241,6 +283,8 @@ class DataSourceWidget(QWidget):
         super().__init__(parent)
         self.db_manager = DatabaseManager()
         self.data_sources = []
+        self.change_version = 0
+        self.deletion_threads = {}
         self.setup_ui()
         self.load_data_sources()
     
@@ -297,40 +341,83 @@ class DataSourceWidget(QWidget):
     def load_data_sources(self):
         """Carga las fuentes de datos desde la base de datos"""
         try:
-            sources_data = self.db_manager.get_data_sources()
+            # Versión leída antes de la consulta: los cambios posteriores se aplican después
+            self.change_version = self.db_manager.get_change_version()
+            sources = self.db_manager.get_data_sources(as_models=True)
+            source_stats = self.db_manager.get_content_stats(include_archive=False)['by_source']
             self.data_sources = []
             self.sources_list.clear()
             
-            for source_data in sources_data:
-                # Crear objeto DataSource
-                data_source = DataSource(
-                    id=source_data['id'],
-                    name=source_data['name'],
-                    type=source_data['type'],
-                    url=source_data['url'],
-                    thumbnail_url=source_data['thumbnail_url'],
-                    description=source_data['description'],
-                    active=bool(source_data['active'])
-                )
-                
-                # Obtener número de items
-                item_count = self.db_manager.get_item_count_by_source(data_source.id)
-                
-                # Crear widget del item
-                item_widget = DataSourceItem(data_source, item_count)
-                item_widget.clicked.connect(self.on_source_clicked)
-                
-                # Añadir a la lista
-                list_item = QListWidgetItem()
-                list_item.setSizeHint(item_widget.sizeHint())
-                self.sources_list.addItem(list_item)
-                self.sources_list.setItemWidget(list_item, item_widget)
-                
-                self.data_sources.append(data_source)
+            for data_source in sources:
+                # Número de items (de las estadísticas agregadas)
+                item_count = source_stats.get(data_source.id, {}).get('total', 0)
+                self._insert_row(len(self.data_sources), data_source, item_count)
                 
         except Exception as e:
             logger.error(f"Error cargando fuentes de datos: {e}")
     
+    def _insert_row(self, index: int, data_source: DataSource, item_count: int):
+        """Inserta el widget de una fuente en la posición indicada"""
+        item_widget = DataSourceItem(data_source, item_count)
+        item_widget.clicked.connect(self.on_source_clicked)
+        
+        list_item = QListWidgetItem()
+        list_item.setSizeHint(item_widget.sizeHint())
+        self.sources_list.insertItem(index, list_item)
+        self.sources_list.setItemWidget(list_item, item_widget)
+        
+        self.data_sources.insert(index, data_source)
+    
+    def _remove_row(self, source_id: int):
+        """Quita el widget de una fuente si está en la lista"""
+        for index, data_source in enumerate(self.data_sources):
+            if data_source.id == source_id:
+                del self.data_sources[index]
+                self.sources_list.takeItem(index)
+                return
+    
+    def apply_changes(self):
+        """Aplica solo las fuentes modificadas y los conteos que han cambiado
+        
+        Lee el registro de cambios desde la última versión vista; si se ha
+        recortado o hay demasiados cambios, recarga la lista completa.
+        """
+        try:
+            changes = self.db_manager.get_changes_since(self.change_version)
+            if changes['reset']:
+                self.load_data_sources()
+                return
+            
+            self.change_version = changes['version']
+            if not changes['data_sources'] and not changes['content_items']:
+                return
+            
+            source_stats = self.db_manager.get_content_stats(include_archive=False)['by_source']
+            
+            for source_id, op in changes['data_sources'].items():
+                self._remove_row(source_id)
+                source = self.db_manager.get_data_source(source_id, as_model=True) if op == 'upsert' else None
+                if source is None or not source.active:
+                    continue
+                
+                # Posición según el orden por nombre del listado
+                index = next(
+                    (i for i, data_source in enumerate(self.data_sources)
+                     if data_source.name > source.name),
+                    len(self.data_sources)
+                )
+                item_count = source_stats.get(source_id, {}).get('total', 0)
+                self._insert_row(index, source, item_count)
+            
+            # Conteos de items: solo se repintan los que cambian
+            for index, data_source in enumerate(self.data_sources):
+                item_widget = self.sources_list.itemWidget(self.sources_list.item(index))
+                if item_widget:
+                    item_widget.set_item_count(source_stats.get(data_source.id, {}).get('total', 0))
+            
+        except Exception as e:
+            logger.error(f"Error aplicando cambios a las fuentes de datos: {e}")
+    
     def add_data_source(self):
         """Añade una nueva fuente de datos"""
         dialog = AddDataSourceDialog(self)
@@ -351,7 +438,7 @@ class DataSourceWidget(QWidget):
                 )
                 
                 logger.info(f"Fuente de datos añadida: {data['name']}")
-                self.load_data_sources()
+                self.apply_changes()
                 
             except ValueError as e:
                 QMessageBox.warning(self, "Error", str(e))
@@ -376,52 +463,66 @@ class DataSourceWidget(QWidget):
                 dialog = DeleteConfirmationDialog(deletion_info, self)
                 
                 if dialog.exec() == QDialog.Accepted:
-                    # Proceder con la eliminación
-                    success = self._perform_deletion(source.id, deletion_info)
-                    
-                    if success:
-                        # Mostrar reporte de eliminación
-                        self._show_deletion_report(deletion_info)
-                        # Recargar la lista
-                        self.load_data_sources()
-                    else:
-                        QMessageBox.critical(self, "Error", 
-                            "Error durante la eliminación. Consulte los logs para más detalles.")
+                    # Proceder con la eliminación en segundo plano
+                    self._start_deletion(source.id, deletion_info)
                 
             except Exception as e:
                 logger.error(f"Error en eliminación de fuente: {e}")
                 QMessageBox.critical(self, "Error", f"Error inesperado: {str(e)}")
     
-    def _perform_deletion(self, source_id: int, deletion_info: Dict[str, Any]) -> bool:
-        """Realiza la eliminación completa de la fuente y sus archivos"""
-        try:
-            # 1. Eliminar archivos de audio físicos
-            audio_deletion_results = None
-            if deletion_info['audio_file_paths']:
-                audio_deletion_results = FileManager.delete_audio_files(
-                    deletion_info['audio_file_paths']
-                )
-                logger.info(f"Eliminación de archivos de audio: {audio_deletion_results}")
-            
-            # 2. Eliminar registros de base de datos
-            db_success = self.db_manager.delete_data_source_and_content(source_id)
-            
-            if not db_success:
-                logger.error("Error eliminando registros de base de datos")
-                return False
-            
-            # 3. Limpiar directorios vacíos
-            audio_dir = FileManager.get_audio_directory()
-            deleted_dirs = FileManager.clean_empty_directories(audio_dir)
-            if deleted_dirs > 0:
-                logger.info(f"Se eliminaron {deleted_dirs} directorios vacíos")
-            
+    def _start_deletion(self, source_id: int, deletion_info: Dict[str, Any]):
+        """Lanza la eliminación por lotes de la fuente mostrando el progreso"""
+        if source_id in self.deletion_threads:
+            return
+        
+        progress_dialog = QProgressDialog(
+            f"Eliminando '{deletion_info['source_name']}'...", None, 0,
+            max(deletion_info['total_items'], 1), self
+        )
+        progress_dialog.setWindowTitle("Eliminando fuente")
+        progress_dialog.setMinimumDuration(500)
+        progress_dialog.setAutoClose(False)
+        progress_dialog.setValue(0)
+        
+        thread = SourceDeletionThread(source_id)
+        thread.progress_updated.connect(
+            lambda deleted, total: (progress_dialog.setMaximum(total), progress_dialog.setValue(deleted))
+        )
+        thread.deletion_finished.connect(
+            lambda finished_id, success: self._on_deletion_finished(
+                finished_id, success, deletion_info, progress_dialog
+            )
+        )
+        
+        # La referencia se suelta al terminar el hilo, no al emitir deletion_finished
+        # (se emite dentro de run() y el QThread no puede destruirse en marcha)
+        thread.finished.connect(self._on_deletion_thread_finished)
+        
+        self.deletion_threads[source_id] = thread
+        thread.start()
+    
+    def _on_deletion_thread_finished(self):
+        """Libera el hilo de una eliminación ya terminada"""
+        thread = self.sender()
+        if self.deletion_threads.get(thread.source_id) is thread:
+            del self.deletion_threads[thread.source_id]
+        thread.deleteLater()
+    
+    def _on_deletion_finished(self, source_id: int, success: bool, deletion_info: Dict[str, Any],
+                              progress_dialog: QProgressDialog):
+        """Cierra el progreso de una eliminación y muestra el resultado"""
+        progress_dialog.close()
+        
+        # Aplicar los cambios a la lista
+        self.apply_changes()
+        
+        if success:
             logger.info(f"Eliminación completa exitosa para fuente {source_id}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error durante eliminación completa: {e}")
-            return False
+            # Mostrar reporte de eliminación
+            self._show_deletion_report(deletion_info)
+        else:
+            QMessageBox.critical(self, "Error", 
+                "Error durante la eliminación. Consulte los logs para más detalles.")
     
     def _show_deletion_report(self, deletion_info: Dict[str, Any]):
         """Muestra un reporte de lo que se eliminó"""
@@ -432,7 +533,7 @@ class DataSourceWidget(QWidget):
         report = f"""Eliminación completada exitosamente:
 
 📝 Fuente: {deletion_info['source_name']}
-📄 Items de contenido eliminados: {total_items}
+📄 Items de contenido eliminados: {total_items} ({deletion_info.get('archived_items', 0)} archivados)
 🎵 Archivos de audio eliminados: {audio_files}
 📊 Registros de procesamiento eliminados: {logs}
 
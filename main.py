@@ -11,13 +11,69 @@ from pathlib import Path
 # Añadir el directorio raíz al path
 sys.path.append(str(Path(__file__).parent))
 
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication, QProgressDialog
+from PySide6.QtCore import Qt, QEventLoop, QThread, Signal
 from app.main_window import MainWindow
 from utils.config import ConfigManager
 from utils.logger import setup_logger
 from models.database import DatabaseManager
 
+class MigrationThread(QThread):
+    """Hilo que completa las migraciones incrementales pendientes
+    
+    Cada lote se confirma por separado: si la aplicación se cierra, la
+    migración continúa en el siguiente arranque.
+    """
+    
+    progress_updated = Signal(int)  # lotes procesados
+    
+    def __init__(self, db_manager: DatabaseManager, batches_per_step: int):
+        super().__init__()
+        self.db_manager = db_manager
+        self.batches_per_step = batches_per_step
+        self.error = None
+    
+    def run(self):
+        """Procesa las migraciones por tandas de lotes hasta terminar"""
+        try:
+            processed = 0
+            while not self.db_manager.initialize_database(max_batches=self.batches_per_step):
+                processed += self.batches_per_step
+                self.progress_updated.emit(processed)
+        except Exception as e:
+            self.error = e
+
+def initialize_database(db_manager: DatabaseManager, batches_per_step: int):
+    """Aplica las migraciones pendientes sin bloquear la interfaz
+    
+    Las bases de datos pequeñas quedan al día con los primeros lotes; si
+    queda trabajo, los lotes restantes se procesan en segundo plano con un
+    diálogo de progreso antes de abrir la ventana principal, que necesita
+    el esquema actualizado.
+    """
+    if db_manager.initialize_database(max_batches=batches_per_step):
+        return
+    
+    dialog = QProgressDialog("Actualizando la base de datos...", None, 0, 0)
+    dialog.setWindowTitle("PyPodcast")
+    dialog.setMinimumDuration(0)
+    
+    thread = MigrationThread(db_manager, batches_per_step)
+    thread.progress_updated.connect(
+        lambda processed: dialog.setLabelText(
+            f"Actualizando la base de datos... ({processed} lotes procesados)"
+        )
+    )
+    loop = QEventLoop()
+    thread.finished.connect(loop.quit)
+    dialog.show()
+    thread.start()
+    loop.exec()
+    dialog.close()
+    
+    if thread.error is not None:
+        raise thread.error
+
 def main():
     """Función principal de la aplicación"""
     # Configurar logging
@@ -37,7 +93,7 @@ def main():
         
         # Inicializar base de datos
         db_manager = DatabaseManager()
-        db_manager.initialize_database()
+        initialize_database(db_manager, config_manager.get('database.startup_migration_batches', 20))
         
         # Crear y mostrar ventana principal
         window = MainWindow()
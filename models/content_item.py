@@ -2,35 +2,199 @@
 Modelo de item de contenido
 """
 
-from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, Any, Callable, Iterable
 from pathlib import Path
+from models.row_factory import RowFactory, model_row_factory
+from utils.file_manager import FileManager
+
+# Marca de texto aún no leído de la base de datos
+_NOT_LOADED = object()
 
-@dataclass
 class ContentItem:
-    """Modelo para un item de contenido"""
-    id: Optional[int]
-    source_id: int
-    title: str
-    url: str
-    description: Optional[str] = None
-    content: Optional[str] = None
-    summary: Optional[str] = None
-    audio_file: Optional[str] = None
-    thumbnail_url: Optional[str] = None
-    status: str = 'nuevo'  # 'nuevo', 'procesado', 'escuchado', 'ignorar'
-    published_date: Optional[datetime] = None
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
-    source_name: Optional[str] = None
-    source_type: Optional[str] = None
-    
+    """Modelo para un item de contenido
+
+    ``content`` y ``summary`` se guardan comprimidos fuera de la tabla
+    principal. Si el item se crea con ``body_loader`` y sin esos textos, se
+    cargan bajo demanda en el primer acceso a cualquiera de los dos.
+
+    La existencia del archivo de audio se comprueba una sola vez por item y
+    se guarda; ``check_audio_files`` la resuelve en bloque para una lista.
+
+    Los argumentos posicionales son los del modelo original; los añadidos
+    después (``published_ts``, ``summary_available``, ``body_loader``) solo
+    se aceptan por nombre.
+    """
+
+    __slots__ = ('id', 'source_id', 'title', 'url', 'description', '_audio_file',
+                 'thumbnail_url', 'status', 'published_date', 'published_ts', 'created_at',
+                 'updated_at', 'source_name', 'source_type', 'summary_available',
+                 'body_loader', '_content', '_summary', '_audio_exists')
+
+    _FIELDS = ('id', 'source_id', 'title', 'url', 'description', 'audio_file',
+               'thumbnail_url', 'status', 'published_date', 'published_ts', 'created_at', 'updated_at',
+               'source_name', 'source_type', 'summary_available')
+
+    # Columna de la base de datos → atributo en el que se guarda
+    _COLUMN_ATTRS = {
+        **{name: name for name in _FIELDS},
+        'audio_file': '_audio_file',
+        'has_summary': 'summary_available',
+        'content': '_content',
+        'summary': '_summary',
+    }
+
+    def __init__(self, id: Optional[int], source_id: int, title: str, url: str,
+                 description: Optional[str] = None,
+                 content: Optional[str] = _NOT_LOADED,
+                 summary: Optional[str] = _NOT_LOADED,
+                 audio_file: Optional[str] = None,
+                 thumbnail_url: Optional[str] = None,
+                 status: str = 'nuevo',  # 'nuevo', 'procesado', 'escuchado', 'ignorar'
+                 published_date: Optional[datetime] = None,
+                 created_at: Optional[datetime] = None,
+                 updated_at: Optional[datetime] = None,
+                 source_name: Optional[str] = None,
+                 source_type: Optional[str] = None,
+                 *,
+                 published_ts: Optional[int] = None,  # Segundos epoch (orden del listado)
+                 summary_available: Optional[bool] = None,  # Indicador del listado (sin cargar el resumen)
+                 body_loader: Optional[Callable[[int], Dict[str, Any]]] = None):
+        self.id = id
+        self.source_id = source_id
+        self.title = title
+        self.url = url
+        self.description = description
+        self._audio_file = audio_file
+        self._audio_exists = None
+        self.thumbnail_url = thumbnail_url
+        self.status = status
+        self.published_date = published_date
+        self.published_ts = published_ts
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.source_name = source_name
+        self.source_type = source_type
+        self.summary_available = summary_available
+        self.body_loader = body_loader
+
+        # Sin loader, los textos no indicados quedan vacíos
+        if body_loader is None:
+            content = None if content is _NOT_LOADED else content
+            summary = None if summary is _NOT_LOADED else summary
+        self._content = content
+        self._summary = summary
+
+    @classmethod
+    def _blank(cls, body_loader: Optional[Callable[[int], Dict[str, Any]]] = None) -> 'ContentItem':
+        """Item sin datos, con los valores por defecto, para rellenar desde una fila"""
+        item = cls.__new__(cls)
+        item.id = item.source_id = item.title = item.url = item.description = None
+        item._audio_file = item._audio_exists = item.thumbnail_url = None
+        item.status = 'nuevo'
+        item.published_date = item.published_ts = item.created_at = item.updated_at = None
+        item.source_name = item.source_type = item.summary_available = None
+        item.body_loader = body_loader
+        item._content = item._summary = _NOT_LOADED
+        return item
+
+    def _finish_row(self):
+        """Normaliza un item recién rellenado desde una fila"""
+        if self.status is None:
+            self.status = 'nuevo'
+        if self.summary_available is not None:
+            self.summary_available = bool(self.summary_available)
+        # Sin loader, los textos no leídos quedan vacíos
+        if self.body_loader is None:
+            if self._content is _NOT_LOADED:
+                self._content = None
+            if self._summary is _NOT_LOADED:
+                self._summary = None
+
+    @classmethod
+    def row_factory(cls, body_loader: Optional[Callable[[int], Dict[str, Any]]] = None) -> RowFactory:
+        """Row factory de sqlite3 que crea ContentItem directamente desde las filas
+
+        Acepta las mismas columnas que ``from_dict``; ``has_summary`` se usa
+        como indicador del resumen sin cargarlo.
+        """
+        return model_row_factory(lambda: cls._blank(body_loader), cls._COLUMN_ATTRS, cls._finish_row)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any],
+                  body_loader: Optional[Callable[[int], Dict[str, Any]]] = None) -> 'ContentItem':
+        """Crea un ContentItem a partir de una fila de la base de datos
+
+        Las columnas ausentes (por ejemplo en consultas proyectadas) quedan
+        con su valor por defecto; ``content`` y ``summary`` ausentes se
+        cargan con ``body_loader`` si se indica.
+        """
+        item = cls._blank(body_loader)
+        for column, attr in cls._COLUMN_ATTRS.items():
+            if column in data:
+                setattr(item, attr, data[column])
+        item._finish_row()
+        return item
+
+    @classmethod
+    def check_audio_files(cls, items: Iterable['ContentItem'], refresh: bool = False):
+        """Comprueba en bloque si existen los archivos de audio de los items
+
+        Lee cada directorio de audio una sola vez, de modo que ``has_audio``
+        ya no accede al sistema de archivos (p. ej. al pintar las filas).
+        Con ``refresh`` se vuelven a comprobar también los ya conocidos.
+        """
+        pending = [item for item in items
+                   if item._audio_file and (refresh or item._audio_exists is None)]
+        if not pending:
+            return
+        existing = FileManager.find_existing_files({item._audio_file for item in pending})
+        for item in pending:
+            item._audio_exists = item._audio_file in existing
+
+    def _load_body(self):
+        """Carga contenido y resumen desde la base de datos"""
+        body = {}
+        if self.body_loader is not None and self.id is not None:
+            body = self.body_loader(self.id) or {}
+        if self._content is _NOT_LOADED:
+            self._content = body.get('content')
+        if self._summary is _NOT_LOADED:
+            self._summary = body.get('summary')
+
+    @property
+    def content(self) -> Optional[str]:
+        """Texto completo (transcripción o artículo), cargado bajo demanda"""
+        if self._content is _NOT_LOADED:
+            self._load_body()
+        return self._content
+
+    @content.setter
+    def content(self, value: Optional[str]):
+        self._content = value
+
+    @property
+    def summary(self) -> Optional[str]:
+        """Resumen, cargado bajo demanda"""
+        if self._summary is _NOT_LOADED:
+            self._load_body()
+        return self._summary
+
+    @summary.setter
+    def summary(self, value: Optional[str]):
+        self._summary = value
+        self.summary_available = bool(value and value.strip())
+
+    @property
+    def body_loaded(self) -> bool:
+        """Indica si contenido y resumen ya están en memoria"""
+        return self._content is not _NOT_LOADED and self._summary is not _NOT_LOADED
+
     @property
     def display_title(self) -> str:
         """Título para mostrar en la UI"""
         return self.title if self.title else "Sin título"
-    
+
     @property
     def status_display(self) -> str:
         """Estado para mostrar en la UI"""
@@ -41,18 +205,44 @@ class ContentItem:
             'ignorar': 'Ignorar'
         }
         return status_mapping.get(self.status, self.status)
-    
+
+    @property
+    def audio_file(self) -> Optional[str]:
+        """Ruta del archivo de audio generado"""
+        return self._audio_file
+
+    @audio_file.setter
+    def audio_file(self, value: Optional[str]):
+        if value != self._audio_file:
+            self._audio_exists = None
+        self._audio_file = value
+
     @property
     def has_audio(self) -> bool:
-        """Verifica si tiene archivo de audio"""
-        if not self.audio_file:
+        """Verifica si tiene archivo de audio (comprobado una vez y guardado)"""
+        if not self._audio_file:
             return False
-        return Path(self.audio_file).exists()
-    
+        if self._audio_exists is None:
+            self._audio_exists = Path(self._audio_file).exists()
+        return self._audio_exists
+
     @property
     def has_summary(self) -> bool:
-        """Verifica si tiene resumen"""
-        return bool(self.summary and self.summary.strip())
-    
+        """Verifica si tiene resumen (sin cargarlo si se conoce el indicador)"""
+        if self.summary_available is not None and (self._summary is _NOT_LOADED or self._summary is None):
+            return self.summary_available
+        summary = self.summary
+        return bool(summary and summary.strip())
+
+    def __eq__(self, other) -> bool:
+        # Solo los campos en memoria (id incluido): comparar no lee los textos de la base de datos
+        if not isinstance(other, ContentItem):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._FIELDS)
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._FIELDS)
+        return f"ContentItem({fields})"
+
     def __str__(self) -> str:
         return f"{self.display_title} ({self.status_display})"
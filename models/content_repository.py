@@ -0,0 +1,167 @@
+"""
+Repositorio de items de contenido con mapa de identidad
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Iterable
+
+from models.content_item import ContentItem
+from models.database import DatabaseManager, add_invalidation_listener
+from utils.config import config_manager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class ContentRepository:
+    """Acceso a ContentItem por id con caché LRU e invalidación automática
+    
+    Mantiene un mapa de identidad: mientras un item esté en caché, todas las
+    peticiones de ese id devuelven el mismo objeto. Las actualizaciones y
+    eliminaciones de DatabaseManager expulsan los items afectados.
+    
+    Las lecturas de la base de datos se hacen fuera del lock: cada id que
+    se está cargando tiene una generación que las expulsiones incrementan,
+    y un item leído solo se guarda si su generación no cambió durante la
+    lectura (si no, podría ser anterior a la escritura que lo expulsó).
+    Los items archivados se obtienen igual que los activos.
+    """
+    
+    def __init__(self, db_manager: DatabaseManager = None, max_size: int = None):
+        self.db_manager = db_manager or DatabaseManager()
+        self.max_size = max_size or config_manager.get('database.item_cache_size', 500)
+        self._items: "OrderedDict[int, ContentItem]" = OrderedDict()
+        self._lock = threading.RLock()
+        # Solo de los ids con lecturas en curso: id → generación / lecturas
+        self._generations: Dict[int, int] = {}
+        self._loading: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+        add_invalidation_listener(self.evict)
+    
+    def get(self, item_id: int) -> Optional[ContentItem]:
+        """Obtiene un item por id (caché o búsqueda indexada)"""
+        with self._lock:
+            item = self._items.get(item_id)
+            if item is not None:
+                self._items.move_to_end(item_id)
+                self.hits += 1
+                return item
+            self.misses += 1
+            generations = self._begin_load([item_id])
+        
+        try:
+            item_data = self.db_manager.get_content_item(item_id)
+            if not item_data:
+                return None
+            return self._store(self._build_item(item_data), generations[item_id])
+        finally:
+            self._end_load([item_id])
+    
+    def get_many(self, item_ids: Iterable[int]) -> List[ContentItem]:
+        """Obtiene varios items por id, en el orden pedido, con una sola consulta para los ausentes"""
+        item_ids = list(item_ids)
+        found = {}
+        missing = []
+        
+        with self._lock:
+            for item_id in item_ids:
+                item = self._items.get(item_id)
+                if item is not None:
+                    self._items.move_to_end(item_id)
+                    found[item_id] = item
+                    self.hits += 1
+                elif item_id not in missing:
+                    missing.append(item_id)
+                    self.misses += 1
+            generations = self._begin_load(missing)
+        
+        try:
+            if missing:
+                for item in self.db_manager.get_content_items_by_ids(missing, as_items=True):
+                    item = self._store(item, generations[item.id])
+                    found[item.id] = item
+        finally:
+            self._end_load(missing)
+        
+        return [found[item_id] for item_id in item_ids if item_id in found]
+    
+    def evict(self, item_ids: List[int] = None, source_id: int = None):
+        """Expulsa items de la caché
+        
+        Sin argumentos vacía la caché completa.
+        """
+        with self._lock:
+            if item_ids is None and source_id is None:
+                self._items.clear()
+                self._invalidate_loads(self._generations)
+                return
+            
+            for item_id in item_ids or []:
+                self._items.pop(item_id, None)
+            self._invalidate_loads(item_ids or [])
+            
+            if source_id is not None:
+                # No se sabe a qué fuente pertenecen los items en carga
+                self._invalidate_loads(self._generations)
+                stale_ids = [item_id for item_id, item in self._items.items()
+                             if item.source_id == source_id]
+                for item_id in stale_ids:
+                    del self._items[item_id]
+    
+    def clear(self):
+        """Vacía la caché"""
+        self.evict()
+    
+    def _build_item(self, item_data) -> ContentItem:
+        """Crea el item con carga diferida de contenido y resumen"""
+        return ContentItem.from_dict(item_data, body_loader=self.db_manager.get_content_body)
+    
+    def _begin_load(self, item_ids: List[int]) -> Dict[int, int]:
+        """Registra lecturas en curso y retorna la generación actual de cada id (con el lock)"""
+        generations = {}
+        for item_id in item_ids:
+            self._loading[item_id] = self._loading.get(item_id, 0) + 1
+            generations[item_id] = self._generations.setdefault(item_id, 0)
+        return generations
+    
+    def _end_load(self, item_ids: List[int]):
+        """Da por terminadas lecturas registradas con _begin_load"""
+        with self._lock:
+            for item_id in item_ids:
+                pending = self._loading[item_id] - 1
+                if pending:
+                    self._loading[item_id] = pending
+                else:
+                    del self._loading[item_id]
+                    del self._generations[item_id]
+    
+    def _invalidate_loads(self, item_ids: Iterable[int]):
+        """Invalida las lecturas en curso de unos ids (con el lock)"""
+        for item_id in list(item_ids):
+            if item_id in self._generations:
+                self._generations[item_id] += 1
+    
+    def _store(self, item: ContentItem, generation: int) -> ContentItem:
+        """Guarda un item en la caché respetando la identidad y el tamaño máximo
+        
+        Si el item se expulsó durante la lectura (``generation`` obsoleta) se
+        retorna sin guardarlo.
+        """
+        with self._lock:
+            if self._generations.get(item.id) != generation:
+                return item
+            
+            # Si otro hilo lo cargó mientras tanto, conservar ese objeto
+            existing = self._items.get(item.id)
+            if existing is not None:
+                self._items.move_to_end(item.id)
+                return existing
+            
+            self._items[item.id] = item
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+            return item
+
+# Instancia global del repositorio de contenido
+content_repository = ContentRepository()
@@ -5,8 +5,9 @@ Modelo de fuente de datos
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
+from models.row_factory import RowFactory, model_row_factory
 
-@dataclass
+@dataclass(slots=True)
 class DataSource:
     """Modelo para una fuente de datos"""
     id: Optional[int]
@@ -20,6 +21,16 @@ class DataSource:
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     
+    @classmethod
+    def row_factory(cls) -> RowFactory:
+        """Row factory de sqlite3 que crea DataSource directamente desde las filas de data_sources"""
+        columns = {name: name for name in cls.__dataclass_fields__}
+        return model_row_factory(lambda: cls(None, None, None, None), columns, cls._finish_row)
+    
+    def _finish_row(self):
+        """Normaliza una fuente recién rellenada desde una fila"""
+        self.active = bool(self.active)
+    
     @property
     def display_name(self) -> str:
         """Nombre para mostrar en la UI"""
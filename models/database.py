@@ -2,112 +2,520 @@
 Gestión de base de datos SQLite
 """
 
+import json
 import sqlite3
 import os
+import threading
+import weakref
+from concurrent.futures import Future
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
+from models.content_item import ContentItem
+from models.data_source import DataSource
+from models.db_writer import get_database_writer
+from models.migrations import MigrationRunner
+from models.query_profiler import ProfiledCursor, query_profiler
 from utils.config import config_manager
 from utils.logger import get_logger
+from utils.text_compression import compress_text, decompress_text, register_sql_functions
+from utils.timestamps import format_datetime, now_epoch, to_epoch
+from utils.url_canonical import canonicalize_url, url_hash
 
 logger = get_logger(__name__)
 
+class PooledConnection(sqlite3.Connection):
+    """Conexión SQLite gestionada por el pool (admite referencias débiles)"""
+
+class ProfiledConnection(PooledConnection):
+    """Conexión del pool que mide sus sentencias (``database.profiling``)
+
+    ``Connection.execute`` no pasa por ``cursor()``, así que se redefinen
+    ambos para que toda sentencia use un ``ProfiledCursor``.
+    """
+
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+class ConnectionPool:
+    """Pool de conexiones SQLite con una conexión por hilo
+    
+    Cada hilo reutiliza siempre la misma conexión, configurada una única vez
+    en modo WAL, de forma que las escrituras de los hilos de actualización no
+    bloquean las lecturas de la interfaz. ``attachments`` (alias → ruta) son
+    bases de datos que se adjuntan con ATTACH a cada conexión. Con
+    ``read_only`` las conexiones se abren con ``mode=ro`` y en modo
+    autocommit, para lecturas en transacciones explícitas (``read_snapshot``).
+    """
+    
+    def __init__(self, db_path: Path, attachments: Dict[str, Path] = None, read_only: bool = False):
+        self.db_path = db_path
+        self.attachments = dict(attachments or {})
+        self.read_only = read_only
+        self._local = threading.local()
+        self._connections = weakref.WeakSet()
+        self._lock = threading.Lock()
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """Obtiene la conexión del hilo actual, creándola si no existe"""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None:
+            conn = self._create_connection()
+            self._local.connection = conn
+            with self._lock:
+                self._connections.add(conn)
+        return conn
+    
+    def _create_connection(self) -> sqlite3.Connection:
+        """Abre y configura una nueva conexión"""
+        busy_timeout_ms = int(config_manager.get('database.busy_timeout_ms', 5000))
+        factory = ProfiledConnection if query_profiler.enabled else PooledConnection
+        if self.read_only:
+            conn = sqlite3.connect(
+                self._read_only_uri(self.db_path),
+                timeout=busy_timeout_ms / 1000,
+                factory=factory,
+                check_same_thread=False,
+                uri=True,
+                isolation_level=None
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=busy_timeout_ms / 1000,
+                factory=factory,
+                check_same_thread=False
+            )
+        conn.row_factory = sqlite3.Row
+        register_sql_functions(conn)
+        try:
+            self._configure_connection(conn, busy_timeout_ms)
+            for alias, path in self.attachments.items():
+                if self.read_only:
+                    conn.execute(f"ATTACH DATABASE ? AS {alias}", (self._read_only_uri(path),))
+                    continue
+                conn.execute(f"ATTACH DATABASE ? AS {alias}", (str(path),))
+                conn.execute(f"PRAGMA {alias}.journal_mode=WAL")
+                conn.execute(f"PRAGMA {alias}.synchronous=NORMAL")
+        except Exception:
+            conn.close()
+            raise
+        logger.debug(f"Nueva conexión SQLite para el hilo {threading.get_ident()}")
+        return conn
+    
+    @staticmethod
+    def _read_only_uri(path: Path) -> str:
+        """URI de SQLite para abrir una base de datos en solo lectura"""
+        return f"{Path(path).resolve().as_uri()}?mode=ro"
+    
+    def _configure_connection(self, conn: sqlite3.Connection, busy_timeout_ms: int):
+        """Aplica los PRAGMA de rendimiento a una conexión"""
+        cache_size_kb = int(config_manager.get('database.cache_size_kb', 16384))
+        mmap_size_mb = int(config_manager.get('database.mmap_size_mb', 256))
+        
+        if self.read_only:
+            # El modo WAL lo fija la conexión de escritura; aquí solo se lee
+            conn.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+            conn.execute(f"PRAGMA cache_size=-{cache_size_kb}")
+            conn.execute(f"PRAGMA mmap_size={mmap_size_mb * 1024 * 1024}")
+            return
+        
+        # Solo tiene efecto en bases de datos nuevas (antes de crear tablas);
+        # las existentes las convierte el mantenimiento con un VACUUM
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        
+        journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if journal_mode.lower() != 'wal':
+            logger.warning(f"No se pudo activar el modo WAL (modo actual: {journal_mode})")
+        
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Borrados en cascada de fuentes → items → registros de procesamiento
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+        # Valor negativo: tamaño en KiB en lugar de número de páginas
+        conn.execute(f"PRAGMA cache_size=-{cache_size_kb}")
+        conn.execute(f"PRAGMA mmap_size={mmap_size_mb * 1024 * 1024}")
+    
+    def close_all(self):
+        """Cierra todas las conexiones abiertas del pool"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections = weakref.WeakSet()
+        
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.warning(f"Error cerrando conexión SQLite: {e}")
+        
+        self._local = threading.local()
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_connection_pool(db_path: Path, attachments: Dict[str, Path] = None,
+                        read_only: bool = False) -> ConnectionPool:
+    """Obtiene el pool compartido para una ruta de base de datos (de escritura o de lectura)"""
+    key = str(Path(db_path).resolve()) + (':ro' if read_only else '')
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(Path(db_path), attachments, read_only=read_only)
+            _pools[key] = pool
+        return pool
+
+class QueryCancelled(BaseException):
+    """Lectura interrumpida porque se canceló (la consulta quedó obsoleta)
+
+    Como ``asyncio.CancelledError``, no deriva de ``Exception``: atraviesa
+    los ``except Exception`` de los métodos de lectura en lugar de
+    registrarse como error y convertirse en un resultado vacío.
+    """
+
+# Snapshot de lectura abierto y evento de cancelación de cada hilo
+_read_state = threading.local()
+
+_invalidation_listeners: List[Callable[..., None]] = []
+
+def add_invalidation_listener(callback: Callable[..., None]):
+    """Registra un callback que se invoca cuando cambian items de contenido
+    
+    El callback recibe ``item_ids`` (lista de ids modificados o eliminados) y
+    ``source_id`` (fuente afectada en operaciones por fuente completa).
+    """
+    if callback not in _invalidation_listeners:
+        _invalidation_listeners.append(callback)
+
+def remove_invalidation_listener(callback: Callable[..., None]):
+    """Elimina un callback de invalidación registrado"""
+    if callback in _invalidation_listeners:
+        _invalidation_listeners.remove(callback)
+
 class DatabaseManager:
     """Gestor de base de datos SQLite"""
-    
+
+    # Filas por sentencia INSERT (9 parámetros por fila, límite clásico de 999)
+    BULK_INSERT_CHUNK_SIZE = 110
+
+    # Caracteres de descripción que proyecta el listado (la lista muestra 150)
+    LIST_DESCRIPTION_LENGTH = 200
+
+    # Ids por consulta IN (...) en búsquedas de varios items
+    ID_LOOKUP_CHUNK_SIZE = 500
+
+    # Cambios pendientes a partir de los cuales es más barato recargar la lista
+    MAX_INCREMENTAL_CHANGES = 1000
+
+    # Estados cuyos items antiguos se mueven a la base de datos de archivo
+    ARCHIVABLE_STATUSES = ('escuchado', 'ignorar')
+
+    # Columnas de archive.content_items equivalentes a ITEM_COLUMNS
+    ARCHIVE_ITEM_COLUMNS = '''
+        a.id, a.source_id, a.title, a.url, a.description, a.audio_file,
+        a.thumbnail_url, a.status, a.published_date, a.published_ts, a.created_at,
+        a.created_ts, a.updated_at, a.content IS NOT NULL as has_content,
+        a.summary IS NOT NULL as has_summary, 1 as archived
+    '''
+
+    # Registros de procesamiento resumidos y purgados por transacción
+    LOG_PRUNE_BATCH_SIZE = 5000
+
+    # Items borrados por transacción al eliminar una fuente
+    SOURCE_DELETE_BATCH_SIZE = 500
+
+    # Columnas de content_items sin los textos largos (que viven en content_bodies)
+    ITEM_COLUMNS = '''
+        ci.id, ci.source_id, ci.title, ci.url, ci.description, ci.audio_file,
+        ci.thumbnail_url, ci.status, ci.published_date, ci.published_ts, ci.created_at,
+        ci.created_ts, ci.updated_at, ci.has_content, ci.has_summary
+    '''
+
+    # Textos descomprimidos desde content_bodies (requiere LEFT JOIN cb)
+    BODY_COLUMNS = "pp_inflate(cb.content) as content, pp_inflate(cb.summary) as summary"
+
     def __init__(self):
         self.db_path = Path(config_manager.get('database.path', 'data/pypodcast.db'))
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Base de datos de archivo (items antiguos escuchados o ignorados)
+        archive_path = config_manager.get('database.archive_path')
+        self.archive_path = Path(archive_path) if archive_path else \
+            self.db_path.with_name(f"{self.db_path.stem}_archive{self.db_path.suffix}")
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self.pool = get_connection_pool(self.db_path, {'archive': self.archive_path})
+        self.read_pool = get_connection_pool(self.db_path, {'archive': self.archive_path}, read_only=True)
+        self.writer = get_database_writer(self.pool)
     
     def get_connection(self) -> sqlite3.Connection:
-        """Obtiene una conexión a la base de datos"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Obtiene la conexión del hilo actual desde el pool compartido
+        
+        La conexión no debe cerrarse: usarla como context manager
+        (``with conn:``) confirma o revierte la transacción en curso.
+        """
+        return self.pool.get_connection()
     
-    def initialize_database(self):
-        """Inicializa las tablas de la base de datos"""
+    @contextmanager
+    def read_snapshot(self):
+        """Conexión de solo lectura con una transacción de lectura abierta
+        
+        Todas las consultas del bloque ven la misma instantánea de la base de
+        datos y, en modo WAL, nunca esperan a un escritor. Los bloques
+        anidados reutilizan la instantánea exterior. Si el hilo está dentro
+        de ``cancellable_reads`` y su evento se activa, la consulta en curso
+        se interrumpe y se lanza ``QueryCancelled`` (también desde un bloque
+        anidado, para que el ``except Exception`` del método interior no la
+        convierta en un resultado vacío).
+        """
+        cancel = getattr(_read_state, 'cancel', None)
+        conn = getattr(_read_state, 'connection', None)
+        if conn is not None:
+            try:
+                yield conn
+            except sqlite3.OperationalError as e:
+                if cancel is not None and cancel.is_set():
+                    raise QueryCancelled() from e
+                raise
+            return
+        
+        if cancel is not None and cancel.is_set():
+            raise QueryCancelled()
+        
         try:
+            conn = self.read_pool.get_connection()
+        except sqlite3.OperationalError as e:
+            # La base de datos aún no existe (antes de initialize_database)
+            logger.debug(f"Lectura sin conexión de solo lectura: {e}")
             with self.get_connection() as conn:
-                # Tabla de fuentes de datos
-                conn.execute('''
-                    CREATE TABLE IF NOT EXISTS data_sources (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        type TEXT NOT NULL,  -- 'youtube', 'rss', 'web'
-                        url TEXT NOT NULL UNIQUE,
-                        thumbnail_url TEXT,
-                        description TEXT,
-                        active BOOLEAN DEFAULT 1,
-                        last_check TIMESTAMP,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # Tabla de items de contenido
-                conn.execute('''
-                    CREATE TABLE IF NOT EXISTS content_items (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        source_id INTEGER NOT NULL,
-                        title TEXT NOT NULL,
-                        url TEXT NOT NULL UNIQUE,
-                        description TEXT,
-                        content TEXT,
-                        summary TEXT,
-                        audio_file TEXT,
-                        thumbnail_url TEXT,
-                        status TEXT DEFAULT 'nuevo',  -- 'nuevo', 'procesado', 'escuchado', 'ignorar'
-                        published_date TIMESTAMP,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (source_id) REFERENCES data_sources (id)
-                    )
-                ''')
-                
-                # Tabla de configuración
-                conn.execute('''
-                    CREATE TABLE IF NOT EXISTS app_config (
-                        key TEXT PRIMARY KEY,
-                        value TEXT NOT NULL,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                ''')
-                
-                # Tabla de logs de procesamiento
-                conn.execute('''
-                    CREATE TABLE IF NOT EXISTS processing_logs (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        item_id INTEGER NOT NULL,
-                        action TEXT NOT NULL,
-                        status TEXT NOT NULL,  -- 'success', 'error', 'warning'
-                        message TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (item_id) REFERENCES content_items (id)
-                    )
-                ''')
-                
-                # Índices para mejorar rendimiento
-                conn.execute('CREATE INDEX IF NOT EXISTS idx_content_items_source_id ON content_items(source_id)')
-                conn.execute('CREATE INDEX IF NOT EXISTS idx_content_items_status ON content_items(status)')
-                conn.execute('CREATE INDEX IF NOT EXISTS idx_content_items_created_at ON content_items(created_at)')
-                
-                conn.commit()
-                logger.info("Base de datos inicializada correctamente")
+                yield conn
+            return
+        
+        if cancel is not None:
+            steps = int(config_manager.get('database.read_progress_steps', 1000))
+            conn.set_progress_handler(cancel.is_set, steps)
+        _read_state.connection = conn
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        except sqlite3.OperationalError as e:
+            if cancel is not None and cancel.is_set():
+                raise QueryCancelled() from e
+            raise
+        finally:
+            _read_state.connection = None
+            # Sin el manejador antes del ROLLBACK: si no, también se interrumpiría
+            if cancel is not None:
+                conn.set_progress_handler(None, 0)
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+    
+    @staticmethod
+    @contextmanager
+    def cancellable_reads(cancel: threading.Event):
+        """Hace cancelables las lecturas de este hilo dentro del bloque
+        
+        Al activar ``cancel`` (desde cualquier hilo) la lectura en curso se
+        interrumpe y las siguientes fallan con ``QueryCancelled``.
+        """
+        previous = getattr(_read_state, 'cancel', None)
+        _read_state.cancel = cancel
+        try:
+            yield cancel
+        finally:
+            _read_state.cancel = previous
+    
+    def close_connections(self):
+        """Aplica las escrituras pendientes y cierra las conexiones de los pools"""
+        self.writer.stop()
+        self.pool.close_all()
+        self.read_pool.close_all()
+    
+    def flush_writes(self, timeout: float = None) -> bool:
+        """Espera a que el escritor aplique las escrituras encoladas"""
+        return self.writer.flush(timeout)
+    
+    def _submit_write(self, job: Callable[[sqlite3.Connection], Any], wait: bool = True,
+                      item_ids: Iterable[int] = None) -> Any:
+        """Envía una escritura al hilo escritor
+        
+        Con ``wait`` espera y retorna el resultado (o relanza el error); si no,
+        retorna el ``Future``. Los listeners de ``item_ids`` se avisan tras el
+        commit, antes de resolver el futuro.
+        """
+        on_commit = None
+        if item_ids is not None:
+            item_ids = list(item_ids)
+            on_commit = lambda result: self._notify_items_changed(item_ids)
+        
+        future = self.writer.submit(job, on_commit=on_commit)
+        return future.result() if wait else future
+    
+    def _notify_items_changed(self, item_ids: Iterable[int] = None, source_id: int = None):
+        """Avisa a los listeners (cachés) de que unos items han cambiado"""
+        item_ids = list(item_ids) if item_ids is not None else None
+        for callback in list(_invalidation_listeners):
+            try:
+                callback(item_ids=item_ids, source_id=source_id)
+            except Exception as e:
+                logger.warning(f"Error en listener de invalidación: {e}")
+    
+    def initialize_database(self, max_batches: int = None):
+        """Inicializa la base de datos aplicando las migraciones pendientes
+        
+        ``max_batches`` limita los lotes de migraciones incrementales que se
+        procesan ahora; el resto continúa en la siguiente llamada.
+        """
+        try:
+            conn = self.get_connection()
+            runner = MigrationRunner(conn)
+            up_to_date = runner.run(max_batches=max_batches)
+            
+            # Contadores de items por fuente y estado (según configuración)
+            with conn:
+                self._configure_stats_counters(conn)
+                self._ensure_archive_schema(conn)
+            
+            logger.info(f"Base de datos inicializada correctamente (esquema v{runner.current_version()})")
+            return up_to_date
                 
         except Exception as e:
             logger.error(f"Error inicializando base de datos: {e}")
             raise
     
+    def get_schema_version(self) -> int:
+        """Obtiene la versión de esquema aplicada (PRAGMA user_version)"""
+        return self.get_connection().execute("PRAGMA user_version").fetchone()[0]
+    
+    def _configure_stats_counters(self, conn: sqlite3.Connection):
+        """Crea o elimina la tabla de contadores mantenida por triggers
+        
+        Con ``database.stats_counters`` activo, los conteos por fuente y
+        estado se leen en O(1) de ``content_counters``; si se desactiva, se
+        eliminan los triggers y las estadísticas se calculan con GROUP BY.
+        """
+        enabled = config_manager.get('database.stats_counters', True)
+        triggers = ('content_counters_insert', 'content_counters_delete', 'content_counters_update')
+        
+        if not enabled:
+            for trigger in triggers:
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.execute("DROP TABLE IF EXISTS content_counters")
+            return
+        
+        installed = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (?, ?, ?)",
+            triggers
+        ).fetchone()[0]
+        
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS content_counters (
+                source_id INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                item_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (source_id, status)
+            ) WITHOUT ROWID
+        ''')
+        
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS content_counters_insert
+            AFTER INSERT ON content_items BEGIN
+                INSERT INTO content_counters (source_id, status, item_count)
+                VALUES (new.source_id, COALESCE(new.status, 'nuevo'), 1)
+                ON CONFLICT (source_id, status) DO UPDATE SET item_count = item_count + 1;
+            END
+        ''')
+        
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS content_counters_delete
+            AFTER DELETE ON content_items BEGIN
+                UPDATE content_counters SET item_count = item_count - 1
+                WHERE source_id = old.source_id AND status = COALESCE(old.status, 'nuevo');
+            END
+        ''')
+        
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS content_counters_update
+            AFTER UPDATE OF source_id, status ON content_items
+            WHEN old.source_id IS NOT new.source_id OR old.status IS NOT new.status BEGIN
+                UPDATE content_counters SET item_count = item_count - 1
+                WHERE source_id = old.source_id AND status = COALESCE(old.status, 'nuevo');
+                INSERT INTO content_counters (source_id, status, item_count)
+                VALUES (new.source_id, COALESCE(new.status, 'nuevo'), 1)
+                ON CONFLICT (source_id, status) DO UPDATE SET item_count = item_count + 1;
+            END
+        ''')
+        
+        if installed < len(triggers):
+            # Los triggers no existían: recalcular desde cero
+            conn.execute("DELETE FROM content_counters")
+            conn.execute('''
+                INSERT INTO content_counters (source_id, status, item_count)
+                SELECT source_id, COALESCE(status, 'nuevo'), COUNT(*)
+                FROM content_items
+                GROUP BY source_id, COALESCE(status, 'nuevo')
+            ''')
+            logger.info("Contadores de estadísticas recalculados")
+    
+    def _ensure_archive_schema(self, conn: sqlite3.Connection):
+        """Crea las tablas de la base de datos de archivo si no existen
+        
+        ``archive.content_items`` guarda los items completos (textos
+        comprimidos) y ``archive.archive_fts`` su índice de búsqueda, con el
+        mismo tokenizador que el índice principal.
+        """
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS archive.content_items (
+                id INTEGER PRIMARY KEY,
+                source_id INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                url_hash INTEGER,
+                description TEXT,
+                content BLOB,
+                summary BLOB,
+                audio_file TEXT,
+                thumbnail_url TEXT,
+                status TEXT,
+                published_date TIMESTAMP,
+                published_ts INTEGER,
+                created_at TIMESTAMP,
+                created_ts INTEGER,
+                updated_at TIMESTAMP,
+                archived_ts INTEGER NOT NULL
+            )
+        ''')
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS archive.idx_archive_items_source ON content_items(source_id)'
+        )
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS archive.idx_archive_items_url_unhashed '
+            'ON content_items(url) WHERE url_hash IS NULL'
+        )
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS archive.archive_fts USING fts5(
+                title, description, content, summary,
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+    
     def add_data_source(self, name: str, source_type: str, url: str, 
                        thumbnail_url: str = None, description: str = None) -> int:
         """Añade una nueva fuente de datos"""
         try:
             with self.get_connection() as conn:
                 cursor = conn.execute('''
-                    INSERT INTO data_sources (name, type, url, thumbnail_url, description, last_check)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (name, source_type, url, thumbnail_url, description, datetime.now()))
+                    INSERT INTO data_sources
+                    (name, type, url, thumbnail_url, description, last_check, last_check_ts)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (name, source_type, url, thumbnail_url, description,
+                      format_datetime(datetime.now()), now_epoch()))
                 return cursor.lastrowid
         except sqlite3.IntegrityError:
             logger.warning(f"Fuente de datos ya existe: {url}")
@@ -116,33 +524,233 @@ class DatabaseManager:
             logger.error(f"Error añadiendo fuente de datos: {e}")
             raise
     
-    def get_data_sources(self, active_only: bool = True) -> List[Dict[str, Any]]:
-        """Obtiene todas las fuentes de datos"""
+    def get_data_sources(self, active_only: bool = True, as_models: bool = False) -> List[Any]:
+        """Obtiene todas las fuentes de datos
+        
+        Con ``as_models`` retorna objetos DataSource creados directamente
+        desde las filas en lugar de diccionarios.
+        """
         try:
-            with self.get_connection() as conn:
+            with self.read_snapshot() as conn:
                 query = "SELECT * FROM data_sources"
                 if active_only:
                     query += " WHERE active = 1"
                 query += " ORDER BY name"
                 
+                if as_models:
+                    cursor = conn.cursor()
+                    cursor.row_factory = DataSource.row_factory()
+                    return cursor.execute(query).fetchall()
                 cursor = conn.execute(query)
                 return [dict(row) for row in cursor.fetchall()]
         except Exception as e:
             logger.error(f"Error obteniendo fuentes de datos: {e}")
             return []
     
+    def get_data_source(self, source_id: int, as_model: bool = False) -> Optional[Any]:
+        """Obtiene una fuente de datos por su id
+        
+        Con ``as_model`` retorna un DataSource creado directamente desde la
+        fila, como ``get_data_sources(as_models=True)``.
+        """
+        try:
+            with self.read_snapshot() as conn:
+                cursor = conn.cursor()
+                if as_model:
+                    cursor.row_factory = DataSource.row_factory()
+                row = cursor.execute("SELECT * FROM data_sources WHERE id = ?", (source_id,)).fetchone()
+                if as_model or row is None:
+                    return row
+                return dict(row)
+        except Exception as e:
+            logger.error(f"Error obteniendo fuente de datos {source_id}: {e}")
+            return None
+    
+    def update_feed_resolution(self, source_id: int, feed_url: str, channel_id: str = None,
+                               wait: bool = False):
+        """Guarda la URL del feed (y el channel id) resueltos para una fuente
+        
+        Por defecto no espera a la escritura y retorna su ``Future``.
+        """
+        resolved_ts = now_epoch()
+        
+        def job(conn: sqlite3.Connection):
+            conn.execute('''
+                UPDATE data_sources SET feed_url = ?, channel_id = ?, feed_resolved_ts = ?
+                WHERE id = ?
+            ''', (feed_url, channel_id, resolved_ts, source_id))
+        
+        try:
+            return self._submit_write(job, wait=wait)
+        except Exception as e:
+            logger.error(f"Error guardando el feed resuelto de la fuente {source_id}: {e}")
+            raise
+    
+    def get_fetch_states(self, source_ids: Iterable[int] = None) -> Dict[int, Dict[str, Any]]:
+        """Obtiene el estado de la última descarga de las fuentes (todas si no se indican)
+        
+        Retorna ``{source_id: {'feed_url', 'etag', 'last_modified',
+        'http_status', 'checked_ts', 'changed_ts'}}``; las fuentes aún no
+        descargadas no aparecen.
+        """
+        try:
+            with self.read_snapshot() as conn:
+                if source_ids is None:
+                    cursor = conn.execute("SELECT * FROM feed_fetch_state")
+                else:
+                    cursor = conn.execute(
+                        "SELECT * FROM feed_fetch_state WHERE source_id IN (SELECT value FROM json_each(?))",
+                        (json.dumps([int(source_id) for source_id in source_ids]),)
+                    )
+                return {row['source_id']: dict(row) for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error obteniendo el estado de descarga de las fuentes: {e}")
+            return {}
+    
+    def update_fetch_state(self, source_id: int, feed_url: str, http_status: int,
+                           etag: str = None, last_modified: str = None, wait: bool = False):
+        """Guarda el resultado de la última descarga de una fuente
+        
+        Solo una respuesta 2xx (contenido nuevo) sustituye los validadores;
+        con un 304 o un error se conservan los anteriores salvo que el
+        servidor envíe otros. Por defecto no espera a la escritura y retorna
+        su ``Future``.
+        """
+        keep_validators = not (200 <= (http_status or 0) < 300)
+        now = now_epoch()
+        
+        def job(conn: sqlite3.Connection):
+            conn.execute('''
+                INSERT INTO feed_fetch_state
+                    (source_id, feed_url, etag, last_modified, http_status, checked_ts, changed_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(source_id) DO UPDATE SET
+                    feed_url = excluded.feed_url,
+                    etag = CASE WHEN ? THEN COALESCE(excluded.etag, etag) ELSE excluded.etag END,
+                    last_modified = CASE WHEN ? THEN COALESCE(excluded.last_modified, last_modified)
+                                         ELSE excluded.last_modified END,
+                    http_status = excluded.http_status,
+                    checked_ts = excluded.checked_ts,
+                    changed_ts = COALESCE(excluded.changed_ts, changed_ts)
+            ''', (source_id, feed_url, etag, last_modified, http_status, now,
+                  None if keep_validators else now, keep_validators, keep_validators))
+        
+        try:
+            return self._submit_write(job, wait=wait)
+        except Exception as e:
+            logger.error(f"Error guardando el estado de descarga de la fuente {source_id}: {e}")
+            raise
+
+    def get_due_sources(self, now: int = None) -> List[Dict[str, Any]]:
+        """Obtiene las fuentes activas de feeds cuya próxima consulta ya ha llegado
+
+        Las fuentes nunca planificadas (recién añadidas o anteriores a la
+        planificación) van primero; el resto, de la más atrasada a la menos.
+        """
+        try:
+            with self.read_snapshot() as conn:
+                cursor = conn.execute('''
+                    SELECT s.* FROM data_sources s
+                    LEFT JOIN feed_fetch_state f ON f.source_id = s.id
+                    WHERE s.active = 1 AND s.type IN ('rss', 'youtube')
+                      AND (f.next_check_ts IS NULL OR f.next_check_ts <= ?)
+                    ORDER BY f.next_check_ts IS NOT NULL, f.next_check_ts, s.name
+                ''', (now or now_epoch(),))
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error obteniendo las fuentes pendientes de consulta: {e}")
+            return []
+
+    def get_recent_publish_times(self, source_ids: Iterable[int],
+                                 per_source: int = None) -> Dict[int, List[int]]:
+        """Obtiene las fechas de publicación más recientes de cada fuente
+
+        Retorna ``{source_id: [published_ts, ...]}`` con hasta
+        ``per_source`` fechas (``network.poll_history_items``) por fuente,
+        leídas del índice ``(source_id, published_ts)``.
+        """
+        per_source = per_source or int(config_manager.get('network.poll_history_items', 10))
+        try:
+            with self.read_snapshot() as conn:
+                cursor = conn.execute('''
+                    SELECT source_id, published_ts FROM (
+                        SELECT source_id, published_ts, ROW_NUMBER() OVER (
+                            PARTITION BY source_id ORDER BY published_ts DESC
+                        ) AS position
+                        FROM content_items
+                        WHERE source_id IN (SELECT value FROM json_each(?))
+                          AND published_ts IS NOT NULL
+                    )
+                    WHERE position <= ?
+                ''', (json.dumps([int(source_id) for source_id in source_ids]), per_source))
+                history: Dict[int, List[int]] = {}
+                for source_id, published_ts in cursor.fetchall():
+                    history.setdefault(source_id, []).append(published_ts)
+                return history
+        except Exception as e:
+            logger.error(f"Error obteniendo el historial de publicación de las fuentes: {e}")
+            return {}
+
+    def update_poll_schedule(self, schedule: Dict[int, Any], wait: bool = False):
+        """Guarda la próxima consulta de varias fuentes en una sola escritura
+
+        ``schedule`` es ``{source_id: (next_check_ts, failure_count)}``. Por
+        defecto no espera a la escritura y retorna su ``Future``. Las fuentes
+        borradas mientras tanto se ignoran.
+        """
+        rows = [(source_id, next_check_ts, failure_count, source_id)
+                for source_id, (next_check_ts, failure_count) in schedule.items()]
+        if not rows:
+            return None
+
+        def job(conn: sqlite3.Connection):
+            conn.executemany('''
+                INSERT INTO feed_fetch_state (source_id, next_check_ts, failure_count)
+                SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM data_sources WHERE id = ?)
+                ON CONFLICT(source_id) DO UPDATE SET
+                    next_check_ts = excluded.next_check_ts,
+                    failure_count = excluded.failure_count
+            ''', rows)
+
+        try:
+            return self._submit_write(job, wait=wait)
+        except Exception as e:
+            logger.error(f"Error guardando la planificación de {len(rows)} fuentes: {e}")
+            raise
+
     def add_content_item(self, source_id: int, title: str, url: str,
                         description: str = None, content: str = None,
                         published_date: datetime = None) -> int:
-        """Añade un nuevo item de contenido"""
+        """Añade un nuevo item de contenido
+        
+        La URL se guarda en forma canónica; si otro item tiene la misma URL
+        canónica (p. ej. con parámetros ``utm_*``) retorna None.
+        """
+        canonical_url = canonicalize_url(url)
+        canonical_hash = url_hash(canonical_url)
+        
+        def job(conn: sqlite3.Connection) -> Optional[int]:
+            duplicates, collisions = self._existing_url_hashes(conn, {canonical_hash: canonical_url})
+            if duplicates:
+                return None
+            stored_hash = None if collisions else canonical_hash
+            cursor = conn.execute('''
+                INSERT INTO content_items 
+                (source_id, title, url, url_hash, description,
+                 published_date, published_ts, created_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (source_id, title, canonical_url, stored_hash, description,
+                  format_datetime(published_date), to_epoch(published_date), now_epoch()))
+            item_id = cursor.lastrowid
+            if content is not None:
+                self._write_body(conn, item_id, content=content)
+            return item_id
+        
         try:
-            with self.get_connection() as conn:
-                cursor = conn.execute('''
-                    INSERT INTO content_items 
-                    (source_id, title, url, description, content, published_date)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (source_id, title, url, description, content, published_date))
-                return cursor.lastrowid
+            item_id = self._submit_write(job)
+            if item_id is None:
+                logger.warning(f"Item de contenido ya existe: {url}")
+            return item_id
         except sqlite3.IntegrityError:
             logger.warning(f"Item de contenido ya existe: {url}")
             return None
@@ -150,14 +758,121 @@ class DatabaseManager:
             logger.error(f"Error añadiendo item de contenido: {e}")
             raise
     
+    def add_content_items_bulk(self, source_id: int, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Añade en bloque las entradas de un feed en una única transacción
+
+        Las URLs se normalizan (ver ``canonicalize_url``) y las entradas cuyo
+        hash de URL canónica ya existe, en la base de datos o en el mismo
+        lote, se descartan antes de insertar; ``ON CONFLICT DO NOTHING``
+        cubre cualquier carrera restante. Retorna los ids de los items nuevos
+        y su número.
+        """
+        rows = {}
+        created_ts = now_epoch()
+        for entry in entries:
+            if not entry.get('url'):
+                continue
+            canonical_url = canonicalize_url(entry['url'])
+            canonical_hash = url_hash(canonical_url)
+            if canonical_hash in rows:
+                continue
+            rows[canonical_hash] = (
+                source_id,
+                entry.get('title') or 'Sin título',
+                canonical_url,
+                canonical_hash,
+                entry.get('description'),
+                entry.get('thumbnail_url'),
+                # Fecha parseada una sola vez: texto para mostrar y epoch para ordenar
+                format_datetime(entry.get('published_date')),
+                to_epoch(entry.get('published_date')),
+                created_ts
+            )
+
+        inserted_ids = []
+        if not rows:
+            return {'inserted_ids': inserted_ids, 'inserted_count': 0}
+
+        def job(conn: sqlite3.Connection):
+            duplicates, collisions = self._existing_url_hashes(
+                conn, {url_key: row[2] for url_key, row in rows.items()}
+            )
+            # Con una colisión de hash el item se guarda sin hash
+            new_rows = [row if url_key not in collisions else row[:3] + (None,) + row[4:]
+                        for url_key, row in rows.items() if url_key not in duplicates]
+
+            # executemany() descarta las filas de RETURNING, así que se usa
+            # un INSERT multi-fila por bloque dentro de la misma transacción
+            for start in range(0, len(new_rows), self.BULK_INSERT_CHUNK_SIZE):
+                chunk = new_rows[start:start + self.BULK_INSERT_CHUNK_SIZE]
+                placeholders = ', '.join(['(?, ?, ?, ?, ?, ?, ?, ?, ?)'] * len(chunk))
+                params = [value for row in chunk for value in row]
+                cursor = conn.execute(f'''
+                    INSERT INTO content_items
+                    (source_id, title, url, url_hash, description, thumbnail_url,
+                     published_date, published_ts, created_ts)
+                    VALUES {placeholders}
+                    ON CONFLICT DO NOTHING
+                    RETURNING id
+                ''', params)
+                inserted_ids.extend(row[0] for row in cursor.fetchall())
+
+        try:
+            self._submit_write(job)
+            return {'inserted_ids': inserted_ids, 'inserted_count': len(inserted_ids)}
+        except Exception as e:
+            logger.error(f"Error en inserción masiva de items de la fuente {source_id}: {e}")
+            raise
+
+    def _existing_url_hashes(self, conn: sqlite3.Connection,
+                             urls: Dict[int, str]) -> Tuple[set, set]:
+        """Clasifica hashes de URL canónica (``{hash: url}``) según content_items y el archivo
+        
+        Retorna ``(duplicados, colisiones)``: un hash es duplicado si ya hay
+        un item con esa URL, y colisión si lo usa otra URL distinta (el item
+        nuevo se guarda entonces sin hash). Los items sin hash se buscan por
+        URL con un índice parcial.
+        """
+        stored = []
+        hashes = list(urls)
+        for start in range(0, len(hashes), self.ID_LOOKUP_CHUNK_SIZE):
+            chunk = hashes[start:start + self.ID_LOOKUP_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor = conn.execute(f'''
+                SELECT url_hash, url FROM content_items WHERE url_hash IN ({placeholders})
+                UNION ALL
+                SELECT ai.url_hash, a.url FROM archived_items ai
+                JOIN archive.content_items a ON a.id = ai.id
+                WHERE ai.url_hash IN ({placeholders})
+            ''', chunk + chunk)
+            stored.extend(cursor.fetchall())
+        
+        duplicates = {row[0] for row in stored if row[1] == urls[row[0]]}
+        collisions = {row[0] for row in stored} - duplicates
+        
+        colliding_urls = [urls[url_key] for url_key in collisions]
+        for start in range(0, len(colliding_urls), self.ID_LOOKUP_CHUNK_SIZE):
+            chunk = colliding_urls[start:start + self.ID_LOOKUP_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            found = {row[0] for row in conn.execute(f'''
+                SELECT url FROM content_items WHERE url_hash IS NULL AND url IN ({placeholders})
+                UNION ALL
+                SELECT url FROM archive.content_items WHERE url_hash IS NULL AND url IN ({placeholders})
+            ''', chunk + chunk)}
+            duplicates.update(url_key for url_key in collisions if urls[url_key] in found)
+        
+        return duplicates, collisions - duplicates
+
     def get_content_items(self, source_id: int = None, status: str = None) -> List[Dict[str, Any]]:
         """Obtiene items de contenido filtrados"""
         try:
-            with self.get_connection() as conn:
-                query = '''
-                    SELECT ci.*, ds.name as source_name, ds.type as source_type
+            with self.read_snapshot() as conn:
+                query = f'''
+                    SELECT {self.ITEM_COLUMNS}, {self.BODY_COLUMNS},
+                           ds.name as source_name, ds.type as source_type
                     FROM content_items ci
                     JOIN data_sources ds ON ci.source_id = ds.id
+                    LEFT JOIN content_bodies cb ON cb.item_id = ci.id
                 '''
                 params = []
                 
@@ -173,7 +888,7 @@ class DatabaseManager:
                 if conditions:
                     query += " WHERE " + " AND ".join(conditions)
                 
-                query += " ORDER BY ci.published_date DESC, ci.created_at DESC"
+                query += " ORDER BY ci.published_ts DESC, ci.id DESC"
                 
                 cursor = conn.execute(query, params)
                 return [dict(row) for row in cursor.fetchall()]
@@ -181,62 +896,758 @@ class DatabaseManager:
             logger.error(f"Error obteniendo items de contenido: {e}")
             return []
     
-    def update_content_item_status(self, item_id: int, status: str):
-        """Actualiza el estado de un item de contenido"""
+    def get_content_item(self, item_id: int, include_body: bool = False) -> Optional[Dict[str, Any]]:
+        """Obtiene un item de contenido por su id
+        
+        Con ``include_body`` incluye contenido y resumen descomprimidos.
+        """
         try:
-            with self.get_connection() as conn:
+            with self.read_snapshot() as conn:
+                body_columns = f", {self.BODY_COLUMNS}" if include_body else ""
+                body_join = "LEFT JOIN content_bodies cb ON cb.item_id = ci.id" if include_body else ""
+                cursor = conn.execute(f'''
+                    SELECT {self.ITEM_COLUMNS}{body_columns},
+                           ds.name as source_name, ds.type as source_type
+                    FROM content_items ci
+                    JOIN data_sources ds ON ci.source_id = ds.id
+                    {body_join}
+                    WHERE ci.id = ?
+                ''', (item_id,))
+                row = cursor.fetchone()
+                if row is None:
+                    return self._get_archived_item(conn, item_id, include_body)
+                return dict(row)
+        except Exception as e:
+            logger.error(f"Error obteniendo item de contenido {item_id}: {e}")
+            return None
+    
+    def _get_archived_item(self, conn: sqlite3.Connection, item_id: int,
+                           include_body: bool = False) -> Optional[Dict[str, Any]]:
+        """Obtiene un item de la base de datos de archivo (con ``archived`` = 1)"""
+        body_columns = ", pp_inflate(a.content) as content, pp_inflate(a.summary) as summary" \
+            if include_body else ""
+        row = conn.execute(f'''
+            SELECT {self.ARCHIVE_ITEM_COLUMNS}{body_columns},
+                   ds.name as source_name, ds.type as source_type
+            FROM archive.content_items a
+            JOIN data_sources ds ON a.source_id = ds.id
+            WHERE a.id = ?
+        ''', (item_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def get_content_body(self, item_id: int) -> Dict[str, Optional[str]]:
+        """Obtiene el contenido y el resumen (descomprimidos) de un item"""
+        try:
+            with self.read_snapshot() as conn:
+                row = conn.execute(
+                    "SELECT content, summary FROM content_bodies WHERE item_id = ?",
+                    (item_id,)
+                ).fetchone()
+                if not row:
+                    row = conn.execute(
+                        "SELECT content, summary FROM archive.content_items WHERE id = ?",
+                        (item_id,)
+                    ).fetchone()
+                if not row:
+                    return {'content': None, 'summary': None}
+                return {
+                    'content': decompress_text(row['content']),
+                    'summary': decompress_text(row['summary'])
+                }
+        except Exception as e:
+            logger.error(f"Error obteniendo textos del item {item_id}: {e}")
+            return {'content': None, 'summary': None}
+    
+    def _write_body(self, conn: sqlite3.Connection, item_id: int,
+                    content: str = None, summary: str = None):
+        """Guarda comprimidos los textos indicados (None = sin cambios) y sus indicadores"""
+        columns = {}
+        if content is not None:
+            columns['content'] = compress_text(content)
+        if summary is not None:
+            columns['summary'] = compress_text(summary)
+        if not columns:
+            return
+        
+        names = ', '.join(columns)
+        placeholders = ', '.join('?' * len(columns))
+        updates = ', '.join(f"{name} = excluded.{name}" for name in columns)
+        conn.execute(f'''
+            INSERT INTO content_bodies (item_id, {names}) VALUES (?, {placeholders})
+            ON CONFLICT (item_id) DO UPDATE SET {updates}, updated_at = CURRENT_TIMESTAMP
+        ''', [item_id] + list(columns.values()))
+        
+        flags = []
+        params = []
+        if content is not None:
+            flags.append("has_content = ?")
+            params.append(int(bool(content.strip())))
+        if summary is not None:
+            flags.append("has_summary = ?")
+            params.append(int(bool(summary.strip())))
+        conn.execute(
+            f"UPDATE content_items SET {', '.join(flags)}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            params + [item_id]
+        )
+    
+    def get_content_items_by_ids(self, item_ids: List[int], as_items: bool = False) -> List[Any]:
+        """Obtiene varios items por id mediante búsquedas indexadas (sin textos largos)
+        
+        Como ``get_content_item``, los ids que no están en la base principal
+        se buscan en la de archivo (con ``archived`` = 1). Con ``as_items``
+        retorna ContentItem (con carga diferida de los textos) creados
+        directamente desde las filas.
+        """
+        items = []
+        if not item_ids:
+            return items
+        
+        try:
+            with self.read_snapshot() as conn:
+                for start in range(0, len(item_ids), self.ID_LOOKUP_CHUNK_SIZE):
+                    chunk = list(item_ids[start:start + self.ID_LOOKUP_CHUNK_SIZE])
+                    placeholders = ', '.join('?' * len(chunk))
+                    cursor = self._item_cursor(conn, as_items)
+                    cursor.execute(f'''
+                        SELECT {self.ITEM_COLUMNS}, ds.name as source_name, ds.type as source_type
+                        FROM content_items ci
+                        JOIN data_sources ds ON ci.source_id = ds.id
+                        WHERE ci.id IN ({placeholders})
+                    ''', chunk)
+                    rows = self._fetch_rows(cursor, as_items)
+                    items.extend(rows)
+                    
+                    found = {row['id'] if isinstance(row, dict) else row.id for row in rows}
+                    archived = [item_id for item_id in chunk if item_id not in found]
+                    if archived:
+                        cursor = self._item_cursor(conn, as_items)
+                        cursor.execute(f'''
+                            SELECT {self.ARCHIVE_ITEM_COLUMNS}, ds.name as source_name, ds.type as source_type
+                            FROM archive.content_items a
+                            JOIN data_sources ds ON a.source_id = ds.id
+                            WHERE a.id IN ({', '.join('?' * len(archived))})
+                        ''', archived)
+                        items.extend(self._fetch_rows(cursor, as_items))
+            return items
+        except Exception as e:
+            logger.error(f"Error obteniendo items de contenido por id: {e}")
+            return []
+    
+    def get_content_list(self, source_id: int = None, status: str = None,
+                         limit: int = 100, cursor: tuple = None,
+                         as_items: bool = False) -> Dict[str, Any]:
+        """Obtiene una página del listado de contenido con paginación por cursor
+
+        Solo proyecta las columnas que necesita la lista (sin texto completo,
+        resumen ni transcripción). ``cursor`` es la tupla ``(published_ts, id)``
+        del último item de la página anterior; se retorna ``next_cursor`` para
+        pedir la siguiente o ``None`` si no hay más. Con ``as_items`` los
+        items son ContentItem en lugar de diccionarios.
+        """
+        try:
+            with self.read_snapshot() as conn:
+                base_conditions = []
+                base_params = []
+
+                if source_id:
+                    base_conditions.append("ci.source_id = ?")
+                    base_params.append(source_id)
+
+                if status:
+                    base_conditions.append("ci.status = ?")
+                    base_params.append(status)
+
+                items = []
+
+                # Primero los items con fecha (ORDER BY ... DESC deja los NULL al final)
+                if cursor is None or cursor[0] is not None:
+                    conditions = base_conditions + ["ci.published_ts IS NOT NULL"]
+                    params = list(base_params)
+                    if cursor is not None:
+                        conditions.append("(ci.published_ts, ci.id) < (?, ?)")
+                        params.extend(cursor)
+                    items.extend(self._fetch_content_list_page(conn, conditions, params, limit, as_items))
+
+                # Después los items sin fecha de publicación, ordenados por id
+                if len(items) < limit:
+                    conditions = base_conditions + ["ci.published_ts IS NULL"]
+                    params = list(base_params)
+                    if cursor is not None and cursor[0] is None:
+                        conditions.append("ci.id < ?")
+                        params.append(cursor[1])
+                    items.extend(self._fetch_content_list_page(
+                        conn, conditions, params, limit - len(items), as_items
+                    ))
+
+                next_cursor = None
+                if len(items) == limit:
+                    last = items[-1]
+                    next_cursor = (last.published_ts, last.id) if as_items else \
+                        (last['published_ts'], last['id'])
+
+                return {'items': items, 'next_cursor': next_cursor}
+        except Exception as e:
+            logger.error(f"Error obteniendo listado de contenido: {e}")
+            return {'items': [], 'next_cursor': None}
+
+    def _fetch_content_list_page(self, conn: sqlite3.Connection, conditions: List[str],
+                                 params: List[Any], limit: int, as_items: bool = False) -> List[Any]:
+        """Ejecuta una consulta de página del listado con las columnas mínimas"""
+        query = f'''
+            SELECT ci.id, ci.source_id, ci.title, ci.url,
+                   substr(ci.description, 1, {self.LIST_DESCRIPTION_LENGTH}) as description,
+                   ci.audio_file, ci.thumbnail_url, ci.status, ci.published_date,
+                   ci.published_ts, ci.has_summary,
+                   ds.name as source_name, ds.type as source_type
+            FROM content_items ci
+            JOIN data_sources ds ON ci.source_id = ds.id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY ci.published_ts DESC, ci.id DESC
+            LIMIT ?
+        '''
+        cursor = self._item_cursor(conn, as_items)
+        cursor.execute(query, params + [limit])
+        return self._fetch_rows(cursor, as_items)
+
+    def _item_cursor(self, conn: sqlite3.Connection, as_items: bool) -> sqlite3.Cursor:
+        """Cursor que crea ContentItem directamente desde las filas (o filas sqlite3.Row)"""
+        cursor = conn.cursor()
+        if as_items:
+            cursor.row_factory = ContentItem.row_factory(body_loader=self.get_content_body)
+        return cursor
+
+    @staticmethod
+    def _fetch_rows(cursor: sqlite3.Cursor, as_items: bool) -> List[Any]:
+        """Filas del cursor como items o como diccionarios"""
+        rows = cursor.fetchall()
+        return rows if as_items else [dict(row) for row in rows]
+
+    def get_content_list_items(self, item_ids: List[int], as_items: bool = False) -> List[Any]:
+        """Obtiene filas del listado (mismas columnas que get_content_list) por id"""
+        items = []
+        if not item_ids:
+            return items
+        
+        try:
+            with self.read_snapshot() as conn:
+                for start in range(0, len(item_ids), self.ID_LOOKUP_CHUNK_SIZE):
+                    chunk = list(item_ids[start:start + self.ID_LOOKUP_CHUNK_SIZE])
+                    placeholders = ', '.join('?' * len(chunk))
+                    items.extend(self._fetch_content_list_page(
+                        conn, [f"ci.id IN ({placeholders})"], chunk, len(chunk), as_items
+                    ))
+            return items
+        except Exception as e:
+            logger.error(f"Error obteniendo filas del listado por id: {e}")
+            return []
+
+    def search(self, query: str, source_id: int = None, limit: int = 50,
+               offset: int = 0, status: str = None, include_archive: bool = True) -> List[Dict[str, Any]]:
+        """Busca items por texto completo ordenados por relevancia (bm25)
+
+        Busca en título, descripción, contenido y resumen de toda la
+        biblioteca o de una sola fuente (opcionalmente filtrando por estado),
+        y retorna un fragmento con las coincidencias de cada resultado. Con
+        ``include_archive`` también busca en la base de datos de archivo
+        (resultados con ``archived`` = 1). Las puntuaciones bm25 de dos
+        índices no son comparables: los resultados archivados van, por
+        relevancia, detrás de todos los activos.
+        """
+        match_query = self._build_match_query(query)
+        if not match_query:
+            return []
+        
+        try:
+            with self.read_snapshot() as conn:
+                sources = [('''
+                    SELECT ci.id, ci.source_id, ci.title, ci.url, ci.audio_file,
+                           ci.thumbnail_url, ci.status, ci.published_date,
+                           ci.published_ts, ci.has_summary, 0 as archived,
+                           ds.name as source_name, ds.type as source_type,
+                           snippet(content_items_fts, -1, '«', '»', '…', 16) as snippet,
+                           bm25(content_items_fts, 10.0, 4.0, 1.0, 2.0) as rank
+                    FROM content_items_fts
+                    JOIN content_items ci ON ci.id = content_items_fts.rowid
+                    JOIN data_sources ds ON ci.source_id = ds.id
+                    WHERE content_items_fts MATCH ?
+                ''', 'ci')]
+                if include_archive:
+                    sources.append(('''
+                        SELECT a.id, a.source_id, a.title, a.url, a.audio_file,
+                               a.thumbnail_url, a.status, a.published_date,
+                               a.published_ts, a.summary IS NOT NULL as has_summary, 1 as archived,
+                               ds.name as source_name, ds.type as source_type,
+                               snippet(archive_fts, -1, '«', '»', '…', 16) as snippet,
+                               bm25(archive_fts, 10.0, 4.0, 1.0, 2.0) as rank
+                        FROM archive.archive_fts
+                        JOIN archive.content_items a ON a.id = archive_fts.rowid
+                        JOIN archived_items ai ON ai.id = a.id
+                        JOIN data_sources ds ON a.source_id = ds.id
+                        WHERE archive_fts MATCH ?
+                    ''', 'a'))
+                
+                results = []
+                skip = offset
+                for sql, alias in sources:
+                    params = [match_query]
+                    
+                    if source_id:
+                        sql += f" AND {alias}.source_id = ?"
+                        params.append(source_id)
+                    
+                    if status:
+                        sql += f" AND {alias}.status = ?"
+                        params.append(status)
+                    
+                    sql += " ORDER BY rank LIMIT ? OFFSET ?"
+                    params.extend([limit - len(results), skip])
+                    
+                    rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+                    results.extend(rows)
+                    if len(results) >= limit:
+                        break
+                    
+                    # El siguiente índice continúa donde se agotó este: si la
+                    # página empezaba más allá de sus resultados, se descuentan
+                    if rows or not skip:
+                        skip = 0
+                    else:
+                        skip -= conn.execute(
+                            f"SELECT COUNT(*) FROM ({sql.rsplit(' ORDER BY', 1)[0]})", params[:-2]
+                        ).fetchone()[0]
+                
+                return results
+        except Exception as e:
+            logger.error(f"Error buscando '{query}': {e}")
+            return []
+    
+    @staticmethod
+    def _build_match_query(query: str) -> str:
+        """Convierte el texto del usuario en una consulta FTS5 segura
+        
+        Cada palabra se busca como prefijo entre comillas, de modo que los
+        operadores y la puntuación del usuario no rompen la sintaxis MATCH.
+        """
+        terms = []
+        for word in (query or '').split():
+            word = word.replace('"', '')
+            if word:
+                terms.append(f'"{word}"*')
+        return ' '.join(terms)
+    
+    def update_content_item_status(self, item_id: int, status: str, wait: bool = True):
+        """Actualiza el estado de un item de contenido
+        
+        Con ``wait=False`` retorna el ``Future`` de la escritura sin esperar.
+        """
+        def job(conn: sqlite3.Connection):
+            conn.execute('''
+                UPDATE content_items 
+                SET status = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (status, item_id))
+        
+        try:
+            return self._submit_write(job, wait=wait, item_ids=[item_id])
+        except Exception as e:
+            logger.error(f"Error actualizando estado del item: {e}")
+            raise
+
+    def update_status_by_ids(self, item_ids: Iterable[int], status: str, wait: bool = True):
+        """Cambia el estado de varios items con un único UPDATE
+
+        Los ids se pasan como un array JSON (``json_each``), así que no hay
+        límite de parámetros. Retorna el número de items que cambiaron de
+        estado (o el ``Future`` con ``wait=False``).
+        """
+        item_ids = [int(item_id) for item_id in item_ids]
+        if not item_ids:
+            if wait:
+                return 0
+            future = Future()
+            future.set_result(0)
+            return future
+        return self._update_status_where(
+            status, "id IN (SELECT value FROM json_each(?))", [json.dumps(item_ids)], wait
+        )
+
+    def update_status_by_source(self, source_id: int, status: str, wait: bool = True):
+        """Cambia el estado de todos los items de una fuente con un único UPDATE"""
+        return self.update_status_by_filter(status, source_id=source_id, wait=wait)
+
+    def update_status_by_filter(self, status: str, source_id: int = None,
+                                current_status: str = None, published_before: Any = None,
+                                wait: bool = True):
+        """Cambia el estado de los items que cumplen un filtro con un único UPDATE
+
+        El filtro combina fuente, estado actual y fecha de publicación
+        anterior a ``published_before`` (datetime, texto o epoch). Retorna
+        el número de items que cambiaron de estado.
+        """
+        conditions = []
+        params = []
+        if source_id is not None:
+            conditions.append("source_id = ?")
+            params.append(source_id)
+        if current_status:
+            conditions.append("status = ?")
+            params.append(current_status)
+        if published_before is not None:
+            cutoff = to_epoch(published_before)
+            if cutoff is None:
+                raise ValueError(f"Fecha límite no válida: {published_before!r}")
+            conditions.append("published_ts < ?")
+            params.append(cutoff)
+        return self._update_status_where(status, " AND ".join(conditions) or "1", params, wait)
+
+    def _update_status_where(self, status: str, condition: str, params: List[Any], wait: bool):
+        """UPDATE de estado en una transacción del escritor, avisando de los ids cambiados"""
+        changed_ids: List[int] = []
+
+        def job(conn: sqlite3.Connection) -> int:
+            cursor = conn.execute(f'''
+                UPDATE content_items
+                SET status = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE status != ? AND {condition}
+                RETURNING id
+            ''', [status, status] + params)
+            changed_ids[:] = [row[0] for row in cursor.fetchall()]
+            return len(changed_ids)
+
+        def on_commit(result):
+            if changed_ids:
+                self._notify_items_changed(changed_ids)
+
+        try:
+            future = self.writer.submit(job, on_commit=on_commit)
+            return future.result() if wait else future
+        except Exception as e:
+            logger.error(f"Error actualizando estado de items en bloque: {e}")
+            raise
+
+    def update_content_item_files(self, item_id: int, summary: str = None, audio_file: str = None,
+                                  wait: bool = True):
+        """Actualiza archivos generados de un item
+        
+        Con ``wait=False`` retorna el ``Future`` de la escritura sin esperar.
+        """
+        def job(conn: sqlite3.Connection):
+            if summary is not None:
+                self._write_body(conn, item_id, summary=summary)
+            
+            if audio_file is not None:
                 conn.execute('''
-                    UPDATE content_items 
-                    SET status = ?, updated_at = CURRENT_TIMESTAMP
+                    UPDATE content_items
+                    SET audio_file = ?, updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
-                ''', (status, item_id))
-                conn.commit()
+                ''', (audio_file, item_id))
+        
+        try:
+            return self._submit_write(job, wait=wait, item_ids=[item_id])
         except Exception as e:
-            logger.error(f"Error actualizando estado del item: {e}")
+            logger.error(f"Error actualizando archivos del item: {e}")
             raise
     
-    def update_content_item_files(self, item_id: int, summary: str = None, audio_file: str = None):
-        """Actualiza archivos generados de un item"""
+    def log_processing_action(self, item_id: int, action: str, status: str,
+                              message: str = None) -> Future:
+        """Registra una acción de procesamiento sin bloquear al llamante
+        
+        Retorna el ``Future`` de la escritura por si se quiere esperar.
+        """
+        def job(conn: sqlite3.Connection):
+            conn.execute('''
+                INSERT INTO processing_logs (item_id, action, status, message)
+                VALUES (?, ?, ?, ?)
+            ''', (item_id, action, status, message))
+        
+        def log_error(future: Future):
+            if future.exception() is not None:
+                logger.error(f"Error registrando acción de procesamiento: {future.exception()}")
+        
+        future = self._submit_write(job, wait=False)
+        future.add_done_callback(log_error)
+        return future
+    
+    def prune_processing_logs(self, max_age_days: int = None, max_rows: int = None) -> Dict[str, int]:
+        """Aplica la política de retención del registro de procesamiento
+        
+        Los registros más antiguos que ``max_age_days`` o que exceden los
+        ``max_rows`` más recientes se acumulan en ``processing_log_daily``
+        (conteo por día, acción y estado) y después se eliminan, por lotes
+        para no bloquear al escritor. Retorna ``{'pruned'}``.
+        """
+        if max_age_days is None:
+            max_age_days = config_manager.get('database.log_retention_days', 90)
+        if max_rows is None:
+            max_rows = config_manager.get('database.log_retention_max_rows', 100000)
+        
         try:
-            with self.get_connection() as conn:
-                updates = []
-                params = []
+            conn = self.get_connection()
+            cutoff_id = 0
+            if max_age_days:
+                row = conn.execute(
+                    "SELECT MAX(id) FROM processing_logs WHERE created_at < datetime('now', ?)",
+                    (f"-{int(max_age_days)} days",)
+                ).fetchone()
+                cutoff_id = max(cutoff_id, row[0] or 0)
+            if max_rows:
+                row = conn.execute(
+                    "SELECT id FROM processing_logs ORDER BY id DESC LIMIT 1 OFFSET ?",
+                    (int(max_rows),)
+                ).fetchone()
+                cutoff_id = max(cutoff_id, row[0] if row else 0)
+            
+            pruned = 0
+            while cutoff_id:
+                batch_pruned = self._submit_write(
+                    lambda conn: self._prune_processing_logs_batch(conn, cutoff_id)
+                )
+                if not batch_pruned:
+                    break
+                pruned += batch_pruned
+            
+            if pruned:
+                logger.info(f"Registro de procesamiento: {pruned} entradas resumidas y purgadas")
+            return {'pruned': pruned}
+        except Exception as e:
+            logger.error(f"Error aplicando la retención del registro de procesamiento: {e}")
+            return {'pruned': 0}
+    
+    def _prune_processing_logs_batch(self, conn: sqlite3.Connection, cutoff_id: int) -> int:
+        """Resume y elimina el siguiente lote de registros con id <= cutoff_id"""
+        row = conn.execute(
+            "SELECT MIN(id) FROM processing_logs WHERE id <= ?", (cutoff_id,)
+        ).fetchone()
+        if row[0] is None:
+            return 0
+        batch_end = min(cutoff_id, row[0] + self.LOG_PRUNE_BATCH_SIZE - 1)
+        
+        conn.execute('''
+            INSERT INTO processing_log_daily (day, action, status, log_count)
+            SELECT date(created_at), action, status, COUNT(*)
+            FROM processing_logs
+            WHERE id <= ?
+            GROUP BY date(created_at), action, status
+            ON CONFLICT (day, action, status) DO UPDATE SET log_count = log_count + excluded.log_count
+        ''', (batch_end,))
+        return conn.execute("DELETE FROM processing_logs WHERE id <= ?", (batch_end,)).rowcount
+    
+    def get_processing_log_summary(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Obtiene los conteos diarios por acción y estado de los últimos días
+        
+        Combina el resumen de los registros ya purgados con los registros
+        todavía presentes en ``processing_logs``.
+        """
+        try:
+            with self.read_snapshot() as conn:
+                since = f"-{int(days)} days"
+                cursor = conn.execute('''
+                    SELECT day, action, status, SUM(log_count) as count
+                    FROM (
+                        SELECT day, action, status, log_count
+                        FROM processing_log_daily
+                        WHERE day >= date('now', ?)
+                        UNION ALL
+                        SELECT date(created_at), action, status, COUNT(*)
+                        FROM processing_logs
+                        WHERE created_at >= date('now', ?)
+                        GROUP BY date(created_at), action, status
+                    )
+                    GROUP BY day, action, status
+                    ORDER BY day DESC, action, status
+                ''', (since, since))
+                return [dict(row) for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Error obteniendo resumen del registro de procesamiento: {e}")
+            return []
+    
+    def archive_items(self, max_age_days: int = None, batch_size: int = None) -> Dict[str, int]:
+        """Mueve a la base de datos de archivo los items antiguos escuchados o ignorados
+        
+        Las transacciones con ATTACH en modo WAL no son atómicas entre
+        ficheros (SQLite confirma ``main`` antes que ``archive``), así que
+        cada lote se mueve en dos escrituras: primero se copia completo a
+        ``archive.content_items`` (con su índice de búsqueda) y se confirma,
+        y después se borran de la base principal solo los items cuya copia
+        ya está guardada, dejando su entrada en ``archived_items``. Una
+        interrupción entre ambas deja el item en la base principal y una
+        copia pendiente (invisible hasta tener entrada en ``archived_items``)
+        que se sustituye en la siguiente pasada. Retorna ``{'archived'}``.
+        """
+        if max_age_days is None:
+            max_age_days = config_manager.get('database.archive_after_days', 180)
+        if batch_size is None:
+            batch_size = config_manager.get('database.archive_batch_size', 500)
+        
+        cutoff_ts = now_epoch() - int(max_age_days) * 86400
+        archived = 0
+        try:
+            while True:
+                ids = self._submit_write(
+                    lambda conn: self._archive_copy(conn, cutoff_ts, int(batch_size))
+                )
+                if not ids:
+                    break
+                batch_archived = self._submit_write(lambda conn: self._archive_remove(conn, ids))
+                if batch_archived < len(ids):
+                    # Items modificados entre las dos escrituras: siguen en la base principal
+                    self._submit_write(lambda conn: self._drop_pending_archive_copies(conn, ids))
+                archived += batch_archived
+            
+            if archived:
+                logger.info(f"{archived} items movidos a la base de datos de archivo")
+            return {'archived': archived}
+        except Exception as e:
+            logger.error(f"Error archivando items: {e}")
+            return {'archived': archived}
+    
+    def _archive_copy(self, conn: sqlite3.Connection, cutoff_ts: int, batch_size: int) -> List[int]:
+        """Copia un lote de items archivables al archivo; retorna sus ids
+        
+        Solo escribe en ``archive``; INSERT OR REPLACE la hace repetible.
+        """
+        placeholders = ', '.join('?' * len(self.ARCHIVABLE_STATUSES))
+        ids = [row[0] for row in conn.execute(f'''
+            SELECT id FROM content_items
+            WHERE status IN ({placeholders}) AND COALESCE(published_ts, created_ts) < ?
+            ORDER BY id LIMIT ?
+        ''', (*self.ARCHIVABLE_STATUSES, cutoff_ts, batch_size))]
+        if not ids:
+            return ids
+        
+        id_placeholders = ', '.join('?' * len(ids))
+        conn.execute(f'''
+            INSERT OR REPLACE INTO archive.content_items
+            (id, source_id, title, url, url_hash, description, content, summary, audio_file,
+             thumbnail_url, status, published_date, published_ts, created_at, created_ts,
+             updated_at, archived_ts)
+            SELECT ci.id, ci.source_id, ci.title, ci.url, ci.url_hash, ci.description,
+                   cb.content, cb.summary, ci.audio_file, ci.thumbnail_url, ci.status,
+                   ci.published_date, ci.published_ts, ci.created_at, ci.created_ts,
+                   ci.updated_at, ?
+            FROM content_items ci
+            LEFT JOIN content_bodies cb ON cb.item_id = ci.id
+            WHERE ci.id IN ({id_placeholders})
+        ''', [now_epoch()] + ids)
+        
+        conn.execute(f"DELETE FROM archive.archive_fts WHERE rowid IN ({id_placeholders})", ids)
+        conn.execute(f'''
+            INSERT INTO archive.archive_fts (rowid, title, description, content, summary)
+            SELECT id, title, description, pp_inflate(content), pp_inflate(summary)
+            FROM archive.content_items WHERE id IN ({id_placeholders})
+        ''', ids)
+        return ids
+    
+    def _archive_remove(self, conn: sqlite3.Connection, ids: List[int]) -> int:
+        """Retira de la base principal los items con copia ya confirmada en el archivo
+        
+        Solo escribe en ``main``. Se omiten los items cambiados después de
+        copiarlos (estado o ``updated_at`` distintos de la copia). Retorna
+        cuántos se movieron.
+        """
+        id_placeholders = ', '.join('?' * len(ids))
+        confirmed = [row[0] for row in conn.execute(f'''
+            SELECT ci.id FROM content_items ci
+            JOIN archive.content_items a ON a.id = ci.id
+            WHERE ci.id IN ({id_placeholders})
+              AND a.status IS ci.status AND a.updated_at IS ci.updated_at
+        ''', ids)]
+        if not confirmed:
+            return 0
+        
+        id_placeholders = ', '.join('?' * len(confirmed))
+        conn.execute(f'''
+            INSERT OR REPLACE INTO archived_items
+            (id, source_id, status, url_hash, published_ts, archived_ts)
+            SELECT id, source_id, status, url_hash, published_ts, ?
+            FROM content_items WHERE id IN ({id_placeholders})
+        ''', [now_epoch()] + confirmed)
+        
+        # Los triggers retiran el cuerpo, el índice FTS y los contadores
+        conn.execute(f"DELETE FROM content_items WHERE id IN ({id_placeholders})", confirmed)
+        return len(confirmed)
+    
+    def _drop_pending_archive_copies(self, conn: sqlite3.Connection, ids: List[int]):
+        """Borra del archivo las copias de items que siguen en la base principal"""
+        id_placeholders = ', '.join('?' * len(ids))
+        pending = f"id IN ({id_placeholders}) AND id NOT IN (SELECT id FROM archived_items)"
+        conn.execute(f'''
+            DELETE FROM archive.archive_fts
+            WHERE rowid IN (SELECT id FROM archive.content_items WHERE {pending})
+        ''', ids)
+        conn.execute(f"DELETE FROM archive.content_items WHERE {pending}", ids)
+    
+    def get_change_version(self) -> int:
+        """Versión actual del registro de cambios (0 si no hay cambios)"""
+        with self.read_snapshot() as conn:
+            row = conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'change_log'"
+            ).fetchone()
+        return row[0] if row else 0
+    
+    def get_changes_since(self, version: int) -> Dict[str, Any]:
+        """Obtiene las filas cambiadas desde una versión del registro de cambios
+        
+        Retorna ``{'version', 'reset', 'content_items': {id: op},
+        'data_sources': {id: op}}`` con ``op`` igual a ``'upsert'`` o
+        ``'delete'`` (último cambio de cada fila). ``reset`` indica que hay
+        que recargar por completo: el registro ya se recortó por encima de
+        ``version`` o hay demasiados cambios para aplicarlos uno a uno.
+        """
+        changes = {'version': version, 'reset': False, 'content_items': {}, 'data_sources': {}}
+        
+        try:
+            with self.read_snapshot() as conn:
+                current = self.get_change_version()
+                if current <= version:
+                    changes['version'] = current
+                    return changes
                 
-                if summary is not None:
-                    updates.append("summary = ?")
-                    params.append(summary)
+                oldest = conn.execute("SELECT MIN(version) FROM change_log").fetchone()[0]
+                pending = conn.execute(
+                    "SELECT COUNT(*) FROM change_log WHERE version > ?", (version,)
+                ).fetchone()[0]
+                if oldest is None or oldest > version + 1 or pending > self.MAX_INCREMENTAL_CHANGES:
+                    changes['version'] = current
+                    changes['reset'] = True
+                    return changes
                 
-                if audio_file is not None:
-                    updates.append("audio_file = ?")
-                    params.append(audio_file)
+                cursor = conn.execute('''
+                    SELECT version, table_name, row_id, op FROM change_log
+                    WHERE version > ? ORDER BY version
+                ''', (version,))
+                for row_version, table_name, row_id, op in cursor.fetchall():
+                    if table_name in changes:
+                        changes[table_name][row_id] = 'delete' if op == 'D' else 'upsert'
+                    changes['version'] = row_version
                 
-                if updates:
-                    updates.append("updated_at = CURRENT_TIMESTAMP")
-                    params.append(item_id)
-                    
-                    query = f"UPDATE content_items SET {', '.join(updates)} WHERE id = ?"
-                    conn.execute(query, params)
-                    conn.commit()
+                return changes
         except Exception as e:
-            logger.error(f"Error actualizando archivos del item: {e}")
-            raise
+            logger.error(f"Error obteniendo cambios desde la versión {version}: {e}")
+            changes['reset'] = True
+            return changes
     
-    def log_processing_action(self, item_id: int, action: str, status: str, message: str = None):
-        """Registra una acción de procesamiento"""
+    def trim_change_log(self, max_rows: int = None) -> int:
+        """Recorta el registro de cambios dejando las ``max_rows`` versiones más recientes"""
+        if max_rows is None:
+            max_rows = config_manager.get('database.change_log_max_rows', 10000)
+        
+        def job(conn: sqlite3.Connection) -> int:
+            return conn.execute(
+                "DELETE FROM change_log WHERE version <= (SELECT MAX(version) FROM change_log) - ?",
+                (int(max_rows),)
+            ).rowcount
+        
         try:
-            with self.get_connection() as conn:
-                conn.execute('''
-                    INSERT INTO processing_logs (item_id, action, status, message)
-                    VALUES (?, ?, ?, ?)
-                ''', (item_id, action, status, message))
-                conn.commit()
+            return self._submit_write(job)
         except Exception as e:
-            logger.error(f"Error registrando acción de procesamiento: {e}")
+            logger.error(f"Error recortando el registro de cambios: {e}")
+            return 0
     
     def get_item_count_by_source(self, source_id: int) -> int:
         """Obtiene el número de items de una fuente"""
         try:
-            with self.get_connection() as conn:
+            with self.read_snapshot() as conn:
                 cursor = conn.execute(
                     "SELECT COUNT(*) FROM content_items WHERE source_id = ?",
                     (source_id,)
@@ -246,10 +1657,72 @@ class DatabaseManager:
             logger.error(f"Error obteniendo conteo de items: {e}")
             return 0
 
+    def get_content_stats(self, include_archive: bool = True) -> Dict[str, Any]:
+        """Obtiene los conteos de items por fuente y por estado en una sola consulta
+        
+        Retorna ``{'total', 'archived', 'by_status': {estado: n},
+        'by_source': {source_id: {'total', 'by_status'}}}``. Con
+        ``include_archive`` los conteos incluyen los items archivados (leídos
+        del índice ``archived_items``), que también se suman en ``archived``.
+        """
+        stats = {'total': 0, 'archived': 0, 'by_status': {}, 'by_source': {}}
+        
+        try:
+            with self.read_snapshot() as conn:
+                if self._has_stats_counters(conn):
+                    cursor = conn.execute('''
+                        SELECT source_id, status, item_count
+                        FROM content_counters
+                        WHERE item_count > 0
+                    ''')
+                else:
+                    cursor = conn.execute('''
+                        SELECT source_id, COALESCE(status, 'nuevo'), COUNT(*)
+                        FROM content_items
+                        GROUP BY source_id, COALESCE(status, 'nuevo')
+                    ''')
+                rows = cursor.fetchall()
+                
+                if include_archive:
+                    archived = conn.execute('''
+                        SELECT source_id, COALESCE(status, 'nuevo'), COUNT(*)
+                        FROM archived_items
+                        GROUP BY source_id, COALESCE(status, 'nuevo')
+                    ''').fetchall()
+                    stats['archived'] = sum(count for _, _, count in archived)
+                    rows.extend(archived)
+                
+                for source_id, status, count in rows:
+                    stats['total'] += count
+                    stats['by_status'][status] = stats['by_status'].get(status, 0) + count
+                    
+                    source_stats = stats['by_source'].setdefault(
+                        source_id, {'total': 0, 'by_status': {}}
+                    )
+                    source_stats['total'] += count
+                    source_stats['by_status'][status] = source_stats['by_status'].get(status, 0) + count
+                
+                return stats
+        except Exception as e:
+            logger.error(f"Error obteniendo estadísticas de contenido: {e}")
+            return stats
+    
+    def _has_stats_counters(self, conn: sqlite3.Connection) -> bool:
+        """Indica si la tabla de contadores está activa"""
+        if not config_manager.get('database.stats_counters', True):
+            return False
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'content_counters'"
+        ).fetchone() is not None
+    
     def get_source_deletion_info(self, source_id: int) -> Dict[str, Any]:
-        """Obtiene información detallada sobre lo que se eliminará al borrar una fuente"""
+        """Obtiene información detallada sobre lo que se eliminará al borrar una fuente
+        
+        ``total_items`` y los archivos de audio incluyen los items archivados
+        de la fuente (``archived_items`` indica cuántos son).
+        """
         try:
-            with self.get_connection() as conn:
+            with self.read_snapshot() as conn:
                 # Información de la fuente
                 source_cursor = conn.execute(
                     "SELECT name, type, url FROM data_sources WHERE id = ?",
@@ -260,26 +1733,29 @@ class DatabaseManager:
                 if not source_row:
                     return None
                 
-                # Contar items de contenido
+                # Contar items de contenido (también los archivados, que se borran con la fuente)
                 items_cursor = conn.execute(
                     "SELECT COUNT(*) FROM content_items WHERE source_id = ?",
                     (source_id,)
                 )
-                total_items = items_cursor.fetchone()[0]
-                
-                # Contar archivos de audio existentes
-                audio_cursor = conn.execute(
-                    "SELECT COUNT(*) FROM content_items WHERE source_id = ? AND audio_file IS NOT NULL AND audio_file != ''",
+                archived_items = conn.execute(
+                    "SELECT COUNT(*) FROM archived_items WHERE source_id = ?",
                     (source_id,)
-                )
-                audio_files = audio_cursor.fetchone()[0]
+                ).fetchone()[0]
+                total_items = items_cursor.fetchone()[0] + archived_items
                 
                 # Obtener lista de archivos de audio para eliminación física
                 audio_files_cursor = conn.execute(
-                    "SELECT audio_file FROM content_items WHERE source_id = ? AND audio_file IS NOT NULL AND audio_file != ''",
-                    (source_id,)
+                    """SELECT audio_file FROM content_items
+                       WHERE source_id = ? AND audio_file IS NOT NULL AND audio_file != ''
+                       UNION ALL
+                       SELECT a.audio_file FROM archive.content_items a
+                       JOIN archived_items ai ON ai.id = a.id
+                       WHERE ai.source_id = ? AND a.audio_file IS NOT NULL AND a.audio_file != ''""",
+                    (source_id, source_id)
                 )
                 audio_file_paths = [row[0] for row in audio_files_cursor.fetchall()]
+                audio_files = len(audio_file_paths)
                 
                 # Contar logs de procesamiento
                 logs_cursor = conn.execute(
@@ -295,6 +1771,7 @@ class DatabaseManager:
                     'source_type': source_row[1],
                     'source_url': source_row[2],
                     'total_items': total_items,
+                    'archived_items': archived_items,
                     'audio_files_count': audio_files,
                     'audio_file_paths': audio_file_paths,
                     'processing_logs': processing_logs
@@ -304,63 +1781,119 @@ class DatabaseManager:
             logger.error(f"Error obteniendo información de eliminación: {e}")
             return None
 
-    def delete_data_source_and_content(self, source_id: int) -> bool:
-        """Elimina una fuente de datos y todo su contenido asociado"""
+    def delete_data_source_and_content(self, source_id: int, batch_size: int = None,
+                                       progress_callback: Callable[[int, int, List[str]], None] = None) -> bool:
+        """Elimina una fuente de datos y todo su contenido asociado
+        
+        La fuente se desactiva primero (las actualizaciones dejan de
+        ingerir en ella) y sus items se borran en lotes de ``batch_size``,
+        cada uno en su propia transacción del escritor; los registros de
+        procesamiento y los textos se borran en cascada. Después se borran
+        sus items archivados y, por último, la fuente.
+        
+        ``progress_callback(borrados, total, archivos_audio)`` se invoca tras
+        confirmar cada lote con las rutas de audio de los items borrados,
+        para que el llamador elimine los archivos fuera de la transacción.
+        """
+        batch_size = batch_size or int(config_manager.get('database.delete_batch_size',
+                                                          self.SOURCE_DELETE_BATCH_SIZE))
         try:
-            with self.get_connection() as conn:
-                # Verificar que la fuente existe
-                cursor = conn.execute("SELECT id FROM data_sources WHERE id = ?", (source_id,))
-                if not cursor.fetchone():
-                    logger.warning(f"Fuente de datos no encontrada: {source_id}")
-                    return False
-                
-                # Eliminar logs de procesamiento primero (por foreign key)
-                conn.execute("""
-                    DELETE FROM processing_logs 
-                    WHERE item_id IN (
-                        SELECT id FROM content_items WHERE source_id = ?
-                    )
-                """, (source_id,))
-                
-                # Eliminar items de contenido
-                conn.execute("DELETE FROM content_items WHERE source_id = ?", (source_id,))
-                
-                # Eliminar la fuente de datos
-                conn.execute("DELETE FROM data_sources WHERE id = ?", (source_id,))
-                
-                conn.commit()
-                logger.info(f"Fuente de datos {source_id} y todo su contenido eliminado exitosamente")
-                return True
+            conn = self.get_connection()
+            if not conn.execute("SELECT id FROM data_sources WHERE id = ?", (source_id,)).fetchone():
+                logger.warning(f"Fuente de datos no encontrada: {source_id}")
+                return False
+            
+            total = conn.execute('''
+                SELECT (SELECT COUNT(*) FROM content_items WHERE source_id = ?) +
+                       (SELECT COUNT(*) FROM archived_items WHERE source_id = ?)
+            ''', (source_id, source_id)).fetchone()[0]
+            
+            self.writer.submit(lambda c: c.execute(
+                "UPDATE data_sources SET active = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (source_id,)
+            )).result()
+            
+            deleted = 0
+            for delete_batch in (self._delete_source_items_batch, self._delete_archived_items_batch):
+                while True:
+                    rows = self.writer.submit(
+                        lambda c: delete_batch(c, source_id, batch_size)
+                    ).result()
+                    if not rows:
+                        break
+                    deleted += len(rows)
+                    self._notify_items_changed([item_id for item_id, _ in rows])
+                    if progress_callback is not None:
+                        progress_callback(deleted, max(total, deleted),
+                                          [audio_file for _, audio_file in rows if audio_file])
+            
+            # La cascada cubre los items que se hayan colado entre lotes
+            self.writer.submit(
+                lambda c: c.execute("DELETE FROM data_sources WHERE id = ?", (source_id,))
+            ).result()
+            
+            self._notify_items_changed(source_id=source_id)
+            logger.info(f"Fuente de datos {source_id} y todo su contenido eliminado exitosamente "
+                        f"({deleted} items)")
+            return True
                 
         except Exception as e:
             logger.error(f"Error eliminando fuente de datos {source_id}: {e}")
             return False
+    
+    @staticmethod
+    def _delete_source_items_batch(conn: sqlite3.Connection, source_id: int,
+                                   batch_size: int) -> List[tuple]:
+        """Borra un lote de items de una fuente; retorna sus (id, audio_file)"""
+        cursor = conn.execute('''
+            DELETE FROM content_items
+            WHERE id IN (SELECT id FROM content_items WHERE source_id = ? LIMIT ?)
+            RETURNING id, audio_file
+        ''', (source_id, batch_size))
+        return [tuple(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _delete_archived_items_batch(conn: sqlite3.Connection, source_id: int,
+                                     batch_size: int) -> List[tuple]:
+        """Borra un lote de items archivados de una fuente; retorna sus (id, audio_file)"""
+        item_ids = [row[0] for row in conn.execute(
+            "SELECT id FROM archived_items WHERE source_id = ? LIMIT ?", (source_id, batch_size)
+        )]
+        if not item_ids:
+            return []
+        
+        ids_json = json.dumps(item_ids)
+        conn.execute(
+            "DELETE FROM archive.archive_fts WHERE rowid IN (SELECT value FROM json_each(?))", (ids_json,)
+        )
+        rows = conn.execute('''
+            DELETE FROM archive.content_items WHERE id IN (SELECT value FROM json_each(?))
+            RETURNING id, audio_file
+        ''', (ids_json,)).fetchall()
+        conn.execute(
+            "DELETE FROM archived_items WHERE id IN (SELECT value FROM json_each(?))", (ids_json,)
+        )
+        audio_files = {row[0]: row[1] for row in rows}
+        return [(item_id, audio_files.get(item_id)) for item_id in item_ids]
 
-    def update_content_item_text(self, item_id: int, content: str = None, summary: str = None):
-        """Actualiza el contenido de texto de un item"""
+    def update_content_item_text(self, item_id: int, content: str = None, summary: str = None,
+                                 wait: bool = True):
+        """Actualiza el contenido de texto de un item
+        
+        Con ``wait=False`` retorna el ``Future`` de la escritura sin esperar.
+        """
+        def job(conn: sqlite3.Connection):
+            self._write_body(conn, item_id, content=content, summary=summary)
+        
+        changed = [item_id] if content is not None or summary is not None else None
         try:
-            with self.get_connection() as conn:
-                updates = []
-                params = []
-                
-                if content is not None:
-                    updates.append("content = ?")
-                    params.append(content)
-                
-                if summary is not None:
-                    updates.append("summary = ?")
-                    params.append(summary)
-                
-                if updates:
-                    updates.append("updated_at = CURRENT_TIMESTAMP")
-                    params.append(item_id)
-                    
-                    query = f"UPDATE content_items SET {', '.join(updates)} WHERE id = ?"
-                    conn.execute(query, params)
-                    conn.commit()
+            return self._submit_write(job, wait=wait, item_ids=changed)
         except Exception as e:
             logger.error(f"Error actualizando texto del item: {e}")
             raise
 
+# Latencia por método (sin coste mientras la instrumentación esté desactivada)
+query_profiler.instrument(DatabaseManager)
+
 # Instancia global del gestor de base de datos
 db_manager = DatabaseManager()
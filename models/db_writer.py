@@ -0,0 +1,203 @@
+"""
+Escritor en segundo plano de la base de datos (write-behind)
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+from utils.config import config_manager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Trabajo de escritura: recibe la conexión del escritor y no debe hacer commit
+WriteJob = Callable[[sqlite3.Connection], Any]
+
+class _PendingWrite:
+    """Trabajo en cola junto con su futuro y su callback posterior al commit"""
+
+    __slots__ = ('job', 'future', 'on_commit')
+
+    def __init__(self, job: WriteJob, on_commit: Optional[Callable[[Any], None]]):
+        self.job = job
+        self.future = Future()
+        self.on_commit = on_commit
+
+# Marca de parada del hilo escritor
+_STOP = object()
+
+class DatabaseWriter:
+    """Hilo único que aplica las escrituras en transacciones agrupadas
+
+    Los hilos de trabajo encolan funciones ``job(conn)`` y reciben un
+    ``Future``. El escritor agrupa los trabajos que llegan en una ventana de
+    pocos milisegundos en una sola transacción (un único fsync), aislando
+    cada uno en un SAVEPOINT: si un trabajo falla solo se revierte ese
+    trabajo y su futuro recibe la excepción.
+    """
+
+    def __init__(self, connection_factory: Callable[[], sqlite3.Connection],
+                 batch_window_ms: float = None, max_batch_size: int = None):
+        self._connection_factory = connection_factory
+        self.batch_window_ms = batch_window_ms if batch_window_ms is not None else \
+            float(config_manager.get('database.write_batch_ms', 5))
+        self.max_batch_size = max_batch_size if max_batch_size is not None else \
+            int(config_manager.get('database.write_batch_max', 200))
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches_committed = 0
+        self.jobs_committed = 0
+
+    def submit(self, job: WriteJob, on_commit: Callable[[Any], None] = None) -> Future:
+        """Encola una escritura y retorna su futuro
+
+        ``on_commit`` se invoca con el resultado tras confirmar la transacción
+        y antes de resolver el futuro (p. ej. para invalidar cachés).
+        """
+        pending = _PendingWrite(job, on_commit)
+
+        # Desde el propio hilo escritor (p. ej. un callback) se ejecuta en línea
+        if threading.current_thread() is self._thread:
+            self._run_batch([pending])
+            return pending.future
+
+        self._ensure_started()
+        self._queue.put(pending)
+        return pending.future
+
+    def flush(self, timeout: float = None) -> bool:
+        """Espera a que se apliquen todas las escrituras encoladas hasta ahora"""
+        if self._thread is None or threading.current_thread() is self._thread:
+            return True
+        marker = self.submit(lambda conn: None)
+        try:
+            marker.result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def stop(self, timeout: float = 10.0):
+        """Aplica las escrituras pendientes y detiene el hilo escritor"""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            logger.warning("El hilo escritor no terminó a tiempo")
+            return
+        with self._lock:
+            if self._thread is thread:
+                self._thread = None
+
+    def _ensure_started(self):
+        """Arranca el hilo escritor si no está en marcha"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="DatabaseWriter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        """Bucle del hilo escritor"""
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            stop_requested = False
+            deadline = time.monotonic() + self.batch_window_ms / 1000
+
+            # Agrupar lo que llegue dentro de la ventana de tiempo
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    pending = self._queue.get(timeout=remaining) if remaining > 0 \
+                        else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is _STOP:
+                    stop_requested = True
+                    break
+                batch.append(pending)
+
+            self._run_batch(batch)
+
+            if stop_requested:
+                return
+
+    def _run_batch(self, batch: List[_PendingWrite]):
+        """Aplica un lote de trabajos en una transacción con un SAVEPOINT por trabajo"""
+        results: Dict[int, Any] = {}
+        errors: Dict[int, BaseException] = {}
+
+        try:
+            conn = self._connection_factory()
+            conn.execute("BEGIN IMMEDIATE")
+        except Exception as e:
+            logger.error(f"Error iniciando transacción de escritura: {e}")
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+
+        try:
+            for index, pending in enumerate(batch):
+                if not pending.future.set_running_or_notify_cancel():
+                    errors[index] = None
+                    continue
+                conn.execute("SAVEPOINT write_job")
+                try:
+                    results[index] = pending.job(conn)
+                    conn.execute("RELEASE SAVEPOINT write_job")
+                except BaseException as e:
+                    conn.execute("ROLLBACK TO SAVEPOINT write_job")
+                    conn.execute("RELEASE SAVEPOINT write_job")
+                    errors[index] = e
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error confirmando lote de escrituras: {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            for index, pending in enumerate(batch):
+                if index in results:
+                    pending.future.set_exception(e)
+                elif errors.get(index) is not None:
+                    pending.future.set_exception(errors[index])
+            return
+
+        self.batches_committed += 1
+        self.jobs_committed += len(results)
+
+        for index, pending in enumerate(batch):
+            if index in errors:
+                if errors[index] is not None:
+                    pending.future.set_exception(errors[index])
+                continue
+            result = results[index]
+            if pending.on_commit is not None:
+                try:
+                    pending.on_commit(result)
+                except Exception as e:
+                    logger.warning(f"Error en callback posterior al commit: {e}")
+            pending.future.set_result(result)
+
+_writers: Dict[int, DatabaseWriter] = {}
+_writers_lock = threading.Lock()
+
+def get_database_writer(pool) -> DatabaseWriter:
+    """Obtiene el escritor compartido de un pool de conexiones"""
+    with _writers_lock:
+        writer = _writers.get(id(pool))
+        if writer is None:
+            writer = DatabaseWriter(pool.get_connection)
+            _writers[id(pool)] = writer
+        return writer
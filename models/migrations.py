@@ -0,0 +1,897 @@
+"""
+Migraciones de esquema versionadas mediante PRAGMA user_version
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+from utils.config import config_manager
+from utils.logger import get_logger
+from utils.text_compression import compress_text, register_sql_functions
+from utils.timestamps import to_epoch
+from utils.url_canonical import url_hash
+
+logger = get_logger(__name__)
+
+@dataclass
+class Migration:
+    """Migración de esquema
+    
+    ``apply`` se ejecuta en su propia transacción. Las migraciones largas
+    (reconstrucciones, rellenos de columnas) definen además ``batch``, que
+    procesa un lote a partir de un cursor y retorna el siguiente cursor o
+    ``None`` al terminar; cada lote se confirma por separado y el progreso se
+    guarda en ``schema_migration_progress``, de modo que una migración
+    interrumpida continúa donde se quedó. ``finalize`` se ejecuta en la
+    misma transacción que marca la versión como aplicada.
+    """
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+    batch: Optional[Callable[[sqlite3.Connection, int, int], Optional[int]]] = None
+    finalize: Optional[Callable[[sqlite3.Connection], None]] = None
+
+def _initial_schema(conn: sqlite3.Connection):
+    """Tablas e índices originales de la aplicación"""
+    # Tabla de fuentes de datos
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS data_sources (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,  -- 'youtube', 'rss', 'web'
+            url TEXT NOT NULL UNIQUE,
+            thumbnail_url TEXT,
+            description TEXT,
+            active BOOLEAN DEFAULT 1,
+            last_check TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Tabla de items de contenido
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS content_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL UNIQUE,
+            description TEXT,
+            content TEXT,
+            summary TEXT,
+            audio_file TEXT,
+            thumbnail_url TEXT,
+            status TEXT DEFAULT 'nuevo',  -- 'nuevo', 'procesado', 'escuchado', 'ignorar'
+            published_date TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (source_id) REFERENCES data_sources (id)
+        )
+    ''')
+    
+    # Tabla de configuración
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS app_config (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Tabla de logs de procesamiento
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS processing_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            status TEXT NOT NULL,  -- 'success', 'error', 'warning'
+            message TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (item_id) REFERENCES content_items (id)
+        )
+    ''')
+    
+    # Índices para mejorar rendimiento
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_content_items_source_id ON content_items(source_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_content_items_status ON content_items(status)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_content_items_created_at ON content_items(created_at)')
+
+def _list_index(conn: sqlite3.Connection):
+    """Índice compuesto para el listado paginado por fuente (coincide con el ORDER BY)"""
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_content_items_source_published
+        ON content_items(source_id, published_date DESC, id DESC)
+    ''')
+
+def _search_index(conn: sqlite3.Connection):
+    """Tabla FTS5 sobre content_items y triggers que la sincronizan"""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'content_items_fts'"
+    ).fetchone()
+    
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS content_items_fts USING fts5(
+            title, description, content, summary,
+            content='content_items',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS content_items_fts_insert
+        AFTER INSERT ON content_items BEGIN
+            INSERT INTO content_items_fts (rowid, title, description, content, summary)
+            VALUES (new.id, new.title, new.description, new.content, new.summary);
+        END
+    ''')
+    
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS content_items_fts_delete
+        AFTER DELETE ON content_items BEGIN
+            INSERT INTO content_items_fts (content_items_fts, rowid, title, description, content, summary)
+            VALUES ('delete', old.id, old.title, old.description, old.content, old.summary);
+        END
+    ''')
+    
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS content_items_fts_update
+        AFTER UPDATE OF title, description, content, summary ON content_items BEGIN
+            INSERT INTO content_items_fts (content_items_fts, rowid, title, description, content, summary)
+            VALUES ('delete', old.id, old.title, old.description, old.content, old.summary);
+            INSERT INTO content_items_fts (rowid, title, description, content, summary)
+            VALUES (new.id, new.title, new.description, new.content, new.summary);
+        END
+    ''')
+    
+    if not exists:
+        # Indexar el contenido existente de bases de datos anteriores
+        conn.execute("INSERT INTO content_items_fts (content_items_fts) VALUES ('rebuild')")
+
+def _content_bodies(conn: sqlite3.Connection):
+    """Tabla de textos comprimidos; el índice FTS se reconstruye al terminar"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS content_bodies (
+            item_id INTEGER PRIMARY KEY REFERENCES content_items (id) ON DELETE CASCADE,
+            content BLOB,
+            summary BLOB,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # Indicadores baratos para el listado sin leer los textos
+    conn.execute("ALTER TABLE content_items ADD COLUMN has_content INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE content_items ADD COLUMN has_summary INTEGER NOT NULL DEFAULT 0")
+    
+    # El índice FTS pasa a leer de los textos comprimidos: se retira mientras se mueven
+    for trigger in ('content_items_fts_insert', 'content_items_fts_delete', 'content_items_fts_update'):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS content_items_fts")
+
+def _content_bodies_batch(conn: sqlite3.Connection, cursor: int, batch_size: int) -> Optional[int]:
+    """Mueve un lote de textos de content_items a content_bodies comprimidos"""
+    rows = conn.execute('''
+        SELECT id, content, summary FROM content_items
+        WHERE id > ? AND (content IS NOT NULL OR summary IS NOT NULL)
+        ORDER BY id LIMIT ?
+    ''', (cursor, batch_size)).fetchall()
+    
+    if not rows:
+        return None
+    
+    conn.executemany(
+        "INSERT OR REPLACE INTO content_bodies (item_id, content, summary) VALUES (?, ?, ?)",
+        [(item_id, compress_text(content), compress_text(summary)) for item_id, content, summary in rows]
+    )
+    conn.executemany('''
+        UPDATE content_items
+        SET content = NULL, summary = NULL, has_content = ?, has_summary = ?
+        WHERE id = ?
+    ''', [
+        (int(bool(content and content.strip())), int(bool(summary and summary.strip())), item_id)
+        for item_id, content, summary in rows
+    ])
+    
+    return rows[-1][0]
+
+def _content_bodies_finalize(conn: sqlite3.Connection):
+    """Recrea el índice FTS sobre los textos comprimidos"""
+    create_body_search_index(conn)
+    conn.execute("INSERT INTO content_items_fts (content_items_fts) VALUES ('rebuild')")
+
+def create_body_search_index(conn: sqlite3.Connection):
+    """Índice FTS5 cuyo contenido externo es la vista con los textos descomprimidos
+    
+    Los triggers de content_items mantienen título y descripción, y los de
+    content_bodies el contenido y el resumen. Cada borrado FTS5 debe recibir
+    exactamente los valores indexados, por eso se reconstruyen con pp_inflate.
+    """
+    conn.execute('''
+        CREATE VIEW IF NOT EXISTS content_search_source AS
+        SELECT ci.id AS id, ci.title AS title, ci.description AS description,
+               pp_inflate(cb.content) AS content, pp_inflate(cb.summary) AS summary
+        FROM content_items ci
+        LEFT JOIN content_bodies cb ON cb.item_id = ci.id
+    ''')
+    
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS content_items_fts USING fts5(
+            title, description, content, summary,
+            content='content_search_source',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS content_items_fts_insert
+        AFTER INSERT ON content_items BEGIN
+            INSERT INTO content_items_fts (rowid, title, description, content, summary)
+            VALUES (new.id, new.title, new.description, NULL, NULL);
+        END
+    ''')
+    
+    # BEFORE: el cuerpo debe existir todavía para poder retirarlo del índice
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS content_items_fts_delete
+        BEFORE DELETE ON content_items BEGIN
+            DELETE FROM content_bodies WHERE item_id = old.id;
+            INSERT INTO content_items_fts (content_items_fts, rowid, title, description, content, summary)
+            VALUES ('delete', old.id, old.title, old.description, NULL, NULL);
+        END
+    ''')
+    
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS content_items_fts_update
+        AFTER UPDATE OF title, description ON content_items BEGIN
+            INSERT INTO content_items_fts (content_items_fts, rowid, title, description, content, summary)
+            VALUES ('delete', old.id, old.title, old.description,
+                    (SELECT pp_inflate(content) FROM content_bodies WHERE item_id = old.id),
+                    (SELECT pp_inflate(summary) FROM content_bodies WHERE item_id = old.id));
+            INSERT INTO content_items_fts (rowid, title, description, content, summary)
+            VALUES (new.id, new.title, new.description,
+                    (SELECT pp_inflate(content) FROM content_bodies WHERE item_id = new.id),
+                    (SELECT pp_inflate(summary) FROM content_bodies WHERE item_id = new.id));
+        END
+    ''')
+    
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS content_bodies_fts_insert
+        AFTER INSERT ON content_bodies BEGIN
+            INSERT INTO content_items_fts (content_items_fts, rowid, title, description, content, summary)
+            SELECT 'delete', id, title, description, NULL, NULL
+            FROM content_items WHERE id = new.item_id;
+            INSERT INTO content_items_fts (rowid, title, description, content, summary)
+            SELECT id, title, description, pp_inflate(new.content), pp_inflate(new.summary)
+            FROM content_items WHERE id = new.item_id;
+        END
+    ''')
+    
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS content_bodies_fts_update
+        AFTER UPDATE OF content, summary ON content_bodies BEGIN
+            INSERT INTO content_items_fts (content_items_fts, rowid, title, description, content, summary)
+            SELECT 'delete', id, title, description, pp_inflate(old.content), pp_inflate(old.summary)
+            FROM content_items WHERE id = old.item_id;
+            INSERT INTO content_items_fts (rowid, title, description, content, summary)
+            SELECT id, title, description, pp_inflate(new.content), pp_inflate(new.summary)
+            FROM content_items WHERE id = new.item_id;
+        END
+    ''')
+    
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS content_bodies_fts_delete
+        AFTER DELETE ON content_bodies BEGIN
+            INSERT INTO content_items_fts (content_items_fts, rowid, title, description, content, summary)
+            SELECT 'delete', id, title, description, pp_inflate(old.content), pp_inflate(old.summary)
+            FROM content_items WHERE id = old.item_id;
+            INSERT INTO content_items_fts (rowid, title, description, content, summary)
+            SELECT id, title, description, NULL, NULL
+            FROM content_items WHERE id = old.item_id;
+        END
+    ''')
+
+def _processing_logs_retention(conn: sqlite3.Connection):
+    """Índices del registro de procesamiento y tabla de resumen diario"""
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_processing_logs_item_id ON processing_logs(item_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_processing_logs_created_at ON processing_logs(created_at)')
+    
+    # Conteos diarios por acción y estado de los registros ya purgados
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS processing_log_daily (
+            day TEXT NOT NULL,
+            action TEXT NOT NULL,
+            status TEXT NOT NULL,
+            log_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, action, status)
+        ) WITHOUT ROWID
+    ''')
+
+def _url_hash(conn: sqlite3.Connection):
+    """Columna con el hash de 64 bits de la URL canónica y su índice único"""
+    conn.execute("ALTER TABLE content_items ADD COLUMN url_hash INTEGER")
+    # Índice único parcial: los items sin hash (duplicados previos) no cuentan
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_content_items_url_hash
+        ON content_items(url_hash) WHERE url_hash IS NOT NULL
+    ''')
+
+def _url_hash_batch(conn: sqlite3.Connection, cursor: int, batch_size: int) -> Optional[int]:
+    """Calcula el hash de URL de un lote de items existentes"""
+    rows = conn.execute(
+        "SELECT id, url FROM content_items WHERE id > ? ORDER BY id LIMIT ?",
+        (cursor, batch_size)
+    ).fetchall()
+    
+    if not rows:
+        return None
+    
+    # Los duplicados ya almacenados conservan url_hash NULL (OR IGNORE)
+    conn.executemany(
+        "UPDATE OR IGNORE content_items SET url_hash = ? WHERE id = ?",
+        [(url_hash(url), item_id) for item_id, url in rows]
+    )
+    
+    return rows[-1][0]
+
+def _maintenance_runs(conn: sqlite3.Connection):
+    """Historial de tareas de mantenimiento y su duración"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS maintenance_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task TEXT NOT NULL,
+            started_at TIMESTAMP NOT NULL,
+            duration_ms INTEGER NOT NULL,
+            status TEXT NOT NULL,  -- 'success', 'error'
+            message TEXT
+        )
+    ''')
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS idx_maintenance_runs_task ON maintenance_runs(task, started_at)'
+    )
+
+def _change_log(conn: sqlite3.Connection):
+    """Registro de cambios por fila para refrescos incrementales de la UI"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            op TEXT NOT NULL  -- 'I', 'U', 'D'
+        )
+    ''')
+    create_change_log_triggers(conn)
+
+# Tablas cuyos cambios se registran en change_log y columnas que muestra la
+# UI: una actualización solo se anota si cambia alguna de ellas (no las de
+# rellenos como published_ts/url_hash ni indicadores como has_content)
+CHANGE_LOG_TABLES = {
+    'content_items': ('source_id', 'title', 'url', 'description', 'audio_file', 'thumbnail_url',
+                      'status', 'published_date', 'has_summary'),
+    'data_sources': ('name', 'type', 'url', 'thumbnail_url', 'description', 'active'),
+}
+
+def create_change_log_triggers(conn: sqlite3.Connection):
+    """Crea los triggers que anotan inserciones, cambios y borrados en change_log
+    
+    También se usa al reconstruir las tablas registradas.
+    """
+    for table, columns in CHANGE_LOG_TABLES.items():
+        changed = ' OR '.join(f"old.{column} IS NOT new.{column}" for column in columns)
+        for event, op, row in (('INSERT', 'I', 'new'), ('UPDATE', 'U', 'new'), ('DELETE', 'D', 'old')):
+            guard = f"WHEN {changed}" if event == 'UPDATE' else ""
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS change_log_{table}_{event.lower()}
+                AFTER {event} ON {table} {guard} BEGIN
+                    INSERT INTO change_log (table_name, row_id, op) VALUES ('{table}', {row}.id, '{op}');
+                END
+            ''')
+
+def _epoch_columns(conn: sqlite3.Connection):
+    """Columnas INTEGER en segundos epoch para ordenar y filtrar por fecha"""
+    conn.execute("ALTER TABLE content_items ADD COLUMN published_ts INTEGER")
+    conn.execute("ALTER TABLE content_items ADD COLUMN created_ts INTEGER")
+    conn.execute("ALTER TABLE data_sources ADD COLUMN last_check_ts INTEGER")
+    
+    # Pocas fuentes: se convierten en la misma transacción
+    rows = conn.execute("SELECT id, last_check FROM data_sources WHERE last_check IS NOT NULL").fetchall()
+    conn.executemany(
+        "UPDATE data_sources SET last_check_ts = ? WHERE id = ?",
+        [(to_epoch(last_check), source_id) for source_id, last_check in rows]
+    )
+
+def _epoch_columns_batch(conn: sqlite3.Connection, cursor: int, batch_size: int) -> Optional[int]:
+    """Convierte las fechas de texto de un lote de items a segundos epoch"""
+    rows = conn.execute(
+        "SELECT id, published_date, created_at FROM content_items WHERE id > ? ORDER BY id LIMIT ?",
+        (cursor, batch_size)
+    ).fetchall()
+    
+    if not rows:
+        return None
+    
+    # created_at viene de CURRENT_TIMESTAMP (UTC); published_date, de fechas locales
+    conn.executemany(
+        "UPDATE content_items SET published_ts = ?, created_ts = ? WHERE id = ?",
+        [(to_epoch(published), to_epoch(created, assume_utc=True), item_id)
+         for item_id, published, created in rows]
+    )
+    
+    return rows[-1][0]
+
+def _epoch_columns_finalize(conn: sqlite3.Connection):
+    """Índices compuestos sobre published_ts; sustituyen a los de texto"""
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_content_items_source_published_ts
+        ON content_items(source_id, published_ts DESC, id DESC)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_content_items_status_published_ts
+        ON content_items(status, published_ts DESC, id DESC)
+    ''')
+    conn.execute("DROP INDEX IF EXISTS idx_content_items_source_published")
+    conn.execute("DROP INDEX IF EXISTS idx_content_items_status")
+
+def _archived_items(conn: sqlite3.Connection):
+    """Índice mínimo en la base principal de los items movidos al archivo"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archived_items (
+            id INTEGER PRIMARY KEY,
+            source_id INTEGER NOT NULL,
+            status TEXT,
+            url_hash INTEGER,
+            published_ts INTEGER,
+            archived_ts INTEGER NOT NULL
+        )
+    ''')
+    # El hash evita volver a ingerir items ya archivados
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_archived_items_url_hash
+        ON archived_items(url_hash) WHERE url_hash IS NOT NULL
+    ''')
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS idx_archived_items_source_status ON archived_items(source_id, status)'
+    )
+
+def _rebuild_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    """Columnas comunes a una tabla y a su copia ``{table}_rebuild``"""
+    new_columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table}_rebuild)")}
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})") if row[1] in new_columns]
+
+def begin_table_rebuild(conn: sqlite3.Connection, table: str, create_sql: str, condition: str = "1"):
+    """Crea ``{table}_rebuild`` con una nueva definición y la mantiene sincronizada
+    
+    ``create_sql`` contiene ``{table}`` en lugar del nombre y ``condition``
+    filtra las filas que se conservan, con ``{row}`` delante de cada columna.
+    Unos triggers sobre la tabla original replican en la copia las
+    inserciones, modificaciones y borrados, de modo que las filas pueden
+    copiarse por lotes (``copy_rebuild_rows``) sin perder los cambios
+    hechos entre lotes. ``finish_table_rebuild`` sustituye la tabla.
+    """
+    new_table = f"{table}_rebuild"
+    conn.execute(create_sql.format(table=new_table))
+    columns = _rebuild_columns(conn, table)
+    names = ', '.join(columns)
+    values = ', '.join(f"new.{column}" for column in columns)
+    new_condition = condition.format(row="new.")
+    
+    conn.execute(f'''
+        CREATE TRIGGER {new_table}_insert AFTER INSERT ON {table} WHEN {new_condition} BEGIN
+            INSERT OR REPLACE INTO {new_table} ({names}) VALUES ({values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER {new_table}_update AFTER UPDATE ON {table} BEGIN
+            DELETE FROM {new_table} WHERE id = old.id;
+            INSERT OR REPLACE INTO {new_table} ({names}) SELECT {values} WHERE {new_condition};
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER {new_table}_delete AFTER DELETE ON {table} BEGIN
+            DELETE FROM {new_table} WHERE id = old.id;
+        END
+    ''')
+
+def copy_rebuild_rows(conn: sqlite3.Connection, table: str, condition: str, where: str,
+                      params: tuple = ()):
+    """Copia a ``{table}_rebuild`` las filas que cumplen ``where`` y ``condition``
+    
+    Reemplaza las que ya estén copiadas, así que repetir un lote es inocuo.
+    """
+    names = ', '.join(_rebuild_columns(conn, table))
+    conn.execute(
+        f"INSERT OR REPLACE INTO {table}_rebuild ({names}) SELECT {names} FROM {table} "
+        f"WHERE ({where}) AND ({condition.format(row='')})",
+        params
+    )
+
+def finish_table_rebuild(conn: sqlite3.Connection, table: str):
+    """Sustituye una tabla por su copia ``{table}_rebuild`` (procedimiento de ALTER TABLE de SQLite)
+    
+    Conserva el contador AUTOINCREMENT y vuelve a crear los índices y
+    triggers de la tabla. Debe ejecutarse con ``foreign_keys`` desactivado,
+    dentro de la transacción de la migración.
+    """
+    new_table = f"{table}_rebuild"
+    for event in ('insert', 'update', 'delete'):
+        conn.execute(f"DROP TRIGGER IF EXISTS {new_table}_{event}")
+    
+    dependents = [row[0] for row in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,)
+    )]
+    sequence = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+    
+    conn.execute(f"DROP TABLE {table}")
+    
+    # Las vistas y triggers de otras tablas la referencian por nombre:
+    # el modo heredado evita que RENAME las compruebe con la tabla ausente
+    conn.execute("PRAGMA legacy_alter_table=ON")
+    try:
+        conn.execute(f"ALTER TABLE {new_table} RENAME TO {table}")
+    finally:
+        conn.execute("PRAGMA legacy_alter_table=OFF")
+    
+    for sql in dependents:
+        conn.execute(sql)
+    
+    # Sin retroceder el AUTOINCREMENT: los ids borrados o archivados no se reutilizan
+    if sequence is not None:
+        updated = conn.execute(
+            "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (sequence[0], table)
+        ).rowcount
+        if not updated:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, sequence[0]))
+
+# Definición de content_items desde la migración 11. La URL no lleva
+# UNIQUE: los duplicados se detectan por el índice único de url_hash y la
+# comparación de la URL (ver DatabaseManager._existing_url_hashes)
+_CONTENT_ITEMS_SQL = '''
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_id INTEGER NOT NULL REFERENCES data_sources (id) ON DELETE CASCADE,
+            title TEXT NOT NULL,
+            url TEXT NOT NULL,
+            description TEXT,
+            content TEXT,
+            summary TEXT,
+            audio_file TEXT,
+            thumbnail_url TEXT,
+            status TEXT DEFAULT 'nuevo',  -- 'nuevo', 'procesado', 'escuchado', 'ignorar'
+            published_date TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            has_content INTEGER NOT NULL DEFAULT 0,
+            has_summary INTEGER NOT NULL DEFAULT 0,
+            url_hash INTEGER,
+            published_ts INTEGER,
+            created_ts INTEGER
+        )
+    '''
+
+# Filas que conserva la migración 11: las huérfanas ya no cumplen la clave
+_CASCADE_ITEMS_CONDITION = "{row}source_id IN (SELECT id FROM data_sources)"
+_CASCADE_LOGS_CONDITION = "{row}item_id IN (SELECT id FROM content_items_rebuild)"
+
+def _cascade_foreign_keys(conn: sqlite3.Connection):
+    """Claves foráneas con ON DELETE CASCADE en content_items y processing_logs
+    
+    Borrar una fuente elimina sus items, y borrar un item sus registros de
+    procesamiento. Las tablas se copian por lotes a sus nuevas definiciones
+    (los registros junto con sus items) y se sustituyen al terminar.
+    """
+    begin_table_rebuild(conn, 'content_items', _CONTENT_ITEMS_SQL, _CASCADE_ITEMS_CONDITION)
+    
+    begin_table_rebuild(conn, 'processing_logs', '''
+        CREATE TABLE {table} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER NOT NULL REFERENCES content_items (id) ON DELETE CASCADE,
+            action TEXT NOT NULL,
+            status TEXT NOT NULL,  -- 'success', 'error', 'warning'
+            message TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', _CASCADE_LOGS_CONDITION)
+
+def _cascade_foreign_keys_batch(conn: sqlite3.Connection, cursor: int, batch_size: int) -> Optional[int]:
+    """Copia un lote de items y los registros de procesamiento de esos items"""
+    last_id = conn.execute(
+        "SELECT MAX(id) FROM (SELECT id FROM content_items WHERE id > ? ORDER BY id LIMIT ?)",
+        (cursor, batch_size)
+    ).fetchone()[0]
+    
+    if last_id is None:
+        return None
+    
+    copy_rebuild_rows(conn, 'content_items', _CASCADE_ITEMS_CONDITION,
+                      "id > ? AND id <= ?", (cursor, last_id))
+    copy_rebuild_rows(conn, 'processing_logs', _CASCADE_LOGS_CONDITION,
+                      "item_id > ? AND item_id <= ?", (cursor, last_id))
+    return last_id
+
+def _cascade_foreign_keys_finalize(conn: sqlite3.Connection):
+    """Sustituye las tablas por sus copias y comprueba las claves foráneas"""
+    finish_table_rebuild(conn, 'content_items')
+    finish_table_rebuild(conn, 'processing_logs')
+    
+    conn.execute("DELETE FROM content_bodies WHERE item_id NOT IN (SELECT id FROM content_items)")
+    
+    for table in ('content_items', 'processing_logs', 'content_bodies'):
+        if conn.execute(f"PRAGMA foreign_key_check({table})").fetchone():
+            raise sqlite3.IntegrityError(f"Claves foráneas inconsistentes en {table}")
+
+def _has_unique_url(conn: sqlite3.Connection) -> bool:
+    """Indica si content_items conserva la restricción UNIQUE sobre url"""
+    for index in conn.execute("PRAGMA index_list(content_items)").fetchall():
+        if index[2] and index[3] == 'u':
+            columns = [row[2] for row in conn.execute(f"PRAGMA index_info('{index[1]}')")]
+            if columns == ['url']:
+                return True
+    return False
+
+def _rebuilding(conn: sqlite3.Connection, table: str) -> bool:
+    """Indica si hay una copia ``{table}_rebuild`` en curso"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (f"{table}_rebuild",)
+    ).fetchone() is not None
+
+def _url_not_unique(conn: sqlite3.Connection):
+    """Quita la restricción UNIQUE de content_items.url
+    
+    Duplicaba en un índice de texto la deduplicación que ya hace el índice
+    único de url_hash. Las bases de datos que aplicaron la migración 11
+    con la definición anterior se copian por lotes; las demás no cambian.
+    """
+    if _has_unique_url(conn):
+        begin_table_rebuild(conn, 'content_items', _CONTENT_ITEMS_SQL)
+
+def _url_not_unique_batch(conn: sqlite3.Connection, cursor: int, batch_size: int) -> Optional[int]:
+    """Copia un lote de items a la nueva definición (si hay reconstrucción en curso)"""
+    if not _rebuilding(conn, 'content_items'):
+        return None
+    
+    last_id = conn.execute(
+        "SELECT MAX(id) FROM (SELECT id FROM content_items WHERE id > ? ORDER BY id LIMIT ?)",
+        (cursor, batch_size)
+    ).fetchone()[0]
+    
+    if last_id is None:
+        return None
+    
+    copy_rebuild_rows(conn, 'content_items', "1", "id > ? AND id <= ?", (cursor, last_id))
+    return last_id
+
+def _url_not_unique_finalize(conn: sqlite3.Connection):
+    """Sustituye content_items e indexa las URLs de los items sin hash"""
+    if _rebuilding(conn, 'content_items'):
+        finish_table_rebuild(conn, 'content_items')
+    
+    # Solo los duplicados previos y las colisiones de hash quedan sin url_hash
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_content_items_url_unhashed
+        ON content_items(url) WHERE url_hash IS NULL
+    ''')
+    
+    for table in ('content_items', 'processing_logs', 'content_bodies'):
+        if conn.execute(f"PRAGMA foreign_key_check({table})").fetchone():
+            raise sqlite3.IntegrityError(f"Claves foráneas inconsistentes en {table}")
+
+def _feed_fetch_state(conn: sqlite3.Connection):
+    """Validadores HTTP (ETag / Last-Modified) de la última descarga de cada fuente
+    
+    Tabla aparte de data_sources: se actualiza en cada consulta de los feeds
+    y no debe generar entradas en change_log ni refrescos de la lista de fuentes.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS feed_fetch_state (
+            source_id INTEGER PRIMARY KEY REFERENCES data_sources (id) ON DELETE CASCADE,
+            feed_url TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            http_status INTEGER,
+            checked_ts INTEGER,
+            changed_ts INTEGER
+        )
+    ''')
+
+def _feed_resolution(conn: sqlite3.Connection):
+    """URL del feed y channel id resueltos para las fuentes de YouTube"""
+    conn.execute("ALTER TABLE data_sources ADD COLUMN feed_url TEXT")
+    conn.execute("ALTER TABLE data_sources ADD COLUMN channel_id TEXT")
+    conn.execute("ALTER TABLE data_sources ADD COLUMN feed_resolved_ts INTEGER")
+
+def _poll_schedule(conn: sqlite3.Connection):
+    """Próxima consulta y fallos consecutivos de cada fuente"""
+    conn.execute("ALTER TABLE feed_fetch_state ADD COLUMN next_check_ts INTEGER")
+    conn.execute("ALTER TABLE feed_fetch_state ADD COLUMN failure_count INTEGER NOT NULL DEFAULT 0")
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS idx_feed_fetch_state_next_check ON feed_fetch_state(next_check_ts)'
+    )
+
+def _change_log_guards(conn: sqlite3.Connection):
+    """Triggers de actualización del registro de cambios limitados a las columnas visibles
+    
+    Las bases de datos migradas antes anotaban también los rellenos (p. ej.
+    las fechas epoch) y los cambios de indicadores; esas entradas se
+    descartan para que el primer refresco no repase toda la tabla (los
+    widgets que las tuvieran pendientes recargan por completo).
+    """
+    for table in CHANGE_LOG_TABLES:
+        conn.execute(f"DROP TRIGGER IF EXISTS change_log_{table}_update")
+    create_change_log_triggers(conn)
+    conn.execute("DELETE FROM change_log")
+
+# Migraciones en orden. Las bases de datos creadas antes de existir este
+# sistema tienen user_version 0, por eso las primeras usan IF NOT EXISTS.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Esquema inicial", _initial_schema),
+    Migration(2, "Índice compuesto del listado de contenido", _list_index),
+    Migration(3, "Índice de búsqueda de texto completo", _search_index),
+    Migration(4, "Textos largos comprimidos en content_bodies", _content_bodies,
+              _content_bodies_batch, _content_bodies_finalize),
+    Migration(5, "Índices y resumen diario del registro de procesamiento", _processing_logs_retention),
+    Migration(6, "Hash de la URL canónica de los items", _url_hash, _url_hash_batch),
+    Migration(7, "Historial de mantenimiento", _maintenance_runs),
+    Migration(8, "Registro de cambios para refrescos incrementales", _change_log),
+    Migration(9, "Fechas en segundos epoch con índices compuestos", _epoch_columns,
+              _epoch_columns_batch, _epoch_columns_finalize),
+    Migration(10, "Índice de items archivados", _archived_items),
+    Migration(11, "Claves foráneas con borrado en cascada", _cascade_foreign_keys,
+              _cascade_foreign_keys_batch, _cascade_foreign_keys_finalize),
+    Migration(12, "Validadores HTTP de la última descarga de cada fuente", _feed_fetch_state),
+    Migration(13, "Resolución del feed de las fuentes de YouTube", _feed_resolution),
+    Migration(14, "Planificación adaptativa de la consulta de las fuentes", _poll_schedule),
+    Migration(15, "Registro de cambios solo para las columnas visibles", _change_log_guards),
+    Migration(16, "URL de los items sin restricción UNIQUE", _url_not_unique,
+              _url_not_unique_batch, _url_not_unique_finalize),
+]
+
+class MigrationRunner:
+    """Aplica las migraciones pendientes sobre una conexión"""
+    
+    def __init__(self, conn: sqlite3.Connection, migrations: List[Migration] = None,
+                 batch_size: int = None):
+        self.conn = conn
+        register_sql_functions(conn)
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+        self.batch_size = batch_size or config_manager.get('database.migration_batch_size', 5000)
+    
+    @property
+    def latest_version(self) -> int:
+        """Versión de esquema más reciente conocida por la aplicación"""
+        return self.migrations[-1].version if self.migrations else 0
+    
+    def current_version(self) -> int:
+        """Versión de esquema de la base de datos"""
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+    
+    def pending(self) -> List[Migration]:
+        """Migraciones aún no aplicadas"""
+        current = self.current_version()
+        return [m for m in self.migrations if m.version > current]
+    
+    def run(self, max_batches: int = None) -> bool:
+        """Aplica las migraciones pendientes en orden
+        
+        Con ``max_batches`` se limita el número de lotes de migraciones
+        incrementales que se procesan en esta llamada. Retorna True si el
+        esquema queda actualizado.
+        """
+        current = self.current_version()
+        if current > self.latest_version:
+            logger.warning(
+                f"La base de datos tiene una versión de esquema ({current}) más reciente "
+                f"que la aplicación ({self.latest_version})"
+            )
+            return True
+        
+        self._ensure_progress_table()
+        
+        # Las reconstrucciones de tablas no deben disparar los borrados en
+        # cascada; PRAGMA foreign_keys no tiene efecto dentro de una transacción
+        foreign_keys = self.conn.execute("PRAGMA foreign_keys").fetchone()[0]
+        if foreign_keys:
+            self.conn.execute("PRAGMA foreign_keys=OFF")
+        try:
+            return self._run_pending(max_batches)
+        finally:
+            if foreign_keys:
+                self.conn.execute("PRAGMA foreign_keys=ON")
+    
+    def _run_pending(self, max_batches: Optional[int]) -> bool:
+        """Aplica las migraciones pendientes (con las claves foráneas desactivadas)"""
+        batches_left = max_batches
+        
+        for migration in self.pending():
+            started = time.perf_counter()
+            
+            if migration.batch is None:
+                self._in_transaction(lambda: self._complete(migration, apply=True))
+            else:
+                batches_left = self._run_batched(migration, batches_left)
+                if batches_left is not None and batches_left <= 0 and \
+                        self.current_version() < migration.version:
+                    logger.info(f"Migración {migration.version} en curso, se continuará más tarde")
+                    return False
+            
+            elapsed = time.perf_counter() - started
+            logger.info(f"Migración {migration.version} aplicada: {migration.description} ({elapsed:.2f}s)")
+        
+        return True
+    
+    def _run_batched(self, migration: Migration, batches_left: Optional[int]) -> Optional[int]:
+        """Ejecuta una migración incremental, un lote por transacción"""
+        cursor = self._get_progress(migration.version)
+        
+        if cursor is None:
+            def start():
+                migration.apply(self.conn)
+                self.conn.execute(
+                    "INSERT INTO schema_migration_progress (version, cursor) VALUES (?, 0)",
+                    (migration.version,)
+                )
+            self._in_transaction(start)
+            cursor = 0
+        
+        while batches_left is None or batches_left > 0:
+            state = {}
+            
+            def step():
+                next_cursor = migration.batch(self.conn, cursor, self.batch_size)
+                state['next'] = next_cursor
+                if next_cursor is None:
+                    self._complete(migration, apply=False)
+                else:
+                    self.conn.execute(
+                        "UPDATE schema_migration_progress SET cursor = ? WHERE version = ?",
+                        (next_cursor, migration.version)
+                    )
+            
+            self._in_transaction(step)
+            if batches_left is not None:
+                batches_left -= 1
+            
+            if state['next'] is None:
+                break
+            cursor = state['next']
+        
+        return batches_left
+    
+    def _complete(self, migration: Migration, apply: bool):
+        """Marca una migración como aplicada (dentro de la transacción actual)"""
+        if apply:
+            migration.apply(self.conn)
+        if migration.finalize is not None:
+            migration.finalize(self.conn)
+        self.conn.execute(
+            "DELETE FROM schema_migration_progress WHERE version = ?", (migration.version,)
+        )
+        # PRAGMA no admite parámetros; la versión es siempre un entero propio
+        self.conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+    
+    def _in_transaction(self, func: Callable[[], None]):
+        """Ejecuta una función dentro de una transacción explícita"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            func()
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+    
+    def _ensure_progress_table(self):
+        """Crea la tabla de progreso de migraciones incrementales"""
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migration_progress (
+                version INTEGER PRIMARY KEY,
+                cursor INTEGER NOT NULL
+            )
+        ''')
+    
+    def _get_progress(self, version: int) -> Optional[int]:
+        """Cursor guardado de una migración incremental en curso"""
+        row = self.conn.execute(
+            "SELECT cursor FROM schema_migration_progress WHERE version = ?", (version,)
+        ).fetchone()
+        return row[0] if row else None
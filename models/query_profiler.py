@@ -0,0 +1,344 @@
+"""
+Instrumentación opcional de la base de datos: registro de consultas lentas
+con su plan de ejecución e histogramas de latencia por método
+"""
+
+import functools
+import inspect
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Dict, List, Optional
+from utils.config import config_manager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class LatencyHistogram:
+    """Histograma de latencias con cubetas en escala aproximadamente logarítmica"""
+
+    # Límite superior (ms) de cada cubeta; la última recoge el resto
+    BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    __slots__ = ('counts', 'count', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, elapsed_ms: float):
+        """Anota una medida"""
+        self.counts[bisect_left(self.BOUNDS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def percentile(self, fraction: float) -> float:
+        """Percentil aproximado (límite superior de su cubeta, sin pasar del máximo)"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                bound = self.BOUNDS_MS[index] if index < len(self.BOUNDS_MS) else self.max_ms
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Resumen del histograma"""
+        buckets = {f"<={bound}ms": count for bound, count in zip(self.BOUNDS_MS, self.counts) if count}
+        if self.counts[-1]:
+            buckets[f">{self.BOUNDS_MS[-1]}ms"] = self.counts[-1]
+        return {
+            'count': self.count,
+            'total_ms': round(self.total_ms, 3),
+            'avg_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max_ms, 3),
+            'buckets': buckets,
+        }
+
+# Sentencias sin plan de consulta que analizar
+_NO_PLAN = re.compile(r'^\s*(PRAGMA|BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE|ATTACH|DETACH|VACUUM|ANALYZE|EXPLAIN)\b',
+                      re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+def _value_shape(value: Any) -> str:
+    """Forma de un parámetro sin su contenido (tipo y longitud)"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (str, bytes)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+def describe_params(params: Any) -> str:
+    """Forma de los parámetros de una sentencia, agrupando los repetidos (``int×500``)"""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{key}: {_value_shape(value)}" for key, value in params.items()) + "}"
+
+    groups: List[List[Any]] = []
+    for value in params:
+        shape = _value_shape(value)
+        # Las longitudes de texto varían: se agrupan por tipo
+        kind = shape.split('[')[0]
+        if groups and groups[-1][0] == kind:
+            groups[-1][1] += 1
+            groups[-1][2] = kind
+        else:
+            groups.append([kind, 1, shape])
+    return "(" + ", ".join(shape if count == 1 else f"{kind}×{count}"
+                           for kind, count, shape in groups) + ")"
+
+class QueryProfiler:
+    """Mide cada sentencia y cada método público de DatabaseManager
+
+    Desactivado por defecto (``database.profiling``). Las conexiones que se
+    abren con la instrumentación activa miden sus sentencias: las que
+    superan ``database.slow_query_ms`` se registran con la forma de sus
+    parámetros y su ``EXPLAIN QUERY PLAN``. Los métodos de DatabaseManager
+    acumulan su latencia en histogramas que se vuelcan con ``dump``.
+    """
+
+    def __init__(self):
+        self.enabled = bool(config_manager.get('database.profiling', False))
+        self.slow_query_ms = float(config_manager.get('database.slow_query_ms', 100))
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.slow_queries = deque(maxlen=int(config_manager.get('database.slow_query_log_size', 100)))
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def enable(self, slow_query_ms: float = None):
+        """Activa la instrumentación (las sentencias, en las conexiones nuevas)"""
+        if slow_query_ms is not None:
+            self.slow_query_ms = float(slow_query_ms)
+        self.enabled = True
+
+    def disable(self):
+        """Desactiva la instrumentación"""
+        self.enabled = False
+
+    def reset(self):
+        """Descarta los histogramas y el registro de consultas lentas"""
+        with self._lock:
+            self.histograms.clear()
+            self.slow_queries.clear()
+
+    def current_method(self) -> Optional[str]:
+        """Método de DatabaseManager en curso en este hilo"""
+        stack = getattr(self._local, 'methods', None)
+        return stack[-1] if stack else None
+
+    def instrument(self, cls: type):
+        """Envuelve los métodos públicos de una clase para medir su latencia
+
+        Los context managers (``@contextmanager``) no se envuelven: la llamada
+        solo crea el generador y el trabajo ocurre dentro del bloque ``with``,
+        que ya miden el método que lo abre y sus sentencias.
+        """
+        for name, attr in list(vars(cls).items()):
+            if name.startswith('_') or not callable(attr) or isinstance(attr, (staticmethod, classmethod)):
+                continue
+            if inspect.isgeneratorfunction(inspect.unwrap(attr)):
+                continue
+            setattr(cls, name, self._timed(f"{cls.__name__}.{name}", attr))
+
+    def _timed(self, label: str, func):
+        """Envoltorio que mide un método solo con la instrumentación activa"""
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            stack = getattr(profiler._local, 'methods', None)
+            if stack is None:
+                stack = profiler._local.methods = []
+            stack.append(label)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stack.pop()
+                profiler.record_method(label, (time.perf_counter() - start) * 1000)
+
+        return wrapper
+
+    def record_method(self, label: str, elapsed_ms: float):
+        """Anota la latencia de una llamada a un método"""
+        with self._lock:
+            histogram = self.histograms.get(label)
+            if histogram is None:
+                histogram = self.histograms[label] = LatencyHistogram()
+            histogram.add(elapsed_ms)
+
+    def record_statement(self, conn: sqlite3.Connection, sql: str, params: Any,
+                         elapsed_ms: float, rows: int = None):
+        """Anota una sentencia; si es lenta, la registra con su plan de ejecución"""
+        if not self.enabled or elapsed_ms < self.slow_query_ms:
+            return
+
+        statement = _WHITESPACE.sub(' ', sql).strip()
+        shape = describe_params(params)
+        if rows is not None:
+            shape = f"{rows} filas × {shape}"
+        entry = {
+            'sql': statement,
+            'params': shape,
+            'elapsed_ms': round(elapsed_ms, 3),
+            'method': self.current_method() or threading.current_thread().name,
+            'plan': self._explain(conn, sql, params),
+            'at': time.time(),
+        }
+        with self._lock:
+            self.slow_queries.append(entry)
+
+        plan = '; '.join(entry['plan']) or 'sin plan'
+        logger.warning(f"Consulta lenta ({entry['elapsed_ms']} ms) en {entry['method']}: "
+                       f"{statement[:500]} {shape} → {plan}")
+
+    def _explain(self, conn: sqlite3.Connection, sql: str, params: Any) -> List[str]:
+        """Líneas de EXPLAIN QUERY PLAN de una sentencia (vacío si no aplica)"""
+        if _NO_PLAN.match(sql):
+            return []
+        try:
+            # Cursor base: el EXPLAIN no debe volver a medirse
+            cursor = sqlite3.Connection.cursor(conn)
+            rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params if params is not None else ()).fetchall()
+        except Exception as e:
+            return [f"(sin plan: {e})"]
+
+        # Filas (id, parent, notused, detail): se indenta según la jerarquía
+        depth = {0: -1}
+        lines = []
+        for row in rows:
+            node_id, parent = row[0], row[1]
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node_id] + row[3])
+        return lines
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Histogramas por método y consultas lentas registradas"""
+        with self._lock:
+            return {
+                'methods': {label: histogram.to_dict() for label, histogram in self.histograms.items()},
+                'slow_queries': list(self.slow_queries),
+            }
+
+    def dump(self) -> str:
+        """Informe de texto con la latencia por método y las consultas lentas"""
+        stats = self.get_stats()
+        lines = [f"{'Método':<48} {'n':>7} {'media':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'máx':>9}"]
+        for label, data in sorted(stats['methods'].items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(
+                f"{label:<48} {data['count']:>7} {data['avg_ms']:>9.2f} {data['p50_ms']:>8} "
+                f"{data['p95_ms']:>8} {data['p99_ms']:>8} {data['max_ms']:>9.2f}"
+            )
+
+        if stats['slow_queries']:
+            lines.append("")
+            lines.append(f"Consultas lentas (>= {self.slow_query_ms:g} ms):")
+            for entry in stats['slow_queries']:
+                lines.append(f"- {entry['elapsed_ms']} ms en {entry['method']}: "
+                             f"{entry['sql'][:200]} {entry['params']}")
+                lines.extend(f"    {line}" for line in entry['plan'])
+        return "\n".join(lines)
+
+# Instancia global de la instrumentación
+query_profiler = QueryProfiler()
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor que mide sus sentencias (incluida la lectura de filas)
+
+    Las filas leídas con ``fetchone``/``fetchall`` completan la sentencia al
+    momento; con ``fetchmany`` o iterando se acumula el tiempo de lectura y
+    la sentencia se anota al agotarse las filas (o en la siguiente
+    ``execute`` o ``close``).
+    """
+
+    _pending = None
+
+    def execute(self, sql: str, parameters: Any = ()):
+        self._flush_pending()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        elapsed = (time.perf_counter() - start) * 1000
+        if self.description is None:
+            query_profiler.record_statement(self.connection, sql, parameters, elapsed)
+        else:
+            # Consultas con filas: se completa al leerlas
+            self._pending = [sql, parameters, elapsed]
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters):
+        self._flush_pending()
+        rows = list(seq_of_parameters)
+        start = time.perf_counter()
+        super().executemany(sql, rows)
+        elapsed = (time.perf_counter() - start) * 1000
+        query_profiler.record_statement(self.connection, sql, rows[0] if rows else (),
+                                        elapsed, rows=len(rows))
+        return self
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+    def fetchmany(self, size: int = None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._add_fetch_time(start, exhausted=len(rows) < size)
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add_fetch_time(start, exhausted=True)
+            raise
+        self._add_fetch_time(start, exhausted=False)
+        return row
+
+    def close(self):
+        self._flush_pending()
+        super().close()
+
+    def _timed_fetch(self, fetch):
+        """Lee filas sumando el tiempo a la sentencia pendiente y la anota"""
+        start = time.perf_counter()
+        result = fetch()
+        if self._pending is not None:
+            self._pending[2] += (time.perf_counter() - start) * 1000
+            self._flush_pending()
+        return result
+
+    def _add_fetch_time(self, start: float, exhausted: bool):
+        """Suma una lectura parcial a la sentencia pendiente; la anota al agotarse"""
+        if self._pending is not None:
+            self._pending[2] += (time.perf_counter() - start) * 1000
+            if exhausted:
+                self._flush_pending()
+
+    def _flush_pending(self):
+        """Anota la sentencia pendiente (leída por iteración o no leída)"""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            query_profiler.record_statement(self.connection, *pending)
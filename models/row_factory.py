@@ -0,0 +1,45 @@
+"""
+Row factories de sqlite3 que crean los modelos directamente desde las filas
+"""
+
+import sqlite3
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Fábrica de filas de sqlite3: recibe el cursor y la tupla de valores
+RowFactory = Callable[[sqlite3.Cursor, tuple], Any]
+
+def model_row_factory(create: Callable[[], Any], column_attrs: Dict[str, str],
+                      finish: Optional[Callable[[Any], None]] = None) -> RowFactory:
+    """Crea una row factory que construye objetos sin pasar por ``dict(row)``
+
+    ``create`` retorna un objeto con sus valores por defecto y
+    ``column_attrs`` indica en qué atributo se guarda cada columna; las
+    columnas que no aparecen se ignoran. La correspondencia entre posiciones
+    y atributos se calcula una sola vez por consulta (mientras el cursor
+    conserve su ``description``). ``finish`` permite normalizar el objeto ya
+    relleno.
+    """
+    # (description, ((índice, atributo), ...)) de la última consulta vista
+    cached: Tuple[Any, Tuple[Tuple[int, str], ...]] = (None, ())
+
+    def factory(cursor: sqlite3.Cursor, row: tuple) -> Any:
+        nonlocal cached
+        description, mapping = cached
+        if cursor.description is not description:
+            description = cursor.description
+            mapping = tuple(
+                (index, column_attrs[column[0]])
+                for index, column in enumerate(description)
+                if column[0] in column_attrs
+            )
+            # Una sola asignación: otros hilos ven la pareja completa o la anterior
+            cached = (description, mapping)
+
+        obj = create()
+        for index, attr in mapping:
+            setattr(obj, attr, row[index])
+        if finish is not None:
+            finish(obj)
+        return obj
+
+    return factory
@@ -13,6 +13,9 @@ def run_specific_test(test_name):
     
     test_files = {
         'components': 'test_components.py',
+        'database': 'test_database_performance.py',
+        'feeds': 'test_feed_refresh.py',
+        'http': 'test_http_session.py',
         'youtube': 'test_youtube_improved.py',
         'youtube-extensive': 'test_youtube_extensive.py', 
         'demo': 'demo_youtube_fixes.py',
@@ -63,7 +66,7 @@ def main():
     """Función principal"""
     parser = argparse.ArgumentParser(description='Ejecutor de pruebas con actualización automática de documentación')
     parser.add_argument('test', nargs='?', default='all', 
-                       help='Prueba a ejecutar: components, youtube, youtube-extensive, demo, all (default: all)')
+                       help='Prueba a ejecutar: components, database, feeds, http, youtube, youtube-extensive, demo, all (default: all)')
     parser.add_argument('--update-only', action='store_true',
                        help='Solo actualizar documentación sin ejecutar pruebas')
     
@@ -0,0 +1,276 @@
+"""
+Mantenimiento periódico de la base de datos: copias de seguridad en línea,
+PRAGMA optimize, vacío incremental y retención de los registros
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from models.database import DatabaseManager
+from utils.config import config_manager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class DatabaseMaintenance:
+    """Planificador en segundo plano de las tareas de mantenimiento
+
+    Cada tarea se ejecuta cuando ha pasado su intervalo desde la última
+    ejecución correcta registrada en ``maintenance_runs``, donde también se
+    guarda su duración. Las tareas que escriben pasan por el hilo escritor
+    de la base de datos, y la copia de seguridad lee una instantánea sin
+    bloquear al escritor ni a la interfaz.
+    """
+
+    # Cada cuánto se comprueba si hay tareas pendientes
+    CHECK_INTERVAL_SECONDS = 300
+
+    def __init__(self, db_manager: DatabaseManager = None):
+        self.db_manager = db_manager or DatabaseManager()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.tasks: Dict[str, Callable[[], Optional[str]]] = {
+            'backup': self.run_backup,
+            'optimize': self.run_optimize,
+            'incremental_vacuum': self.run_incremental_vacuum,
+            'log_retention': self.run_log_retention,
+            'change_log_trim': self.run_change_log_trim,
+            'archive': self.run_archive,
+        }
+
+    def start(self):
+        """Arranca el hilo de mantenimiento"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="DatabaseMaintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Detiene el hilo de mantenimiento (la tarea en curso termina su paso actual)"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """Bucle del planificador"""
+        while not self._stop_event.is_set():
+            try:
+                self.run_pending()
+            except Exception as e:
+                logger.error(f"Error en el mantenimiento de la base de datos: {e}")
+            self._stop_event.wait(self.CHECK_INTERVAL_SECONDS)
+
+    def run_pending(self) -> List[str]:
+        """Ejecuta las tareas cuyo intervalo ha vencido; retorna sus nombres"""
+        executed = []
+        for task in self.tasks:
+            if self._stop_event.is_set():
+                break
+            if self.is_due(task):
+                self.run_task(task)
+                executed.append(task)
+        return executed
+
+    def _interval_hours(self, task: str) -> Optional[float]:
+        """Intervalo configurado de una tarea (None si está desactivada)"""
+        if task == 'backup':
+            if not config_manager.get('database.backup_enabled', True):
+                return None
+            return config_manager.get('database.backup_interval_hours', 24)
+        return config_manager.get(f'database.{task}_interval_hours', 24)
+
+    def is_due(self, task: str) -> bool:
+        """Indica si una tarea debe ejecutarse ya"""
+        interval = self._interval_hours(task)
+        if not interval:
+            return False
+        last_run = self.get_last_run(task)
+        if last_run is None:
+            return True
+        return datetime.now() - last_run >= timedelta(hours=interval)
+
+    def get_last_run(self, task: str) -> Optional[datetime]:
+        """Fecha de la última ejecución correcta de una tarea"""
+        row = self.db_manager.get_connection().execute(
+            "SELECT MAX(started_at) FROM maintenance_runs WHERE task = ? AND status = 'success'",
+            (task,)
+        ).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def run_task(self, task: str) -> bool:
+        """Ejecuta una tarea y registra su duración y resultado"""
+        started_at = datetime.now()
+        start = time.perf_counter()
+        status, message = 'success', None
+        try:
+            message = self.tasks[task]()
+        except Exception as e:
+            status, message = 'error', str(e)
+            logger.error(f"Tarea de mantenimiento '{task}' fallida: {e}")
+
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        logger.info(f"Mantenimiento '{task}': {status} en {duration_ms} ms" +
+                    (f" ({message})" if message else ""))
+
+        def record(conn: sqlite3.Connection):
+            conn.execute('''
+                INSERT INTO maintenance_runs (task, started_at, duration_ms, status, message)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (task, started_at.isoformat(sep=' ', timespec='seconds'), duration_ms, status, message))
+
+        self.db_manager.writer.submit(record).result()
+        return status == 'success'
+
+    def run_backup(self) -> str:
+        """Copia de seguridad en línea con VACUUM INTO desde una instantánea de lectura
+
+        Copia la base de datos principal y la de archivo adjunta, cada una
+        en su propio fichero.
+        """
+        backup_dir = Path(config_manager.get('database.backup_dir', 'data/backups'))
+        backup_dir.mkdir(parents=True, exist_ok=True)
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        copies = []
+        for schema, db_path in (('main', self.db_manager.db_path),
+                                ('archive', self.db_manager.archive_path)):
+            target = backup_dir / f"{db_path.stem}_{timestamp}.db"
+            self._backup_schema(schema, target)
+            self._prune_backups(backup_dir, db_path.stem)
+            copies.append(f"{target.name} ({target.stat().st_size // 1024} KiB)")
+        return ', '.join(copies)
+
+    def _backup_schema(self, schema: str, target: Path):
+        """Copia un esquema (main o adjunto) a un fichero
+
+        ``VACUUM INTO`` lee una única instantánea desde una conexión de solo
+        lectura: en modo WAL no bloquea al escritor ni vuelve a empezar
+        cuando otra conexión escribe (a diferencia de ``Connection.backup``
+        por pasos, que con escrituras continuas puede no terminar nunca).
+        Al detener el mantenimiento la copia se interrumpe.
+        """
+        partial = target.with_suffix('.db.part')
+        partial.unlink(missing_ok=True)
+
+        conn = self.db_manager.read_pool.get_connection()
+        steps = int(config_manager.get('database.read_progress_steps', 1000))
+        conn.set_progress_handler(self._stop_event.is_set, steps)
+        try:
+            conn.execute(f"VACUUM {schema} INTO ?", (str(partial),))
+        except sqlite3.OperationalError as e:
+            partial.unlink(missing_ok=True)
+            if self._stop_event.is_set():
+                raise InterruptedError("Copia de seguridad interrumpida") from e
+            raise
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+        partial.replace(target)
+
+    def _prune_backups(self, backup_dir: Path, prefix: str):
+        """Conserva solo las copias más recientes de una base de datos"""
+        keep = int(config_manager.get('database.backup_keep', 3))
+        pattern = re.compile(rf"^{re.escape(prefix)}_\d{{8}}_\d{{6}}_\d{{6}}\.db$")
+        backups = sorted(path for path in backup_dir.glob(f"{prefix}_*.db") if pattern.match(path.name))
+        for old_backup in backups[:-keep] if keep > 0 else []:
+            try:
+                old_backup.unlink()
+            except OSError as e:
+                logger.warning(f"No se pudo eliminar la copia antigua {old_backup}: {e}")
+
+    def run_optimize(self) -> Optional[str]:
+        """PRAGMA optimize: actualiza las estadísticas del planificador si hace falta"""
+        self.db_manager.writer.submit(
+            lambda conn: conn.execute("PRAGMA optimize").fetchall()
+        ).result()
+        return None
+
+    def run_incremental_vacuum(self) -> str:
+        """Devuelve al sistema las páginas libres tras borrados grandes
+
+        Con ``auto_vacuum=INCREMENTAL`` se liberan por pasos a través del
+        escritor. Las bases de datos creadas sin ese modo solo se convierten
+        si ``database.vacuum_convert_enabled`` está activado: la conversión
+        es un VACUUM completo que bloquea la base de datos mientras dura.
+        """
+        conn = self.db_manager.get_connection()
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+        if auto_vacuum != 2:
+            if not config_manager.get('database.vacuum_convert_enabled', False):
+                return f"{freelist} páginas libres, sin vacío incremental (conversión desactivada)"
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            threshold = config_manager.get('database.vacuum_convert_free_ratio', 0.25)
+            if not page_count or freelist / page_count < threshold:
+                return f"{freelist} páginas libres, sin vacío incremental"
+            return self.convert_to_incremental_vacuum()
+
+        pages_per_step = int(config_manager.get('database.vacuum_pages_per_step', 1000))
+        initial_freelist = freelist
+        while freelist > 0 and not self._stop_event.is_set():
+            step = min(pages_per_step, freelist)
+            self.db_manager.writer.submit(lambda c: self._incremental_vacuum_step(c, step)).result()
+            remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if remaining >= freelist:
+                break
+            freelist = remaining
+        return f"{initial_freelist - freelist} páginas liberadas"
+
+    def convert_to_incremental_vacuum(self) -> str:
+        """Convierte la base de datos a ``auto_vacuum=INCREMENTAL`` con un VACUUM completo
+
+        Bloquea la base de datos mientras dura (minutos en ficheros de varios
+        GB), así que solo debe lanzarse a petición del usuario o con
+        ``database.vacuum_convert_enabled``.
+        """
+        conn = self.db_manager.get_connection()
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # VACUUM no admite transacciones: se aplica fuera del escritor
+        self.db_manager.flush_writes()
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        return f"convertida a auto_vacuum=INCREMENTAL ({freelist} páginas liberadas)"
+
+    @staticmethod
+    def _incremental_vacuum_step(conn, pages: int):
+        """Libera hasta ``pages`` páginas en la transacción del escritor
+
+        Una sola sentencia, como ``optimize``. Algunas versiones de sqlite3
+        solo ejecutan un paso de las sentencias sin columnas (una página en
+        ``incremental_vacuum``); en ese caso se completan las restantes.
+        """
+        freelist_count = lambda: conn.execute("PRAGMA freelist_count").fetchone()[0]
+        before = freelist_count()
+        conn.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+        for _ in range(min(pages, before) - (before - freelist_count())):
+            conn.execute("PRAGMA incremental_vacuum(1)")
+
+    def run_log_retention(self) -> str:
+        """Retención y resumen diario del registro de procesamiento"""
+        result = self.db_manager.prune_processing_logs()
+        return f"{result['pruned']} registros purgados"
+
+    def run_change_log_trim(self) -> str:
+        """Recorte del registro de cambios que consumen los widgets"""
+        return f"{self.db_manager.trim_change_log()} cambios recortados"
+
+    def run_archive(self) -> str:
+        """Traslado de items antiguos escuchados o ignorados a la base de archivo"""
+        return f"{self.db_manager.archive_items()['archived']} items archivados"
+
+    def get_recent_runs(self, limit: int = 20) -> List[Dict]:
+        """Últimas ejecuciones de mantenimiento con su duración"""
+        cursor = self.db_manager.get_connection().execute('''
+            SELECT task, started_at, duration_ms, status, message
+            FROM maintenance_runs ORDER BY id DESC LIMIT ?
+        ''', (limit,))
+        return [dict(row) for row in cursor.fetchall()]
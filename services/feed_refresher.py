@@ -0,0 +1,246 @@
+"""
+Actualización concurrente de fuentes con límites globales y por host
+"""
+
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from models.database import DatabaseManager
+from services.poll_scheduler import PollScheduler
+from utils.config import config_manager
+from utils.logger import get_logger
+from utils.timestamps import now_epoch
+
+logger = get_logger(__name__)
+
+# Progreso: (fuentes terminadas, total, nombre de la fuente, error o None)
+ProgressCallback = Callable[[int, int, str, Optional[str]], None]
+
+class FeedRefresher:
+    """Actualiza varias fuentes a la vez sin saturar ningún servidor
+
+    Las descargas se reparten en un pool de hilos con un máximo global
+    (``network.max_concurrent_fetches``) y otro por host
+    (``network.max_fetches_per_host``): las fuentes de un mismo host esperan
+    en su cola sin ocupar hilos, de modo que el tiempo total depende del host
+    más lento y no de la suma de todos. Los errores de una fuente se
+    registran y no detienen al resto. Tras cada actualización se planifica
+    la siguiente consulta de cada fuente según su cadencia de publicación
+    (``PollScheduler``); ``refresh_due`` consulta solo las que ya tocan.
+    """
+
+    def __init__(self, db_manager: DatabaseManager = None, rss_manager=None,
+                 max_workers: int = None, per_host_limit: int = None,
+                 scheduler: PollScheduler = None):
+        self.db_manager = db_manager or DatabaseManager()
+        if rss_manager is None:
+            from services.rss_manager import RSSManager
+            rss_manager = RSSManager()
+        self.rss_manager = rss_manager
+        self.max_workers = max(1, int(max_workers or config_manager.get('network.max_concurrent_fetches', 8)))
+        self.per_host_limit = max(1, int(per_host_limit or config_manager.get('network.max_fetches_per_host', 2)))
+        self.scheduler = scheduler or PollScheduler()
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._fetch_states: Dict[int, Dict[str, Any]] = {}
+        self._not_modified = 0
+
+    def cancel(self):
+        """Deja de lanzar fuentes nuevas (las descargas en curso terminan)"""
+        self._cancel_event.set()
+
+    @staticmethod
+    def host_key(source: Dict[str, Any]) -> str:
+        """Host al que se aplica el límite (``www.`` incluido en el mismo host)"""
+        host = (urlparse(source.get('url') or '').hostname or '').lower()
+        return host[4:] if host.startswith('www.') else host
+
+    def refresh_all(self, sources: Iterable[Dict[str, Any]] = None,
+                    progress_callback: ProgressCallback = None) -> Dict[str, Any]:
+        """Actualiza las fuentes indicadas (por defecto todas las activas)
+
+        Retorna ``{'total', 'updated', 'not_modified', 'new_items',
+        'errors': {source_id: mensaje}}``.
+        """
+        if sources is None:
+            sources = self.db_manager.get_data_sources()
+        sources = list(sources)
+        summary = {'total': len(sources), 'updated': 0, 'not_modified': 0, 'new_items': 0, 'errors': {}}
+        if not sources:
+            return summary
+
+        # Validadores HTTP de la descarga anterior, leídos de una vez
+        self._fetch_states = self.db_manager.get_fetch_states([source['id'] for source in sources])
+        self._not_modified = 0
+
+        # Colas por host en orden de llegada; se sirven por turnos
+        queues: Dict[str, deque] = OrderedDict()
+        for source in sources:
+            queues.setdefault(self.host_key(source), deque()).append(source)
+        active = {host: 0 for host in queues}
+        running = {}
+        completed = 0
+        # Fuentes consultadas: True si la descarga fue bien, False si falló
+        outcomes: Dict[int, bool] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="FeedRefresh") as executor:
+            while running or (queues and not self._cancel_event.is_set()):
+                launched = True
+                while launched and len(running) < self.max_workers and not self._cancel_event.is_set():
+                    launched = False
+                    for host in list(queues):
+                        if len(running) >= self.max_workers:
+                            break
+                        if active[host] >= self.per_host_limit:
+                            continue
+                        source = queues[host].popleft()
+                        if not queues[host]:
+                            del queues[host]
+                        active[host] += 1
+                        running[executor.submit(self.refresh_source, source)] = (host, source)
+                        launched = True
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, source = running.pop(future)
+                    active[host] -= 1
+                    completed += 1
+                    error = None
+                    try:
+                        inserted = future.result()
+                        if inserted is not None:
+                            summary['new_items'] += inserted
+                            summary['updated'] += 1
+                            outcomes[source['id']] = True
+                    except Exception as e:
+                        error = str(e)
+                        outcomes[source['id']] = False
+                        summary['errors'][source['id']] = error
+                        logger.error(f"Error actualizando fuente {source['name']}: {e}")
+                    if progress_callback:
+                        progress_callback(completed, summary['total'], source['name'], error)
+
+        summary['not_modified'] = self._not_modified
+        self._schedule(outcomes)
+        return summary
+
+    def refresh_due(self, progress_callback: ProgressCallback = None, now: int = None) -> Dict[str, Any]:
+        """Actualiza solo las fuentes cuya próxima consulta ya ha llegado"""
+        return self.refresh_all(self.db_manager.get_due_sources(now), progress_callback)
+
+    def refresh_source(self, source: Dict[str, Any]) -> Optional[int]:
+        """Descarga una fuente e inserta sus entradas nuevas
+
+        Retorna cuántas entradas se insertaron o ``None`` si el tipo de
+        fuente no se actualiza. Se envían los validadores de la descarga
+        anterior del mismo feed: si no ha cambiado (304) no se parsea ni se
+        toca la tabla de items. Los validadores nuevos solo se guardan
+        después de insertar las entradas: si la inserción falla, la próxima
+        consulta descarga el feed completo en lugar de recibir un 304.
+        """
+        source_type = source['type']
+        if source_type not in ('youtube', 'rss'):
+            # TODO: Implementar detección de cambios en páginas web
+            return None
+
+        # URL de RSS (la de YouTube, resuelta o de la caché de la fuente)
+        rss_url, cached = self.resolve_feed_url(source)
+        try:
+            feed_data = self._fetch(source, rss_url)
+        except Exception:
+            # El feed guardado puede haber dejado de valer: se resuelve de nuevo
+            if not cached:
+                raise
+            fresh_url, _ = self.resolve_feed_url(source, refresh=True)
+            if fresh_url == rss_url:
+                raise
+            logger.info(f"Feed de {source['name']} resuelto de nuevo: {fresh_url}")
+            rss_url = fresh_url
+            feed_data = self._fetch(source, rss_url)
+
+        if feed_data['not_modified']:
+            with self._lock:
+                self._not_modified += 1
+            self._save_fetch_state(source, rss_url, feed_data)
+            return 0
+
+        # Añadir nuevos items en una única transacción
+        result = self.db_manager.add_content_items_bulk(source['id'], feed_data['entries'])
+        self._save_fetch_state(source, rss_url, feed_data)
+        return result['inserted_count']
+
+    def resolve_feed_url(self, source: Dict[str, Any], refresh: bool = False) -> Tuple[str, bool]:
+        """URL del feed de una fuente e indicación de si viene de la caché
+
+        Resolver un canal de YouTube por ``@handle``, ``/c/`` o nombre puede
+        costar varias descargas, así que el resultado se guarda en la fuente
+        (``feed_url`` y ``channel_id``) y solo se repite al fallar la
+        descarga o pasados ``network.youtube_resolve_ttl_days`` días. Si la
+        resolución caducada falla se sigue usando la URL guardada.
+        """
+        if source['type'] != 'youtube':
+            return source['url'], False
+
+        cached_url = source.get('feed_url')
+        ttl = float(config_manager.get('network.youtube_resolve_ttl_days', 30)) * 86400
+        if cached_url and not refresh and now_epoch() - (source.get('feed_resolved_ts') or 0) < ttl:
+            return cached_url, True
+
+        try:
+            feed_url = self.rss_manager.get_youtube_rss_url(source['url'])
+        except Exception as e:
+            if cached_url and not refresh:
+                logger.warning(f"No se pudo resolver de nuevo {source['name']}, se usa el feed guardado: {e}")
+                return cached_url, True
+            raise
+
+        channel_id = parse_qs(urlparse(feed_url).query).get('channel_id', [None])[0]
+        self.db_manager.update_feed_resolution(source['id'], feed_url, channel_id)
+        source.update(feed_url=feed_url, channel_id=channel_id, feed_resolved_ts=now_epoch())
+        return feed_url, False
+
+    def _fetch(self, source: Dict[str, Any], rss_url: str) -> Dict[str, Any]:
+        """Descarga un feed de forma condicional con los validadores guardados"""
+        state = self._fetch_states.get(source['id'])
+        if state is None or state['feed_url'] != rss_url:
+            state = {}
+        return self.rss_manager.parse_feed(
+            rss_url, etag=state.get('etag'), modified=state.get('last_modified')
+        )
+
+    def _save_fetch_state(self, source: Dict[str, Any], rss_url: str, feed_data: Dict[str, Any]):
+        """Guarda el estado y los validadores de una descarga ya procesada"""
+        # Sin esperar: el escritor lo agrupa con las demás escrituras
+        self.db_manager.update_fetch_state(
+            source['id'], rss_url, feed_data['status'], etag=feed_data['etag'],
+            last_modified=feed_data['modified']
+        )
+
+    def _schedule(self, outcomes: Dict[int, bool]):
+        """Planifica la siguiente consulta de las fuentes ya consultadas
+
+        El historial de publicación se lee después de ingerir, así que los
+        items recién llegados ya cuentan para la cadencia. Las fuentes que
+        fallan acumulan fallos consecutivos (espera exponencial); una
+        descarga correcta los pone a cero.
+        """
+        if not outcomes:
+            return
+        now = now_epoch()
+        history = self.db_manager.get_recent_publish_times(
+            [source_id for source_id, ok in outcomes.items() if ok]
+        )
+        schedule = {}
+        for source_id, ok in outcomes.items():
+            failures = 0 if ok else (self._fetch_states.get(source_id, {}).get('failure_count') or 0) + 1
+            schedule[source_id] = (
+                self.scheduler.next_check(history.get(source_id, ()), failures, now), failures
+            )
+        try:
+            self.db_manager.update_poll_schedule(schedule)
+        except Exception as e:
+            logger.error(f"Error planificando la siguiente consulta de las fuentes: {e}")
@@ -0,0 +1,68 @@
+"""
+Planificación adaptativa de la consulta de cada fuente
+"""
+
+import random
+from statistics import median
+from typing import Iterable, Optional
+from utils.config import config_manager
+from utils.timestamps import now_epoch
+
+def estimate_cadence(published_ts: Iterable[int]) -> Optional[float]:
+    """Cadencia de publicación (segundos) a partir de fechas de publicación
+
+    Mediana de los intervalos entre items consecutivos: un hueco largo o
+    una ráfaga puntual no la desplazan. ``None`` si no hay al menos dos
+    fechas distintas.
+    """
+    stamps = sorted({int(ts) for ts in published_ts if ts})
+    if len(stamps) < 2:
+        return None
+    return float(median(later - earlier for earlier, later in zip(stamps, stamps[1:])))
+
+class PollScheduler:
+    """Calcula cuándo toca volver a consultar una fuente
+
+    La espera es una fracción (``network.poll_cadence_factor``) de la
+    cadencia de la fuente, de modo que un canal diario se consulta varias
+    veces al día y un feed casi inactivo una vez al día. Si la fuente lleva
+    callada más que su cadencia, la espera crece con el silencio. Las
+    fuentes sin historial usan ``ui.refresh_interval_minutes``. Tras un
+    error la espera se duplica con cada fallo consecutivo. Todo se acota
+    entre ``network.poll_min_minutes`` y ``network.poll_max_hours`` y se
+    desplaza al azar un ``network.poll_jitter`` para no consultar todas las
+    fuentes a la vez.
+    """
+
+    def __init__(self, rng: random.Random = None):
+        self.min_interval = float(config_manager.get('network.poll_min_minutes', 15)) * 60
+        self.max_interval = max(self.min_interval,
+                                float(config_manager.get('network.poll_max_hours', 24)) * 3600)
+        self.default_interval = float(config_manager.get('ui.refresh_interval_minutes', 60)) * 60
+        self.factor = float(config_manager.get('network.poll_cadence_factor', 0.5))
+        self.jitter = float(config_manager.get('network.poll_jitter', 0.1))
+        self.rng = rng or random.Random()
+
+    def interval(self, published_ts: Iterable[int] = (), failures: int = 0,
+                 now: int = None) -> float:
+        """Espera (segundos, sin jitter) hasta la siguiente consulta"""
+        if failures > 0:
+            # min(..) antes de elevar evita desbordar con muchos fallos
+            return min(self.max_interval, self.min_interval * 2 ** min(failures, 32))
+
+        stamps = [int(ts) for ts in published_ts if ts]
+        cadence = estimate_cadence(stamps)
+        if cadence is None:
+            interval = self.default_interval
+        else:
+            silence = (now or now_epoch()) - max(stamps)
+            interval = max(cadence, silence / 2) * self.factor
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def next_check(self, published_ts: Iterable[int] = (), failures: int = 0,
+                   now: int = None) -> int:
+        """Momento (epoch) de la siguiente consulta, con jitter"""
+        now = now or now_epoch()
+        interval = self.interval(published_ts, failures, now)
+        interval *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+        return now + int(interval)
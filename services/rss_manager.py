@@ -3,11 +3,11 @@ Gestor de feeds RSS
 """
 
 import feedparser
-import requests
 from datetime import datetime
 from typing import List, Dict, Any
 from urllib.parse import urljoin, urlparse
 from utils.config import config_manager
+from utils.http_session import get_http_session
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -16,9 +16,17 @@ class RSSManager:
     """Gestor de feeds RSS"""
     
     def __init__(self):
-        self.timeout = config_manager.get('network.timeout', 30)
         self.user_agent = config_manager.get('network.user_agent', 'PyPodcast/1.0.0')
     
+    @property
+    def session(self):
+        """Sesión HTTP del hilo actual (conexiones persistentes, reintentos y timeouts)
+        
+        Se obtiene en cada uso: el gestor se crea en un hilo y sus métodos se
+        llaman desde los hilos del pool de actualización.
+        """
+        return get_http_session()
+    
     def get_youtube_rss_url(self, channel_url: str) -> str:
         """Convierte URL de canal YouTube a URL de RSS"""
         try:
@@ -105,7 +113,7 @@ class RSSManager:
             }
             
             # Intentar primero con seguimiento de redirecciones
-            response = requests.get(channel_url, headers=headers, timeout=self.timeout, allow_redirects=True)
+            response = self.session.get(channel_url, headers=headers, allow_redirects=True)
             
             # Si hay una redirección a una URL con channel ID, usarla
             if response.url != channel_url and '/channel/' in response.url:
@@ -190,13 +198,11 @@ class RSSManager:
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
                 'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
                 'DNT': '1',
-                'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1'
             }
             
-            response = requests.get(channel_url, headers=headers, timeout=self.timeout)
+            response = self.session.get(channel_url, headers=headers)
             response.raise_for_status()
             content = response.text
             
@@ -224,14 +230,37 @@ class RSSManager:
             logger.error(f"Error extrayendo channel ID del código fuente: {e}")
             raise
 
-    def parse_feed(self, feed_url: str) -> Dict[str, Any]:
-        """Parsea un feed RSS y retorna información del canal y entradas"""
+    def parse_feed(self, feed_url: str, etag: str = None, modified: str = None) -> Dict[str, Any]:
+        """Parsea un feed RSS y retorna información del canal y entradas
+        
+        ``etag`` y ``modified`` son los validadores de la descarga anterior:
+        se envían como ``If-None-Match`` / ``If-Modified-Since`` y, si el
+        servidor responde 304, se retorna ``not_modified`` sin entradas. El
+        resultado incluye siempre ``status``, ``etag`` y ``modified`` para
+        la siguiente consulta.
+        """
         try:
-            # Configurar feedparser
-            feedparser.USER_AGENT = self.user_agent
+            # Descarga con la sesión compartida (petición condicional si hay validadores)
+            headers = {}
+            if etag:
+                headers['If-None-Match'] = etag
+            if modified:
+                headers['If-Modified-Since'] = modified
+            response = self.session.get(feed_url, headers=headers)
+            validators = {
+                'status': response.status_code,
+                'etag': response.headers.get('ETag'),
+                'modified': response.headers.get('Last-Modified'),
+            }
             
-            # Parsear feed
-            feed = feedparser.parse(feed_url)
+            # Sin cambios desde la última descarga: no hay nada que parsear
+            if response.status_code == 304:
+                return {'not_modified': True, 'channel': None, 'entries': [],
+                        'total_entries': 0, **validators}
+            response.raise_for_status()
+            
+            # feedparser recibe los bytes ya descargados (y descomprimidos)
+            feed = feedparser.parse(response.content, response_headers=self._feed_headers(response))
             
             if feed.bozo and feed.bozo_exception:
                 logger.warning(f"Feed RSS con errores: {feed.bozo_exception}")
@@ -259,9 +288,11 @@ class RSSManager:
                 entries.append(entry_data)
             
             return {
+                'not_modified': False,
                 'channel': channel_info,
                 'entries': entries,
-                'total_entries': len(entries)
+                'total_entries': len(entries),
+                **validators
             }
             
         except Exception as e:
@@ -339,10 +370,21 @@ class RSSManager:
             logger.warning(f"No se pudo parsear fecha: {date_string}")
             return None
     
+    @staticmethod
+    def _feed_headers(response) -> Dict[str, str]:
+        """Cabeceras que feedparser usa para resolver URLs relativas y la codificación"""
+        return {
+            'content-location': response.url,
+            'content-type': response.headers.get('Content-Type', ''),
+        }
+    
     def validate_feed_url(self, url: str) -> bool:
         """Valida si una URL es un feed RSS válido"""
         try:
-            feed = feedparser.parse(url)
+            response = self.session.get(url)
+            if not response.ok:
+                return False
+            feed = feedparser.parse(response.content, response_headers=self._feed_headers(response))
             return not feed.bozo or len(feed.entries) > 0
         except Exception:
             return False
@@ -350,8 +392,7 @@ class RSSManager:
     def discover_feeds(self, website_url: str) -> List[str]:
         """Descubre feeds RSS en una página web"""
         try:
-            headers = {'User-Agent': self.user_agent}
-            response = requests.get(website_url, headers=headers, timeout=self.timeout)
+            response = self.session.get(website_url)
             response.raise_for_status()
             
             from bs4 import BeautifulSoup
@@ -2,12 +2,12 @@
 Extractor de contenido web
 """
 
-import requests
 from bs4 import BeautifulSoup, Comment
 import re
 from typing import Dict, Any, Optional
 from urllib.parse import urljoin, urlparse
 from utils.config import config_manager
+from utils.http_session import get_http_session
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -16,23 +16,24 @@ class WebExtractor:
     """Extractor de contenido de páginas web"""
     
     def __init__(self):
-        self.timeout = config_manager.get('network.timeout', 30)
         self.user_agent = config_manager.get('network.user_agent', 'PyPodcast/1.0.0')
         self.max_content_length = 1000000  # 1MB máximo
     
+    @property
+    def session(self):
+        """Sesión HTTP del hilo que hace la petición (ver ``get_http_session``)"""
+        return get_http_session()
+    
     def extract_content(self, url: str) -> Dict[str, Any]:
         """Extrae contenido principal de una página web"""
         try:
             # Obtener contenido HTML
             headers = {
-                'User-Agent': self.user_agent,
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
                 'Accept-Language': 'es,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
             }
             
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = self.session.get(url, headers=headers)
             response.raise_for_status()
             
             # Verificar tamaño del contenido
@@ -0,0 +1,1632 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para las optimizaciones de rendimiento de la base de datos
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Añadir directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils.config import config_manager
+
+# Usar una base de datos temporal para no tocar los datos reales
+TEMP_DIR = tempfile.mkdtemp(prefix="pypodcast_test_")
+config_manager.set('database.path', str(Path(TEMP_DIR) / "test.db"))
+
+from models.database import DatabaseManager
+from utils.timestamps import now_epoch, to_epoch
+
+def create_test_source(db: DatabaseManager, name: str = "Fuente de prueba") -> int:
+    """Crea una fuente de datos de prueba"""
+    return db.add_data_source(
+        name=name,
+        source_type="rss",
+        url=f"https://ejemplo.com/{name.replace(' ', '_')}.xml"
+    )
+
+def test_connection_pool():
+    """Prueba el pool de conexiones por hilo en modo WAL"""
+    print("\n🔌 Probando pool de conexiones...")
+
+    try:
+        db = DatabaseManager()
+        db.initialize_database()
+
+        conn = db.get_connection()
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if journal_mode != 'wal':
+            print(f"❌ Modo de journal inesperado: {journal_mode}")
+            return False
+        print("✅ Modo WAL activo")
+
+        if DatabaseManager().get_connection() is not conn:
+            print("❌ El mismo hilo no reutiliza su conexión")
+            return False
+        print("✅ Conexión reutilizada dentro del mismo hilo")
+
+        source_id = create_test_source(db, "Pool")
+        errors = []
+
+        def writer(thread_index: int):
+            try:
+                thread_db = DatabaseManager()
+                for i in range(50):
+                    thread_db.add_content_item(
+                        source_id, f"Item {i}", f"https://ejemplo.com/pool/{thread_index}/{i}"
+                    )
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            print(f"❌ Errores en escrituras concurrentes: {errors[0]}")
+            return False
+
+        count = db.get_item_count_by_source(source_id)
+        if count != 300:
+            print(f"❌ Se esperaban 300 items, hay {count}")
+            return False
+        print("✅ Escrituras concurrentes desde 6 hilos sin bloqueos")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en pool de conexiones: {e}")
+        return False
+
+def test_bulk_ingest():
+    """Prueba la inserción masiva de entradas de un feed"""
+    print("\n📥 Probando inserción masiva...")
+
+    try:
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Bulk")
+
+        entries = [
+            {
+                'title': f"Entrada {i}",
+                'url': f"https://ejemplo.com/bulk/{i}",
+                'description': f"Descripción {i}",
+                'published_date': None
+            }
+            for i in range(400)
+        ]
+
+        result = db.add_content_items_bulk(source_id, entries)
+        if result['inserted_count'] != 400 or len(result['inserted_ids']) != 400:
+            print(f"❌ Se esperaban 400 items nuevos, se insertaron {result['inserted_count']}")
+            return False
+        print("✅ 400 entradas insertadas en una transacción")
+
+        # Repetir con 10 entradas nuevas: las existentes se ignoran
+        entries.extend(
+            {'title': f"Nueva {i}", 'url': f"https://ejemplo.com/bulk/nueva/{i}"}
+            for i in range(10)
+        )
+        result = db.add_content_items_bulk(source_id, entries)
+        if result['inserted_count'] != 10:
+            print(f"❌ Se esperaban 10 items nuevos, se insertaron {result['inserted_count']}")
+            return False
+        print("✅ URLs existentes ignoradas sin errores")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en inserción masiva: {e}")
+        return False
+
+def test_keyset_listing():
+    """Prueba el listado paginado por cursor con columnas proyectadas"""
+    print("\n📄 Probando listado paginado...")
+
+    try:
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Listado")
+
+        entries = [
+            {
+                'title': f"Item {i}",
+                'url': f"https://ejemplo.com/listado/{i}",
+                'description': "x" * 1000,
+                # Un tercio sin fecha de publicación
+                'published_date': None if i % 3 == 0 else f"2024-01-{(i % 28) + 1:02d} 10:00:00"
+            }
+            for i in range(250)
+        ]
+        db.add_content_items_bulk(source_id, entries)
+
+        seen_ids = []
+        cursor = None
+        pages = 0
+        while True:
+            page = db.get_content_list(source_id=source_id, limit=40, cursor=cursor)
+            seen_ids.extend(item['id'] for item in page['items'])
+            pages += 1
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        if len(seen_ids) != 250 or len(set(seen_ids)) != 250:
+            print(f"❌ La paginación devolvió {len(seen_ids)} items ({len(set(seen_ids))} únicos)")
+            return False
+        print(f"✅ 250 items recorridos en {pages} páginas sin duplicados")
+
+        item = db.get_content_list(source_id=source_id, limit=1)['items'][0]
+        if 'content' in item or len(item['description']) > DatabaseManager.LIST_DESCRIPTION_LENGTH:
+            print("❌ El listado carga columnas de texto completo")
+            return False
+        print("✅ El listado solo proyecta las columnas necesarias")
+
+        for condition, value in (("source_id = ?", source_id), ("status = ?", 'nuevo')):
+            plan = db.get_connection().execute(
+                f"EXPLAIN QUERY PLAN SELECT id FROM content_items WHERE {condition} "
+                "AND published_ts IS NOT NULL ORDER BY published_ts DESC, id DESC LIMIT 10",
+                (value,)
+            ).fetchall()
+            plan_text = " ".join(row[-1] for row in plan)
+            if "TEMP B-TREE" in plan_text:
+                print(f"❌ El listado requiere ordenación temporal: {plan_text}")
+                return False
+        print("✅ Los índices compuestos cubren el ORDER BY por fuente y por estado")
+
+        first = db.get_content_list(source_id=source_id, limit=1)['items'][0]
+        if first['published_ts'] != to_epoch("2024-01-28 10:00:00"):
+            print(f"❌ Fecha de publicación mal convertida: {first}")
+            return False
+        print("✅ Fechas convertidas a segundos epoch al ingerir")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en listado paginado: {e}")
+        return False
+
+def test_full_text_search():
+    """Prueba el índice FTS5 y su sincronización mediante triggers"""
+    print("\n🔍 Probando búsqueda de texto completo...")
+
+    try:
+        db = DatabaseManager()
+        source_a = create_test_source(db, "Busqueda A")
+        source_b = create_test_source(db, "Busqueda B")
+
+        item_a = db.add_content_item(source_a, "Energía solar en España", "https://ejemplo.com/fts/1",
+                                     description="Paneles fotovoltaicos")
+        item_b = db.add_content_item(source_b, "Podcast de cocina", "https://ejemplo.com/fts/2",
+                                     content="Receta tradicional con energía y paciencia")
+
+        results = db.search("energia")
+        if {r['id'] for r in results} != {item_a, item_b}:
+            print(f"❌ Resultados inesperados en toda la biblioteca: {results}")
+            return False
+        if results[0]['id'] != item_a:
+            print("❌ La coincidencia en el título debería puntuar más alto")
+            return False
+        print("✅ Búsqueda en toda la biblioteca ordenada por bm25 (sin acentos)")
+
+        results = db.search("energía", source_id=source_b)
+        if [r['id'] for r in results] != [item_b] or '«' not in results[0]['snippet']:
+            print(f"❌ Filtro por fuente o fragmento incorrecto: {results}")
+            return False
+        print("✅ Filtro por fuente y fragmentos resaltados")
+
+        db.update_content_item_text(item_b, content="Receta de lentejas")
+        db.update_content_item_files(item_a, summary="Resumen sobre baterías")
+        if db.search("paciencia") or [r['id'] for r in db.search("baterias")] != [item_a]:
+            print("❌ El índice no se sincroniza con las actualizaciones")
+            return False
+        print("✅ Triggers mantienen el índice sincronizado")
+
+        if db.search('"') or db.search("AND OR (") is None:
+            print("❌ La entrada del usuario rompe la consulta MATCH")
+            return False
+        print("✅ Consultas con operadores y comillas tratadas de forma segura")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en búsqueda de texto completo: {e}")
+        return False
+
+def test_content_repository():
+    """Prueba el repositorio con mapa de identidad e invalidación"""
+    print("\n🗂️ Probando repositorio de contenido...")
+
+    try:
+        from models.content_repository import ContentRepository
+
+        db = DatabaseManager()
+        repository = ContentRepository(db, max_size=3)
+        source_id = create_test_source(db, "Repositorio")
+        item_ids = db.add_content_items_bulk(source_id, [
+            {'title': f"Item {i}", 'url': f"https://ejemplo.com/repo/{i}"}
+            for i in range(5)
+        ])['inserted_ids']
+
+        first = repository.get(item_ids[0])
+        if repository.get(item_ids[0]) is not first or repository.hits != 1:
+            print("❌ El mapa de identidad no devuelve el mismo objeto")
+            return False
+        print("✅ Mapa de identidad: misma instancia desde la caché")
+
+        items = repository.get_many(item_ids)
+        if [item.id for item in items] != item_ids or len(repository._items) != 3:
+            print("❌ get_many no respeta el orden o el tamaño máximo LRU")
+            return False
+        print("✅ get_many en orden y caché limitada por LRU")
+
+        cached = repository.get(item_ids[-1])
+        db.update_content_item_status(item_ids[-1], 'escuchado')
+        refreshed = repository.get(item_ids[-1])
+        if refreshed is cached or refreshed.status != 'escuchado':
+            print("❌ La actualización no invalida la caché")
+            return False
+        print("✅ Las actualizaciones expulsan el item de la caché")
+
+        # Una escritura confirmada durante la lectura: el item leído no se guarda
+        class EvictingDatabase:
+            def __init__(self):
+                self.db = db
+
+            def __getattr__(self, name):
+                return getattr(self.db, name)
+
+            def get_content_item(self, item_id):
+                data = self.db.get_content_item(item_id)
+                repository.evict([item_id])
+                return data
+
+        repository.db_manager = EvictingDatabase()
+        repository.clear()
+        stale = repository.get(item_ids[0])
+        if stale is None or item_ids[0] in repository._items or repository._generations:
+            print("❌ Se guardó en caché un item expulsado durante su lectura")
+            return False
+        repository.db_manager = db
+        if repository.get(item_ids[0]) is not repository.get(item_ids[0]):
+            print("❌ Las lecturas sin expulsión deben guardarse en caché")
+            return False
+        print("✅ Las lecturas concurrentes con una escritura no dejan datos obsoletos en caché")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en repositorio de contenido: {e}")
+        return False
+
+def test_content_stats():
+    """Prueba las estadísticas agregadas y los contadores por triggers"""
+    print("\n📊 Probando estadísticas agregadas...")
+
+    try:
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Estadisticas")
+        item_ids = db.add_content_items_bulk(source_id, [
+            {'title': f"Item {i}", 'url': f"https://ejemplo.com/stats/{i}"}
+            for i in range(10)
+        ])['inserted_ids']
+        db.update_content_item_status(item_ids[0], 'escuchado')
+        db.update_content_item_status(item_ids[1], 'ignorar')
+
+        stats = db.get_content_stats()
+        source_stats = stats['by_source'][source_id]
+        expected = {'nuevo': 8, 'escuchado': 1, 'ignorar': 1}
+        if source_stats['total'] != 10 or source_stats['by_status'] != expected:
+            print(f"❌ Conteos por fuente incorrectos: {source_stats}")
+            return False
+        print("✅ Conteos por fuente y estado desde los contadores")
+
+        # Comparar con el cálculo exacto mediante GROUP BY
+        config_manager.set('database.stats_counters', False)
+        exact = db.get_content_stats()
+        config_manager.set('database.stats_counters', True)
+        if exact != stats:
+            print("❌ Los contadores no coinciden con el GROUP BY")
+            return False
+        print("✅ Contadores coherentes con el cálculo exacto")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en estadísticas: {e}")
+        return False
+
+def test_schema_migrations():
+    """Prueba el sistema de migraciones versionadas e incrementales"""
+    print("\n🧬 Probando migraciones de esquema...")
+
+    try:
+        import sqlite3
+        from models.migrations import MIGRATIONS, Migration, MigrationRunner
+
+        db = DatabaseManager()
+        if db.get_schema_version() != MIGRATIONS[-1].version:
+            print(f"❌ Versión de esquema inesperada: {db.get_schema_version()}")
+            return False
+        print(f"✅ Esquema en la versión más reciente (v{db.get_schema_version()})")
+
+        # Base de datos anterior a las migraciones (user_version 0) con datos
+        conn = sqlite3.connect(":memory:")
+        MIGRATIONS[0].apply(conn)
+        conn.execute("INSERT INTO data_sources (name, type, url) VALUES ('a', 'rss', 'https://a')")
+        conn.executemany(
+            "INSERT INTO content_items (source_id, title, url) VALUES (1, ?, ?)",
+            [(f"Item {i}", f"https://a/{i}") for i in range(25)]
+        )
+        conn.commit()
+
+        def add_column(c):
+            c.execute("ALTER TABLE content_items ADD COLUMN title_length INTEGER")
+
+        def fill_batch(c, cursor, batch_size):
+            rows = c.execute(
+                "SELECT id FROM content_items WHERE id > ? ORDER BY id LIMIT ?",
+                (cursor, batch_size)
+            ).fetchall()
+            if not rows:
+                return None
+            c.executemany(
+                "UPDATE content_items SET title_length = length(title) WHERE id = ?", rows
+            )
+            return rows[-1][0]
+
+        if MigrationRunner(conn).run() is not True:
+            print("❌ Las migraciones de la aplicación no se completaron")
+            return False
+        if conn.execute("SELECT COUNT(*) FROM content_items WHERE created_ts IS NULL").fetchone()[0]:
+            print("❌ Fechas existentes no convertidas a segundos epoch")
+            return False
+        if conn.execute("SELECT COUNT(*) FROM change_log").fetchone()[0]:
+            print("❌ Los rellenos de las migraciones no deben quedar en el registro de cambios")
+            return False
+
+        migrations = MIGRATIONS + [
+            Migration(MIGRATIONS[-1].version + 1, "Prueba incremental", add_column, fill_batch)
+        ]
+        runner = MigrationRunner(conn, migrations, batch_size=10)
+
+        if runner.run(max_batches=2) or runner.current_version() != MIGRATIONS[-1].version:
+            print("❌ La migración incremental debería quedar pendiente")
+            return False
+        if runner.run() is not True or runner.current_version() != migrations[-1].version:
+            print("❌ La migración incremental no se completó")
+            return False
+
+        missing = conn.execute(
+            "SELECT COUNT(*) FROM content_items WHERE title_length IS NULL"
+        ).fetchone()[0]
+        if missing:
+            print(f"❌ Quedaron {missing} filas sin migrar")
+            return False
+        print("✅ Migración incremental por lotes reanudable")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en migraciones: {e}")
+        return False
+
+def test_compressed_bodies():
+    """Prueba los textos comprimidos en content_bodies y su carga diferida"""
+    print("\n🗜️ Probando textos comprimidos...")
+
+    try:
+        import sqlite3
+        from models.content_repository import ContentRepository
+        from models.migrations import MIGRATIONS, MigrationRunner
+        from utils.text_compression import compress_text, decompress_text
+
+        long_text = "Transcripción larga sobre astronomía y telescopios. " * 200
+        blob = compress_text(long_text)
+        if decompress_text(blob) != long_text or len(blob) >= len(long_text.encode('utf-8')) / 4:
+            print("❌ La compresión no es reversible o no reduce el tamaño")
+            return False
+        print(f"✅ Compresión reversible ({len(long_text.encode('utf-8'))} → {len(blob)} bytes)")
+
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Textos comprimidos")
+        item_id = db.add_content_item(source_id, "Noche de estrellas", "https://ejemplo.com/body/1",
+                                      content=long_text)
+        db.update_content_item_files(item_id, summary="Resumen sobre nebulosas")
+
+        with db.get_connection() as conn:
+            inline = conn.execute(
+                "SELECT content, summary, has_content, has_summary FROM content_items WHERE id = ?",
+                (item_id,)
+            ).fetchone()
+        if inline['content'] is not None or inline['summary'] is not None or \
+                not inline['has_content'] or not inline['has_summary']:
+            print(f"❌ Los textos deberían estar fuera de content_items: {dict(inline)}")
+            return False
+
+        page = db.get_content_list(source_id=source_id)
+        if not page['items'][0]['has_summary']:
+            print("❌ El listado no refleja el indicador de resumen")
+            return False
+
+        repository = ContentRepository(db, max_size=10)
+        item = repository.get(item_id)
+        if not item.has_summary or item.body_loaded:
+            print("❌ El item debería cargar los textos solo bajo demanda")
+            return False
+        if item.content != long_text or item.summary != "Resumen sobre nebulosas":
+            print("❌ Textos cargados incorrectos")
+            return False
+        print("✅ Textos fuera de la tabla principal y cargados bajo demanda")
+
+        if [r['id'] for r in db.search("telescopios")] != [item_id] or \
+                [r['id'] for r in db.search("nebulosas")] != [item_id]:
+            print("❌ La búsqueda no encuentra textos comprimidos")
+            return False
+        db.update_content_item_text(item_id, content="Nuevo texto sobre cometas")
+        if db.search("telescopios") or [r['id'] for r in db.search("cometas")] != [item_id]:
+            print("❌ El índice no se sincroniza con los textos comprimidos")
+            return False
+        db.delete_data_source_and_content(source_id)
+        if db.search("cometas") or db.get_content_body(item_id)['content'] is not None:
+            print("❌ El borrado no limpia textos ni índice")
+            return False
+        print("✅ Búsqueda sincronizada con los textos comprimidos")
+
+        # Base de datos con textos en línea (versión 3) migrada a content_bodies
+        conn = sqlite3.connect(":memory:")
+        conn.row_factory = sqlite3.Row
+        runner = MigrationRunner(conn, MIGRATIONS[:3])
+        runner.run()
+        conn.execute("INSERT INTO data_sources (name, type, url) VALUES ('Antigua', 'rss', 'x')")
+        conn.execute('''
+            INSERT INTO content_items (source_id, title, url, content, summary)
+            VALUES (1, 'Antiguo', 'https://ejemplo.com/antiguo', ?, 'Resumen en línea')
+        ''', (long_text,))
+        conn.commit()
+
+        if MigrationRunner(conn, batch_size=1).run() is not True:
+            print("❌ La migración de textos no se completó")
+            return False
+        row = conn.execute('''
+            SELECT ci.content, ci.has_content, ci.has_summary,
+                   pp_inflate(cb.content) AS body, pp_inflate(cb.summary) AS body_summary
+            FROM content_items ci JOIN content_bodies cb ON cb.item_id = ci.id
+        ''').fetchone()
+        if row['content'] is not None or row['body'] != long_text or \
+                row['body_summary'] != 'Resumen en línea' or not row['has_content'] or not row['has_summary']:
+            print("❌ Los textos en línea no se movieron a content_bodies")
+            return False
+        matches = conn.execute(
+            "SELECT rowid FROM content_items_fts WHERE content_items_fts MATCH 'telescopios'"
+        ).fetchall()
+        if len(matches) != 1:
+            print("❌ El índice no se reconstruyó tras la migración")
+            return False
+        print("✅ Migración de textos en línea a content_bodies")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en textos comprimidos: {e}")
+        return False
+
+def test_write_behind():
+    """Prueba el escritor en segundo plano con commits agrupados"""
+    print("\n✍️ Probando escritor en segundo plano...")
+
+    try:
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Escritor")
+        item_ids = db.add_content_items_bulk(source_id, [
+            {'title': f"Escritura {i}", 'url': f"https://ejemplo.com/writer/{i}"}
+            for i in range(40)
+        ])['inserted_ids']
+
+        batches_before = db.writer.batches_committed
+        futures = []
+        for item_id in item_ids:
+            futures.append(db.update_content_item_status(item_id, 'procesado', wait=False))
+            futures.append(db.log_processing_action(item_id, 'process', 'success'))
+        for future in futures:
+            future.result(timeout=10)
+
+        batches = db.writer.batches_committed - batches_before
+        if batches >= len(futures):
+            print(f"❌ Las escrituras no se agruparon ({batches} commits para {len(futures)} trabajos)")
+            return False
+        print(f"✅ {len(futures)} escrituras confirmadas en {batches} transacciones")
+
+        stats = db.get_content_stats()['by_source'][source_id]['by_status']
+        if stats.get('procesado') != len(item_ids):
+            print(f"❌ Estados no aplicados: {stats}")
+            return False
+
+        # Un trabajo que falla solo revierte su propio SAVEPOINT
+        def failing_job(conn):
+            conn.execute("UPDATE content_items SET title = 'Revertido' WHERE id = ?", (item_ids[0],))
+            raise ValueError("fallo de prueba")
+
+        failed = db.writer.submit(failing_job)
+        ok = db.update_content_item_status(item_ids[1], 'escuchado', wait=False)
+        try:
+            failed.result(timeout=10)
+            print("❌ El trabajo fallido debería propagar su excepción")
+            return False
+        except ValueError:
+            pass
+        ok.result(timeout=10)
+
+        first = db.get_content_item(item_ids[0])
+        second = db.get_content_item(item_ids[1])
+        if first['title'] == 'Revertido' or second['status'] != 'escuchado':
+            print("❌ El fallo de un trabajo afectó al resto del lote")
+            return False
+        print("✅ Cada trabajo aislado en su SAVEPOINT y errores en su futuro")
+
+        if db.add_content_item(source_id, "Duplicado", "https://ejemplo.com/writer/0") is not None:
+            print("❌ El duplicado debería retornar None")
+            return False
+        print("✅ Escrituras síncronas con resultado a través del futuro")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en escritor en segundo plano: {e}")
+        return False
+
+def test_processing_log_retention():
+    """Prueba la retención y el resumen diario del registro de procesamiento"""
+    print("\n🧾 Probando retención del registro de procesamiento...")
+
+    try:
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Registro")
+        item_id = db.add_content_item(source_id, "Con registro", "https://ejemplo.com/logs/1")
+
+        def add_logs(conn):
+            conn.executemany('''
+                INSERT INTO processing_logs (item_id, action, status, created_at)
+                VALUES (?, 'process', ?, datetime('now', ?, '+12 hours'))
+            ''', [(item_id, 'success' if i % 3 else 'error', f"-{200 - i} days") for i in range(120)] +
+                [(item_id, 'success', '-1 days') for _ in range(30)])
+        db.writer.submit(add_logs).result(timeout=10)
+
+        with db.get_connection() as conn:
+            plan = ' '.join(row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM processing_logs WHERE item_id = ?", (item_id,)
+            ))
+        if 'idx_processing_logs_item_id' not in plan:
+            print(f"❌ La consulta por item no usa el índice: {plan}")
+            return False
+        print("✅ Índice sobre processing_logs.item_id")
+
+        before = db.get_processing_log_summary(days=365)
+        db.LOG_PRUNE_BATCH_SIZE = 25
+        result = db.prune_processing_logs(max_age_days=90, max_rows=100)
+        after = db.get_processing_log_summary(days=365)
+
+        with db.get_connection() as conn:
+            remaining = conn.execute("SELECT COUNT(*) FROM processing_logs").fetchone()[0]
+            oldest = conn.execute(
+                "SELECT MIN(created_at) >= datetime('now', '-90 days') FROM processing_logs"
+            ).fetchone()[0]
+        if result['pruned'] == 0 or remaining > 100 or not oldest:
+            print(f"❌ Retención no aplicada: {result}, quedan {remaining}")
+            return False
+        print(f"✅ {result['pruned']} registros purgados por antigüedad y número de filas")
+
+        if sum(r['count'] for r in before) != sum(r['count'] for r in after) or before != after:
+            print("❌ El resumen diario no conserva los conteos purgados")
+            return False
+        print("✅ Resumen diario por acción y estado conservado")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en retención del registro: {e}")
+        return False
+
+def test_url_canonicalization():
+    """Prueba la deduplicación por hash de la URL canónica"""
+    print("\n🔗 Probando URLs canónicas...")
+
+    try:
+        import sqlite3
+        from models.migrations import MIGRATIONS, MigrationRunner
+        from utils.url_canonical import canonicalize_url, url_hash
+
+        equivalent = [
+            ("https://youtu.be/dQw4w9WgXcQ?si=abc", "https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10"),
+            ("https://m.youtube.com/shorts/dQw4w9WgXcQ", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+            ("HTTPS://Ejemplo.COM:443/articulo/?utm_source=rss&b=2&a=1#comentarios",
+             "https://ejemplo.com/articulo?a=1&b=2"),
+            ("http://ejemplo.com:80/", "http://ejemplo.com"),
+        ]
+        for original, expected in equivalent:
+            if url_hash(original) != url_hash(expected):
+                print(f"❌ {original} → {canonicalize_url(original)} (esperado {canonicalize_url(expected)})")
+                return False
+        if url_hash("https://ejemplo.com/a?id=1") == url_hash("https://ejemplo.com/a?id=2"):
+            print("❌ Parámetros significativos no deben ignorarse")
+            return False
+        print("✅ YouTube, parámetros de seguimiento, mayúsculas y puertos normalizados")
+
+        db = DatabaseManager()
+        source_a = create_test_source(db, "Canónica A")
+        source_b = create_test_source(db, "Canónica B")
+        result = db.add_content_items_bulk(source_a, [
+            {'title': "Artículo", 'url': "https://ejemplo.com/canonica/1?utm_medium=feed"},
+            {'title': "Artículo repetido", 'url': "https://EJEMPLO.com/canonica/1/"},
+            {'title': "Vídeo", 'url': "https://youtu.be/aBcDeFgHiJk"},
+        ])
+        if result['inserted_count'] != 2:
+            print(f"❌ Duplicados en el mismo lote: {result}")
+            return False
+        result = db.add_content_items_bulk(source_b, [
+            {'title': "Vídeo en otro feed", 'url': "https://www.youtube.com/watch?v=aBcDeFgHiJk&feature=share"},
+            {'title': "Otro", 'url': "https://ejemplo.com/canonica/2"},
+        ])
+        if result['inserted_count'] != 1:
+            print(f"❌ Duplicados entre feeds: {result}")
+            return False
+        if db.add_content_item(source_b, "Repetido", "https://ejemplo.com/canonica/2#top") is not None:
+            print("❌ add_content_item debería detectar el duplicado")
+            return False
+        stored = db.get_content_item(result['inserted_ids'][0])
+        if stored['url'] != "https://ejemplo.com/canonica/2":
+            print(f"❌ URL no guardada en forma canónica: {stored['url']}")
+            return False
+        print("✅ Duplicados descartados al ingerir, en el lote y entre feeds")
+
+        # Base de datos anterior: el hash se rellena y los duplicados quedan sin hash
+        conn = sqlite3.connect(":memory:")
+        MigrationRunner(conn, MIGRATIONS[:5]).run()
+        conn.execute("INSERT INTO data_sources (name, type, url) VALUES ('Antigua', 'rss', 'x')")
+        conn.executemany(
+            "INSERT INTO content_items (source_id, title, url) VALUES (1, 'Antiguo', ?)",
+            [("https://ejemplo.com/viejo",), ("https://ejemplo.com/viejo/?utm_source=x",),
+             ("https://ejemplo.com/otro",)]
+        )
+        conn.commit()
+        if MigrationRunner(conn, batch_size=2).run() is not True:
+            print("❌ La migración del hash no se completó")
+            return False
+        hashes = [row[0] for row in conn.execute("SELECT url_hash FROM content_items ORDER BY id")]
+        if hashes[0] != url_hash("https://ejemplo.com/viejo") or hashes[1] is not None or hashes[2] is None:
+            print(f"❌ Hashes migrados incorrectos: {hashes}")
+            return False
+        print("✅ Migración del hash en items existentes")
+
+        # Colisión de hash: otra URL con el mismo hash se guarda sin hash
+        import models.database as database_module
+        colliding = {"https://ejemplo.com/colision/a", "https://ejemplo.com/colision/b"}
+        real_hash = database_module.url_hash
+        database_module.url_hash = lambda url: 42 if url in colliding else real_hash(url)
+        try:
+            first = db.add_content_items_bulk(source_a, [{'title': "A", 'url': "https://ejemplo.com/colision/a"}])
+            second = db.add_content_item(source_a, "B", "https://ejemplo.com/colision/b")
+            again = db.add_content_items_bulk(source_b, [
+                {'title': "A otra vez", 'url': "https://ejemplo.com/colision/a"},
+                {'title': "B otra vez", 'url': "https://ejemplo.com/colision/b"},
+            ])
+        finally:
+            database_module.url_hash = real_hash
+        with db.get_connection() as conn:
+            stored_hash = conn.execute("SELECT url_hash FROM content_items WHERE id = ?", (second,)).fetchone()
+        if first['inserted_count'] != 1 or second is None or again['inserted_count'] != 0 or \
+                stored_hash[0] is not None:
+            print(f"❌ Colisión de hash mal resuelta: {first}, {second}, {again}")
+            return False
+        print("✅ Las colisiones de hash se distinguen comparando la URL")
+
+        # Base de datos que aplicó la migración 11 con url UNIQUE
+        conn = sqlite3.connect(":memory:")
+        MigrationRunner(conn, [m for m in MIGRATIONS if m.version not in (11, 16)]).run()
+        conn.execute("INSERT INTO data_sources (name, type, url) VALUES ('Antigua', 'rss', 'x')")
+        conn.executemany(
+            "INSERT INTO content_items (source_id, title, url, url_hash) VALUES (1, 'Antiguo', ?, ?)",
+            [(f"https://ejemplo.com/unica/{i}", i) for i in range(5)]
+        )
+        conn.commit()
+        runner = MigrationRunner(conn, [m for m in MIGRATIONS if m.version != 11], batch_size=2)
+        if runner.run() is not True:
+            print("❌ La migración que quita UNIQUE de la URL no se completó")
+            return False
+        indexes = {row[1]: row[2] for row in conn.execute("PRAGMA index_list(content_items)")}
+        unique_url = any(
+            unique and [row[2] for row in conn.execute(f"PRAGMA index_info('{name}')")] == ['url']
+            for name, unique in indexes.items()
+        )
+        count = conn.execute("SELECT COUNT(*) FROM content_items").fetchone()[0]
+        if unique_url or count != 5 or 'idx_content_items_url_unhashed' not in indexes:
+            print(f"❌ content_items.url sigue siendo UNIQUE o se perdieron filas: {indexes}, {count}")
+            return False
+        conn.close()
+        print("✅ La URL ya no lleva índice UNIQUE; basta el del hash")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en URLs canónicas: {e}")
+        return False
+
+class PlainDatabase:
+    """Base de datos mínima sobre una conexión, sin escritor ni migraciones"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get_connection(self):
+        return self.conn
+
+    def flush_writes(self, timeout=None):
+        return True
+
+def test_database_maintenance():
+    """Prueba las tareas de mantenimiento (copia en línea, optimize, vacío)"""
+    print("\n🧹 Probando mantenimiento de la base de datos...")
+
+    try:
+        import sqlite3
+        from services.database_maintenance import DatabaseMaintenance
+
+        config_manager.set('database.backup_dir', str(Path(TEMP_DIR) / "backups"))
+        config_manager.set('database.backup_keep', 2)
+
+        db = DatabaseManager()
+        maintenance = DatabaseMaintenance(db)
+        source_id = create_test_source(db, "Mantenimiento")
+        db.add_content_items_bulk(source_id, [
+            {'title': f"Mantenimiento {i}", 'url': f"https://ejemplo.com/mant/{i}",
+             'description': "x" * 500}
+            for i in range(300)
+        ])
+
+        # Escrituras continuas durante la copia: no deben hacerla reiniciar
+        writing = threading.Event()
+        writing.set()
+
+        def keep_writing():
+            while writing.is_set():
+                db.writer.submit(lambda conn: conn.execute(
+                    "UPDATE data_sources SET last_check_ts = ? WHERE id = ?", (time.time_ns(), source_id)
+                )).result()
+
+        writer_thread = threading.Thread(target=keep_writing)
+        writer_thread.start()
+        try:
+            backed_up = [maintenance.run_task('backup') for _ in range(3)]
+        finally:
+            writing.clear()
+            writer_thread.join()
+        if not all(backed_up):
+            print("❌ La copia de seguridad falló")
+            return False
+        backups = sorted((Path(TEMP_DIR) / "backups").glob(f"{db.db_path.stem}_2*.db"))
+        archive_backups = list((Path(TEMP_DIR) / "backups").glob(f"{db.archive_path.stem}_*.db"))
+        if len(backups) != 2 or len(archive_backups) != 2:
+            print(f"❌ Se esperaban 2 copias conservadas, hay {len(backups)} y {len(archive_backups)} del archivo")
+            return False
+        backup = sqlite3.connect(backups[-1])
+        copied = backup.execute(
+            "SELECT COUNT(*) FROM content_items WHERE source_id = ?", (source_id,)
+        ).fetchone()[0]
+        integrity = backup.execute("PRAGMA integrity_check").fetchone()[0]
+        backup.close()
+        if copied != 300 or integrity != 'ok':
+            print(f"❌ Copia incompleta: {copied} items, integridad {integrity}")
+            return False
+        print("✅ Copia de seguridad en línea con escrituras concurrentes y rotación de copias")
+
+        with db.get_connection() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                print("❌ Las bases de datos nuevas deberían usar auto_vacuum=INCREMENTAL")
+                return False
+        db.writer.submit(
+            lambda conn: conn.execute("DELETE FROM content_items WHERE source_id = ?", (source_id,))
+        ).result()
+        with db.get_connection() as conn:
+            freelist_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # Cada paso libera exactamente las páginas pedidas en una transacción
+        db.writer.submit(lambda conn: maintenance._incremental_vacuum_step(conn, 10)).result()
+        with db.get_connection() as conn:
+            freelist_step = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if freelist_before - freelist_step != 10:
+            print(f"❌ Un paso de 10 páginas liberó {freelist_before - freelist_step}")
+            return False
+        config_manager.set('database.vacuum_pages_per_step', 50)
+        jobs_before = db.writer.jobs_committed
+        try:
+            result = maintenance.run_incremental_vacuum()
+        finally:
+            config_manager.set('database.vacuum_pages_per_step', 1000)
+        steps = db.writer.jobs_committed - jobs_before
+        if result != f"{freelist_step} páginas liberadas" or steps != -(-freelist_step // 50):
+            print(f"❌ Vacío incremental: {result} en {steps} pasos")
+            return False
+        if not maintenance.run_task('incremental_vacuum') or not maintenance.run_task('optimize'):
+            print("❌ Vacío incremental u optimize fallidos")
+            return False
+        with db.get_connection() as conn:
+            freelist_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if freelist_before == 0 or freelist_after != 0:
+            print(f"❌ Páginas libres: {freelist_before} → {freelist_after}")
+            return False
+        print(f"✅ Vacío incremental ({freelist_before} páginas) y PRAGMA optimize")
+
+        # Base de datos sin auto_vacuum: la conversión (VACUUM completo) es opcional
+        plain = sqlite3.connect(str(Path(TEMP_DIR) / "sin_auto_vacuum.db"))
+        plain.execute("CREATE TABLE t (x)")
+        plain.executemany("INSERT INTO t VALUES (?)", [("x" * 3000,)] * 200)
+        plain.commit()
+        plain.execute("DELETE FROM t")
+        plain.commit()
+        plain_maintenance = DatabaseMaintenance(PlainDatabase(plain))
+        plain_maintenance.run_incremental_vacuum()
+        if plain.execute("PRAGMA auto_vacuum").fetchone()[0] != 0:
+            print("❌ La conversión a auto_vacuum no debe lanzarse sin activarla")
+            return False
+        config_manager.set('database.vacuum_convert_enabled', True)
+        try:
+            plain_maintenance.run_incremental_vacuum()
+        finally:
+            config_manager.set('database.vacuum_convert_enabled', False)
+        if plain.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            print("❌ La conversión activada no se aplicó")
+            return False
+        plain.close()
+        print("✅ Conversión a auto_vacuum=INCREMENTAL solo si se activa")
+
+        runs = maintenance.get_recent_runs()
+        if {run['task'] for run in runs} != {'backup', 'incremental_vacuum', 'optimize'} or \
+                any(run['duration_ms'] is None for run in runs):
+            print(f"❌ Ejecuciones no registradas: {runs}")
+            return False
+        if maintenance.is_due('backup') or not maintenance.is_due('log_retention'):
+            print("❌ Planificación por intervalos incorrecta")
+            return False
+        print("✅ Duración de cada tarea registrada y planificación por intervalos")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en mantenimiento: {e}")
+        return False
+
+def test_change_log():
+    """Prueba el registro de cambios para refrescos incrementales"""
+    print("\n🔄 Probando registro de cambios...")
+
+    try:
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Cambios")
+        version = db.get_change_version()
+
+        inserted = db.add_content_items_bulk(source_id, [
+            {'title': f"Cambio {i}", 'url': f"https://ejemplo.com/cambios/{i}"} for i in range(3)
+        ])['inserted_ids']
+        db.update_content_item_status(inserted[0], 'escuchado')
+        db.writer.submit(
+            lambda conn: conn.execute("DELETE FROM content_items WHERE id = ?", (inserted[1],))
+        ).result()
+
+        changes = db.get_changes_since(version)
+        expected = {inserted[0]: 'upsert', inserted[1]: 'delete', inserted[2]: 'upsert'}
+        if changes['reset'] or changes['content_items'] != expected:
+            print(f"❌ Cambios inesperados: {changes}")
+            return False
+        if changes['version'] != db.get_change_version():
+            print("❌ La versión retornada no es la actual")
+            return False
+        rows = db.get_content_list_items([inserted[0], inserted[2]])
+        if {row['id'] for row in rows} != {inserted[0], inserted[2]} or 'content' in rows[0]:
+            print("❌ Filas del listado por id incorrectas")
+            return False
+        print("✅ Inserciones, cambios y borrados desde una versión")
+
+        # Rellenos e indicadores que la UI no muestra no generan cambios
+        before = db.get_change_version()
+        db.writer.submit(lambda conn: conn.execute('''
+            UPDATE content_items SET published_ts = 1, created_ts = 1, has_content = 1,
+                   updated_at = CURRENT_TIMESTAMP WHERE id = ?
+        ''', (inserted[2],))).result()
+        db.writer.submit(lambda conn: conn.execute(
+            "UPDATE data_sources SET last_check_ts = 1, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (source_id,)
+        )).result()
+        if db.get_change_version() != before:
+            print("❌ Cambios de columnas no visibles anotados en el registro")
+            return False
+        print("✅ Solo se anotan los cambios de columnas visibles")
+
+        db.add_data_source("Nueva fuente", "rss", "https://ejemplo.com/cambios/feed.xml")
+        later = db.get_changes_since(changes['version'])
+        if list(later['data_sources'].values()) != ['upsert'] or later['content_items']:
+            print(f"❌ Cambios de fuentes no registrados: {later}")
+            return False
+        if db.get_changes_since(db.get_change_version())['content_items']:
+            print("❌ No debería haber cambios desde la versión actual")
+            return False
+        print("✅ Cambios de fuentes de datos y versión al día")
+
+        db.trim_change_log(max_rows=1)
+        if not db.get_changes_since(version)['reset']:
+            print("❌ Una versión recortada debería forzar la recarga completa")
+            return False
+        print("✅ Recorte del registro con recarga completa para versiones antiguas")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en registro de cambios: {e}")
+        return False
+
+def test_archive_database():
+    """Prueba el archivo de items antiguos en la base de datos adjunta"""
+    print("\n🗄️ Probando base de datos de archivo...")
+
+    try:
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Archivo")
+        entries = [
+            {'title': f"Episodio antiguo {i}", 'url': f"https://ejemplo.com/archivo/{i}",
+             'published_date': "2020-03-01 10:00:00" if i < 6 else None}
+            for i in range(8)
+        ]
+        item_ids = db.add_content_items_bulk(source_id, entries)['inserted_ids']
+        db.update_content_item_text(item_ids[0], content="Charla sobre glaciares y deshielo")
+        db.update_content_item_files(item_ids[1], audio_file="podcasts/archivo_1.wav")
+        for item_id in item_ids[:4]:
+            db.update_content_item_status(item_id, 'escuchado')
+        db.update_content_item_status(item_ids[4], 'ignorar')
+        db.update_content_item_status(item_ids[6], 'escuchado')  # Sin fecha y recién ingerido
+
+        stats_before = db.get_content_stats()['by_source'][source_id]
+        result = db.archive_items(max_age_days=365, batch_size=2)
+        if result['archived'] != 5:
+            print(f"❌ Se esperaban 5 items archivados: {result}")
+            return False
+
+        with db.get_connection() as conn:
+            hot = conn.execute(
+                "SELECT COUNT(*) FROM content_items WHERE source_id = ?", (source_id,)
+            ).fetchone()[0]
+            stubs = conn.execute(
+                "SELECT COUNT(*) FROM archived_items WHERE source_id = ?", (source_id,)
+            ).fetchone()[0]
+            cold = conn.execute(
+                "SELECT COUNT(*) FROM archive.content_items WHERE source_id = ?", (source_id,)
+            ).fetchone()[0]
+        if (hot, stubs, cold) != (3, 5, 5):
+            print(f"❌ Reparto incorrecto: principal {hot}, índice {stubs}, archivo {cold}")
+            return False
+        print("✅ Items antiguos movidos por lotes al archivo con índice en la base principal")
+
+        stats_after = db.get_content_stats()['by_source'][source_id]
+        if stats_after != stats_before or db.get_content_stats()['archived'] < 5:
+            print(f"❌ Las estadísticas no incluyen el archivo: {stats_before} → {stats_after}")
+            return False
+        results = db.search("glaciares")
+        if [r['id'] for r in results] != [item_ids[0]] or not results[0]['archived']:
+            print(f"❌ La búsqueda no incluye el archivo: {results}")
+            return False
+        if db.search("glaciares", include_archive=False):
+            print("❌ include_archive=False no debería buscar en el archivo")
+            return False
+        live_source = create_test_source(db, "Archivo activo")
+        live_id = db.add_content_items_bulk(live_source, [
+            {'title': "Episodio reciente", 'url': "https://ejemplo.com/archivo/activo",
+             'description': "Menciona glaciares de pasada en una descripción larga sobre otros temas"}
+        ])['inserted_ids'][0]
+        ranked = [(r['id'], r['archived']) for r in db.search("glaciares")]
+        pages = [[r['id'] for r in db.search("glaciares", limit=1, offset=offset)] for offset in range(3)]
+        if ranked != [(live_id, 0), (item_ids[0], 1)] or pages != [[live_id], [item_ids[0]], []]:
+            print(f"❌ Los resultados archivados deben ir detrás de los activos: {ranked}, {pages}")
+            return False
+        db.delete_data_source_and_content(live_source)
+        item = db.get_content_item(item_ids[0], include_body=True)
+        if not item or item['content'] != "Charla sobre glaciares y deshielo" or not item['archived']:
+            print(f"❌ Item archivado no accesible por id: {item}")
+            return False
+        print("✅ Búsqueda (archivados tras los activos), estadísticas y lectura por id en ambas bases de datos")
+
+        from models.content_repository import ContentRepository
+        repository = ContentRepository(db)
+        many = repository.get_many([item_ids[0]])
+        repository.clear()
+        single = repository.get(item_ids[0])
+        if [item.id for item in many] != [item_ids[0]] or single is None or \
+                single.title != many[0].title:
+            print(f"❌ get y get_many deben obtener igual los items archivados: {many}, {single}")
+            return False
+        print("✅ El repositorio obtiene los items archivados con get y get_many")
+
+        # Interrupción tras copiar al archivo: el item sigue en la base
+        # principal y la copia pendiente no aparece en las búsquedas
+        pending_id = db.add_content_items_bulk(source_id, [
+            {'title': "Episodio de icebergs", 'url': "https://ejemplo.com/archivo/pendiente",
+             'published_date': "2020-03-01 10:00:00"}
+        ])['inserted_ids'][0]
+        db.update_content_item_status(pending_id, 'escuchado')
+        cutoff_ts = now_epoch() - 365 * 86400
+        copied = db._submit_write(lambda conn: db._archive_copy(conn, cutoff_ts, 10))
+        results = db.search("icebergs")
+        if copied != [pending_id] or len(results) != 1 or results[0]['archived']:
+            print(f"❌ Copia pendiente visible o item perdido: {copied}, {results}")
+            return False
+        # Cambiado entre la copia y el borrado: se queda y se descarta la copia
+        db.update_content_item_status(pending_id, 'nuevo')
+        if db._submit_write(lambda conn: db._archive_remove(conn, copied)) != 0:
+            print("❌ Se retiró un item modificado después de copiarlo")
+            return False
+        db._submit_write(lambda conn: db._drop_pending_archive_copies(conn, copied))
+        db.update_content_item_status(pending_id, 'escuchado')
+        with db.get_connection() as conn:
+            copies = conn.execute(
+                "SELECT COUNT(*) FROM archive.content_items WHERE id = ?", (pending_id,)
+            ).fetchone()[0]
+        if copies or db.archive_items(max_age_days=365)['archived'] != 1 or \
+                not db.get_content_item(pending_id)['archived']:
+            print("❌ El lote interrumpido no se completó en la siguiente pasada")
+            return False
+        print("✅ Copia confirmada en el archivo antes de borrar de la base principal")
+
+        again = db.add_content_items_bulk(source_id, entries[:2])
+        if again['inserted_count'] != 0:
+            print("❌ Los items archivados no deben volver a ingerirse")
+            return False
+        print("✅ Los items archivados no se vuelven a ingerir")
+
+        info = db.get_source_deletion_info(source_id)
+        if (info['total_items'], info['archived_items'], info['audio_file_paths']) != \
+                (9, 6, ["podcasts/archivo_1.wav"]):
+            print(f"❌ La confirmación de borrado no cuenta los items archivados: {info}")
+            return False
+
+        db.delete_data_source_and_content(source_id)
+        with db.get_connection() as conn:
+            leftovers = conn.execute(
+                "SELECT (SELECT COUNT(*) FROM archived_items WHERE source_id = ?) + "
+                "(SELECT COUNT(*) FROM archive.content_items WHERE source_id = ?)",
+                (source_id, source_id)
+            ).fetchone()[0]
+        if leftovers or db.search("glaciares"):
+            print("❌ Borrar la fuente no limpia el archivo")
+            return False
+        print("✅ Borrar una fuente elimina también sus items archivados")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en base de datos de archivo: {e}")
+        return False
+
+def test_slotted_models():
+    """Prueba los modelos con __slots__ creados por la row factory"""
+    print("\n🧱 Probando modelos compactos y comprobación de audio en bloque...")
+
+    try:
+        import os
+        from models.content_item import ContentItem
+
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Modelos")
+        item_ids = db.add_content_items_bulk(source_id, [
+            {'title': f"Modelo {i}", 'url': f"https://ejemplo.com/modelos/{i}",
+             'published_date': f"2024-02-{i + 1:02d} 08:00:00"}
+            for i in range(4)
+        ])['inserted_ids']
+        db.update_content_item_text(item_ids[0], summary="Resumen breve")
+
+        page = db.get_content_list(source_id=source_id, limit=3, as_items=True)
+        rows = db.get_content_list(source_id=source_id, limit=3)
+        expected = [ContentItem.from_dict(row) for row in rows['items']]
+        if page['items'] != expected or page['next_cursor'] != rows['next_cursor']:
+            print("❌ La row factory no crea los mismos items que from_dict")
+            return False
+        if any(hasattr(item, '__dict__') for item in page['items']):
+            print("❌ Los items no usan __slots__")
+            return False
+        sources = [s for s in db.get_data_sources(as_models=True) if s.id == source_id]
+        if not sources or hasattr(sources[0], '__dict__') or sources[0].active is not True:
+            print("❌ Las fuentes no se crean como DataSource compactos")
+            return False
+        single = db.get_data_source(source_id, as_model=True)
+        if single != sources[0]:
+            print("❌ get_data_source(as_model=True) no crea el mismo DataSource que el listado")
+            return False
+        print("✅ Items y fuentes con __slots__ creados directamente desde las filas")
+
+        full = db.get_content_items_by_ids([item_ids[0]], as_items=True)[0]
+        if full.summary != "Resumen breve" or not full.has_summary:
+            print("❌ El item de la row factory no carga el resumen bajo demanda")
+            return False
+        print("✅ Carga diferida del resumen en los items de la row factory")
+
+        loads = []
+        loader = lambda item_id: loads.append(item_id) or {'content': "x", 'summary': "y"}
+        if ContentItem.from_dict(rows['items'][0], body_loader=loader) != \
+                ContentItem.from_dict(rows['items'][0], body_loader=loader) or loads:
+            print(f"❌ Comparar items leyó sus textos: {loads}")
+            return False
+        positional = ContentItem(None, source_id, "Título", "https://ejemplo.com", None, None, None,
+                                 None, None, 'nuevo', None, "2024-02-01 08:00:00")
+        if positional.created_at != "2024-02-01 08:00:00" or positional.published_ts is not None:
+            print("❌ Los argumentos posicionales originales cambiaron de posición")
+            return False
+        print("✅ Comparación sin leer textos y constructor compatible con el original")
+
+        audio_dir = Path(TEMP_DIR) / "audio"
+        audio_dir.mkdir(exist_ok=True)
+        for i in range(2):
+            (audio_dir / f"audio_{i}.mp3").write_bytes(b"ID3")
+        for index, item_id in enumerate(item_ids):
+            db.update_content_item_files(item_id, audio_file=str(audio_dir / f"audio_{index}.mp3"))
+        items = db.get_content_list_items(item_ids, as_items=True)
+
+        scans = []
+        original_scandir = os.scandir
+        os.scandir = lambda path='.': scans.append(path) or original_scandir(path)
+        try:
+            ContentItem.check_audio_files(items)
+        finally:
+            os.scandir = original_scandir
+        flags = {item.id: item.has_audio for item in items}
+        if len(scans) != 1 or [flags[item_id] for item_id in item_ids] != [True, True, False, False]:
+            print(f"❌ Comprobación de audio incorrecta: {len(scans)} lecturas, {flags}")
+            return False
+
+        # Ya resuelto: has_audio no vuelve a consultar el sistema de archivos
+        (audio_dir / "audio_0.mp3").unlink()
+        first = next(item for item in items if item.id == item_ids[0])
+        if not first.has_audio:
+            print("❌ has_audio debería usar el valor guardado")
+            return False
+        first.audio_file = str(audio_dir / "audio_1.mp3")
+        ContentItem.check_audio_files(items, refresh=True)
+        if not first.has_audio or next(i for i in items if i.id == item_ids[1]).has_audio is not True:
+            print("❌ Cambiar la ruta del audio debería invalidar el valor guardado")
+            return False
+        print("✅ Existencia del audio comprobada con una lectura del directorio y guardada")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en modelos compactos: {e}")
+        return False
+
+def test_bulk_status_updates():
+    """Prueba los cambios de estado en bloque"""
+    print("\n🏷️ Probando cambios de estado en bloque...")
+
+    try:
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Estados en bloque")
+        other_id = create_test_source(db, "Estados otra fuente")
+        item_ids = db.add_content_items_bulk(source_id, [
+            {'title': f"Pendiente {i}", 'url': f"https://ejemplo.com/bloque/{i}",
+             'published_date': f"2023-0{1 + i % 6}-15 12:00:00"}
+            for i in range(1200)
+        ])['inserted_ids']
+        other_ids = db.add_content_items_bulk(other_id, [
+            {'title': "Otra", 'url': "https://ejemplo.com/bloque/otra"}
+        ])['inserted_ids']
+
+        def count(status, source=source_id):
+            with db.get_connection() as conn:
+                return conn.execute(
+                    "SELECT COUNT(*) FROM content_items WHERE source_id = ? AND status = ?",
+                    (source, status)
+                ).fetchone()[0]
+
+        batches_before = db.writer.batches_committed
+        changed = db.update_status_by_ids(item_ids[:1000], 'escuchado')
+        if changed != 1000 or count('escuchado') != 1000 or \
+                db.writer.batches_committed - batches_before != 1:
+            print(f"❌ Cambio por ids incorrecto: {changed}")
+            return False
+        if db.update_status_by_ids(item_ids[:10], 'escuchado') != 0:
+            print("❌ Los items que ya tienen el estado no deberían contarse")
+            return False
+        print("✅ 1000 items por id con un único UPDATE en una transacción")
+
+        changed = db.update_status_by_filter('ignorar', source_id=source_id, current_status='nuevo',
+                                             published_before="2023-03-01 00:00:00")
+        expected = sum(1 for i in range(1000, 1200) if 1 + i % 6 < 3)
+        if changed != expected or count('ignorar') != expected:
+            print(f"❌ Cambio por filtro incorrecto: {changed} (esperados {expected})")
+            return False
+        print("✅ Cambio por estado actual y fecha límite")
+
+        changed = db.update_status_by_source(source_id, 'procesado')
+        if changed != 1200 or count('procesado') != 1200 or count('nuevo', other_id) != 1:
+            print(f"❌ Cambio por fuente incorrecto: {changed}")
+            return False
+        by_status = db.get_content_stats()['by_source'][source_id]['by_status']
+        if by_status.get('procesado') != 1200 or by_status.get('escuchado', 0) != 0:
+            print(f"❌ Las estadísticas no reflejan el cambio en bloque: {by_status}")
+            return False
+        print("✅ Cambio de toda una fuente sin tocar las demás, con estadísticas al día")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en cambios de estado en bloque: {e}")
+        return False
+
+def test_cascading_deletion():
+    """Prueba el borrado por lotes de una fuente con claves en cascada"""
+    print("\n🗑️ Probando borrado en cascada por lotes...")
+
+    try:
+        from utils.trash_reclaimer import TrashReclaimer
+
+        db = DatabaseManager()
+        with db.get_connection() as conn:
+            cascades = {row['table']: row['on_delete'] for table in ('content_items', 'processing_logs')
+                        for row in conn.execute(f"PRAGMA foreign_key_list({table})")}
+            foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+        if cascades != {'data_sources': 'CASCADE', 'content_items': 'CASCADE'} or not foreign_keys:
+            print(f"❌ Claves foráneas sin cascada: {cascades} (foreign_keys={foreign_keys})")
+            return False
+        print("✅ Claves foráneas ON DELETE CASCADE activas en cada conexión")
+
+        # Migración 11 por lotes con cambios entre lotes
+        import sqlite3
+        from models.migrations import MIGRATIONS, MigrationRunner
+
+        conn = sqlite3.connect(":memory:")
+        MigrationRunner(conn, MIGRATIONS[:10]).run()
+        conn.execute("INSERT INTO data_sources (id, name, type, url) VALUES (1, 'a', 'rss', 'https://a')")
+        conn.executemany(
+            "INSERT INTO content_items (id, source_id, title, url) VALUES (?, ?, ?, ?)",
+            [(i, 1 if i != 5 else 99, f"Item {i}", f"https://a/{i}") for i in range(1, 41)]
+        )
+        conn.executemany("INSERT INTO processing_logs (item_id, action, status) VALUES (?, 'process', 'success')",
+                         [(1,), (2,), (5,), (35,)])
+        conn.commit()
+        triggers = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'content_items'"
+        ).fetchone()[0]
+
+        runner = MigrationRunner(conn, MIGRATIONS[:11], batch_size=10)
+        if runner.run(max_batches=2) is not False:
+            print("❌ La reconstrucción debería quedar a medias tras dos lotes")
+            return False
+        with conn:
+            conn.execute("UPDATE content_items SET title = 'Cambiado' WHERE id IN (1, 30)")
+            conn.execute("DELETE FROM processing_logs WHERE item_id = 2")
+            conn.execute("DELETE FROM content_items WHERE id = 2")
+            conn.execute("INSERT INTO content_items (id, source_id, title, url) VALUES (41, 1, 'Nuevo', 'https://a/41')")
+            conn.execute("INSERT INTO processing_logs (item_id, action, status) VALUES (1, 'audio', 'success')")
+        if runner.run() is not True or runner.current_version() != 11:
+            print("❌ La reconstrucción por lotes no se completó")
+            return False
+
+        titles = dict(conn.execute("SELECT id, title FROM content_items WHERE id IN (1, 2, 5, 30, 41)"))
+        logs = conn.execute("SELECT item_id, action FROM processing_logs ORDER BY id").fetchall()
+        leftovers = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name LIKE '%_rebuild%'"
+        ).fetchone()[0]
+        new_triggers = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'content_items'"
+        ).fetchone()[0]
+        if titles != {1: 'Cambiado', 30: 'Cambiado', 41: 'Nuevo'} or \
+                logs != [(1, 'process'), (35, 'process'), (1, 'audio')] or leftovers or new_triggers != triggers:
+            print(f"❌ Reconstrucción incorrecta: {titles} {logs} (restos {leftovers}, "
+                  f"triggers {new_triggers}/{triggers})")
+            return False
+        conn.close()
+        print("✅ Migración 11 por lotes sin perder los cambios hechos entre lotes")
+
+        source_id = create_test_source(db, "Borrado en lotes")
+        keep_id = create_test_source(db, "Borrado se queda")
+        item_ids = db.add_content_items_bulk(source_id, [
+            {'title': f"Borrar {i}", 'url': f"https://ejemplo.com/borrar/{i}"}
+            for i in range(1200)
+        ])['inserted_ids']
+        kept_ids = db.add_content_items_bulk(keep_id, [
+            {'title': "Se queda", 'url': "https://ejemplo.com/borrar/queda"}
+        ])['inserted_ids']
+
+        audio_dir = Path(TEMP_DIR) / "borrado"
+        audio_dir.mkdir(exist_ok=True)
+        for index, item_id in enumerate(item_ids[:5]):
+            path = audio_dir / f"episodio_{index}.wav"
+            path.write_bytes(b"RIFF" * 256)
+            db.update_content_item_files(item_id, audio_file=str(path))
+        db.update_content_item_text(item_ids[0], content="Texto que se borra")
+        for item_id in item_ids[:50] + kept_ids:
+            db.log_processing_action(item_id, 'process', 'success')
+        db.flush_writes()
+
+        trash = TrashReclaimer(Path(TEMP_DIR) / "papelera")
+        progress = []
+
+        def on_batch(deleted, total, audio_files):
+            progress.append((deleted, total))
+            trash.discard(audio_files)
+
+        if not db.delete_data_source_and_content(source_id, batch_size=500, progress_callback=on_batch):
+            print("❌ El borrado de la fuente falló")
+            return False
+        if progress != [(500, 1200), (1000, 1200), (1200, 1200)]:
+            print(f"❌ Progreso por lotes incorrecto: {progress}")
+            return False
+
+        with db.get_connection() as conn:
+            leftovers = conn.execute('''
+                SELECT (SELECT COUNT(*) FROM content_items WHERE source_id = ?),
+                       (SELECT COUNT(*) FROM processing_logs WHERE item_id NOT IN (SELECT id FROM content_items)),
+                       (SELECT COUNT(*) FROM content_bodies WHERE item_id NOT IN (SELECT id FROM content_items)),
+                       (SELECT COUNT(*) FROM processing_logs WHERE item_id = ?),
+                       (SELECT COUNT(*) FROM data_sources WHERE id = ?)
+            ''', (source_id, kept_ids[0], source_id)).fetchone()
+        if tuple(leftovers) != (0, 0, 0, 1, 0):
+            print(f"❌ Restos tras el borrado: {tuple(leftovers)}")
+            return False
+        if db.search("Borrar"):
+            print("❌ El índice de búsqueda conserva items borrados")
+            return False
+        print("✅ 1200 items borrados en 3 transacciones con registros y textos en cascada")
+
+        if any(audio_dir.iterdir()):
+            print("❌ Los audios deberían haberse movido a la papelera")
+            return False
+        for _ in range(100):
+            if trash.files_reclaimed == 5:
+                break
+            threading.Event().wait(0.05)
+        trash.stop()
+        if trash.files_reclaimed != 5 or any(trash.trash_dir.iterdir()):
+            print(f"❌ La papelera no se vació: {trash.files_reclaimed} archivos")
+            return False
+        print("✅ Audios movidos a la papelera y borrados en segundo plano")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en borrado en cascada: {e}")
+        return False
+
+def test_query_profiler():
+    """Prueba el registro de consultas lentas y los histogramas por método"""
+    print("\n⏱️ Probando instrumentación de consultas...")
+
+    try:
+        from models.database import ProfiledConnection
+        from models.query_profiler import describe_params, query_profiler
+
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Instrumentada")
+        db.add_content_items_bulk(source_id, [
+            {'title': f"Medida {i}", 'url': f"https://ejemplo.com/medida/{i}"}
+            for i in range(50)
+        ])
+
+        # Umbral 0: todas las sentencias cuentan como lentas
+        query_profiler.reset()
+        query_profiler.enable(slow_query_ms=0)
+        results = {}
+
+        def reader():
+            # Hilo nuevo: su conexión se abre ya instrumentada
+            results['conn'] = db.get_connection()
+            results['page'] = db.get_content_list(source_id=source_id, limit=20)
+            # Filas leídas iterando, sin fetchall ni close
+            results['iterated'] = sum(1 for _ in results['conn'].execute(
+                "SELECT id FROM content_items WHERE source_id = ? /* iterada */", (source_id,)
+            ))
+
+        try:
+            thread = threading.Thread(target=reader)
+            thread.start()
+            thread.join()
+        finally:
+            query_profiler.disable()
+
+        if not isinstance(results.get('conn'), ProfiledConnection) or len(results['page']['items']) != 20:
+            print("❌ La conexión del hilo no está instrumentada")
+            return False
+
+        stats = query_profiler.get_stats()
+        listing = stats['methods'].get('DatabaseManager.get_content_list')
+        if not listing or listing['count'] != 1 or listing['p50_ms'] <= 0:
+            print(f"❌ Histograma del listado incorrecto: {listing}")
+            return False
+        print(f"✅ Histograma por método: get_content_list en {listing['max_ms']} ms")
+
+        slow = [entry for entry in stats['slow_queries']
+                if entry['method'] == 'DatabaseManager.get_content_list' and 'content_items' in entry['sql']]
+        if not slow or not any(line.strip().startswith(('SEARCH', 'SCAN')) for line in slow[0]['plan']):
+            print(f"❌ Consulta lenta sin plan: {slow[:1]}")
+            return False
+        print(f"✅ Consulta lenta registrada con su plan: {slow[0]['plan'][0].strip()}")
+
+        iterated = [entry for entry in stats['slow_queries'] if '/* iterada */' in entry['sql']]
+        if results['iterated'] != 50 or len(iterated) != 1:
+            print(f"❌ Las consultas leídas iterando no se registran: {iterated}")
+            return False
+        if 'DatabaseManager.read_snapshot' in stats['methods']:
+            print("❌ Los context managers no deben medirse como métodos")
+            return False
+        print("✅ Lecturas por iteración medidas; read_snapshot sin histograma propio")
+
+        if describe_params((1, 2, 3, "abc", None)) != "(int×3, str[3], NULL)":
+            print(f"❌ Forma de parámetros incorrecta: {describe_params((1, 2, 3, 'abc', None))}")
+            return False
+        if 'get_content_list' not in query_profiler.dump():
+            print("❌ El volcado no incluye el método medido")
+            return False
+        print("✅ Parámetros resumidos sin valores y volcado por método")
+
+        # Desactivada no se acumula nada
+        query_profiler.reset()
+        db.get_content_list(source_id=source_id, limit=20)
+        if query_profiler.get_stats()['methods']:
+            print("❌ La instrumentación desactivada sigue midiendo")
+            return False
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en instrumentación de consultas: {e}")
+        return False
+
+def test_read_only_snapshots():
+    """Prueba las lecturas de solo lectura en instantánea y su cancelación"""
+    print("\n📖 Probando lecturas de solo lectura...")
+
+    try:
+        import sqlite3
+        import time
+        from models.database import QueryCancelled
+
+        db = DatabaseManager()
+        source_id = create_test_source(db, "Instantáneas")
+        db.add_content_items_bulk(source_id, [
+            {'title': f"Instantánea {i}", 'url': f"https://ejemplo.com/snapshot/{i}"}
+            for i in range(10)
+        ])
+
+        with db.read_snapshot() as conn:
+            try:
+                conn.execute("DELETE FROM content_items")
+                print("❌ La conexión de lectura permite escribir")
+                return False
+            except sqlite3.OperationalError:
+                pass
+            before = db.get_item_count_by_source(source_id)
+            # El escritor confirma mientras la instantánea sigue abierta
+            db.add_content_items_bulk(source_id, [
+                {'title': "Instantánea nueva", 'url': "https://ejemplo.com/snapshot/nueva"}
+            ])
+            inside = db.get_item_count_by_source(source_id)
+        after = db.get_item_count_by_source(source_id)
+        if (before, inside, after) != (10, 10, 11):
+            print(f"❌ Instantánea inconsistente: {(before, inside, after)}")
+            return False
+        print("✅ Conexión mode=ro con una instantánea estable mientras el escritor confirma")
+
+        # Escritura larga en curso: la lectura no espera al escritor
+        writer_started = threading.Event()
+
+        def slow_job(conn):
+            conn.execute("UPDATE content_items SET status = 'nuevo' WHERE source_id = ?", (source_id,))
+            writer_started.set()
+            time.sleep(0.5)
+
+        future = db._submit_write(slow_job, wait=False)
+        writer_started.wait(2)
+        start = time.perf_counter()
+        page = db.get_content_list(source_id=source_id, limit=20)
+        elapsed = time.perf_counter() - start
+        future.result()
+        if len(page['items']) != 11 or elapsed > 0.25:
+            print(f"❌ La lectura esperó al escritor: {elapsed * 1000:.0f} ms")
+            return False
+        print(f"✅ Listado en {elapsed * 1000:.1f} ms con una escritura de 500 ms en curso")
+
+        # Cancelación de una consulta larga desde otro hilo
+        cancel = threading.Event()
+        threading.Timer(0.1, cancel.set).start()
+        start = time.perf_counter()
+        try:
+            with db.cancellable_reads(cancel), db.read_snapshot() as conn:
+                conn.execute('''
+                    WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c LIMIT 500000000)
+                    SELECT COUNT(*) FROM c
+                ''').fetchone()
+            print("❌ La consulta no se canceló")
+            return False
+        except QueryCancelled:
+            elapsed = time.perf_counter() - start
+        if elapsed > 2:
+            print(f"❌ Cancelación lenta: {elapsed:.2f} s")
+            return False
+
+        # Los métodos de lectura propagan la cancelación en lugar de retornar vacío
+        try:
+            with db.cancellable_reads(cancel):
+                db.get_content_list(source_id=source_id)
+            print("❌ La lectura cancelada retornó un resultado")
+            return False
+        except QueryCancelled:
+            pass
+        # También desde un método anidado en una instantánea cancelable abierta
+        nested = threading.Event()
+        config_manager.set('database.read_progress_steps', 1)
+        try:
+            with db.cancellable_reads(nested), db.read_snapshot():
+                nested.set()
+                page = db.get_content_list(source_id=source_id)
+            print(f"❌ La lectura anidada cancelada retornó un resultado: {len(page['items'])} items")
+            return False
+        except QueryCancelled:
+            pass
+        finally:
+            config_manager.set('database.read_progress_steps', 1000)
+        if len(db.get_content_list(source_id=source_id)['items']) != 11:
+            print("❌ La conexión de lectura quedó inutilizable tras cancelar")
+            return False
+        print(f"✅ Consulta larga interrumpida en {elapsed * 1000:.0f} ms y conexión reutilizable")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en lecturas de solo lectura: {e}")
+        return False
+
+def main():
+    """Función principal de pruebas"""
+    print("🚀 PyPodcast - Pruebas de rendimiento de base de datos")
+    print("=" * 50)
+
+    tests = [
+        ("Pool de conexiones", test_connection_pool),
+        ("Inserción masiva", test_bulk_ingest),
+        ("Listado paginado", test_keyset_listing),
+        ("Búsqueda de texto completo", test_full_text_search),
+        ("Repositorio de contenido", test_content_repository),
+        ("Estadísticas agregadas", test_content_stats),
+        ("Migraciones de esquema", test_schema_migrations),
+        ("Textos comprimidos", test_compressed_bodies),
+        ("Escritor en segundo plano", test_write_behind),
+        ("Retención del registro", test_processing_log_retention),
+        ("URLs canónicas", test_url_canonicalization),
+        ("Mantenimiento", test_database_maintenance),
+        ("Registro de cambios", test_change_log),
+        ("Base de datos de archivo", test_archive_database),
+        ("Modelos compactos", test_slotted_models),
+        ("Estados en bloque", test_bulk_status_updates),
+        ("Borrado en cascada", test_cascading_deletion),
+        ("Consultas lentas", test_query_profiler),
+        ("Lecturas de solo lectura", test_read_only_snapshots),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ Error crítico en {test_name}: {e}")
+
+    DatabaseManager().close_connections()
+
+    print("\n" + "=" * 50)
+    print(f"📊 Resultados: {passed}/{total} pruebas pasaron")
+
+    return passed == total
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
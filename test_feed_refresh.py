@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la actualización de feeds
+"""
+
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Añadir directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from utils.config import config_manager
+
+# Usar una base de datos temporal para no tocar los datos reales
+TEMP_DIR = tempfile.mkdtemp(prefix="pypodcast_feeds_test_")
+config_manager.set('database.path', str(Path(TEMP_DIR) / "test.db"))
+
+from models.database import DatabaseManager
+from services.feed_refresher import FeedRefresher
+
+def make_sources(host: str, count: int, start_id: int = 1):
+    """Fuentes de prueba de un mismo host"""
+    return [
+        {'id': start_id + i, 'name': f"{host} {i}", 'type': 'rss', 'url': f"https://{host}/feed/{i}.xml"}
+        for i in range(count)
+    ]
+
+class SlowRefresher(FeedRefresher):
+    """Actualizador que simula descargas lentas y mide la concurrencia"""
+
+    def __init__(self, delays, **kwargs):
+        super().__init__(db_manager=DatabaseManager(), rss_manager=object(), **kwargs)
+        self.delays = delays
+        self.lock = threading.Lock()
+        self.active = {}
+        self.max_active = {}
+        self.max_total = 0
+
+    def refresh_source(self, source):
+        host = self.host_key(source)
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.max_active[host] = max(self.max_active.get(host, 0), self.active[host])
+            self.max_total = max(self.max_total, sum(self.active.values()))
+        try:
+            time.sleep(self.delays.get(host, 0.01))
+            if source['name'].endswith(' roto'):
+                raise ValueError("feed no válido")
+            return 2
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+def test_concurrent_refresh():
+    """Prueba los límites global y por host de la actualización concurrente"""
+    print("\n🌐 Probando actualización concurrente...")
+
+    try:
+        sources = (make_sources("www.youtube.com", 6)
+                   + make_sources("youtube.com", 2, start_id=7)
+                   + make_sources("blog.ejemplo.com", 4, start_id=9)
+                   + make_sources("podcasts.ejemplo.org", 4, start_id=13))
+        sources[-1]['name'] += ' roto'
+
+        refresher = SlowRefresher({'youtube.com': 0.1, 'blog.ejemplo.com': 0.05,
+                                   'podcasts.ejemplo.org': 0.05},
+                                  max_workers=4, per_host_limit=2)
+        progress = []
+        start = time.perf_counter()
+        summary = refresher.refresh_all(sources, progress_callback=lambda *args: progress.append(args))
+        elapsed = time.perf_counter() - start
+
+        if refresher.max_active.get('youtube.com') != 2 or refresher.max_total > 4:
+            print(f"❌ Límites superados: {refresher.max_active}, total {refresher.max_total}")
+            return False
+        print(f"✅ Como máximo 2 descargas por host y 4 en total: {refresher.max_active}")
+
+        # 8 fuentes de YouTube de 100 ms de 2 en 2: ~0.4 s (en serie serían ~1.2 s)
+        if elapsed > 0.7:
+            print(f"❌ La actualización no escala con el host más lento: {elapsed:.2f} s")
+            return False
+        print(f"✅ 16 fuentes en {elapsed:.2f} s (en serie: 1.20 s)")
+
+        if summary['updated'] != 15 or summary['new_items'] != 30 or list(summary['errors']) != [16]:
+            print(f"❌ Resumen incorrecto: {summary}")
+            return False
+        failed = [args[2:] for args in progress if args[3]]
+        if [args[0] for args in progress] != list(range(1, 17)) or \
+                failed != [(sources[-1]['name'], 'feed no válido')]:
+            print(f"❌ Progreso incorrecto: {progress}")
+            return False
+        print("✅ Progreso por fuente con los errores de cada una")
+
+        refresher = SlowRefresher({}, max_workers=2, per_host_limit=1)
+        refresher.cancel()
+        summary = refresher.refresh_all(sources)
+        if summary['updated'] != 0:
+            print(f"❌ La actualización cancelada lanzó fuentes: {summary}")
+            return False
+        print("✅ Cancelación sin lanzar fuentes nuevas")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en actualización concurrente: {e}")
+        return False
+
+class ConditionalFeeds:
+    """Servidor de feeds simulado que responde 304 si el ETag coincide"""
+
+    def __init__(self):
+        self.requests = []
+        self.parsed = 0
+
+    def parse_feed(self, feed_url, etag=None, modified=None):
+        self.requests.append((feed_url, etag, modified))
+        current = f'"v1-{feed_url}"'
+        if etag == current:
+            return {'not_modified': True, 'channel': None, 'entries': [], 'total_entries': 0,
+                    'status': 304, 'etag': None, 'modified': None}
+        self.parsed += 1
+        entries = [{'title': f"Episodio {i}", 'url': f"{feed_url}/episodio/{i}"} for i in range(3)]
+        return {'not_modified': False, 'channel': {'title': feed_url}, 'entries': entries,
+                'total_entries': len(entries), 'status': 200, 'etag': current,
+                'modified': "Sat, 17 Oct 2026 10:00:00 GMT"}
+
+class FailingInsertDatabase(DatabaseManager):
+    """Base de datos cuya inserción de entradas falla"""
+
+    def add_content_items_bulk(self, source_id, entries):
+        raise sqlite3.OperationalError("disk I/O error")
+
+def test_conditional_get():
+    """Prueba que los feeds sin cambios (304) no se parsean ni se ingieren"""
+    print("\n📨 Probando peticiones condicionales...")
+
+    try:
+        db = DatabaseManager()
+        source_ids = [db.add_data_source(f"Condicional {i}", 'rss', f"https://condicional{i}.ejemplo.com/feed.xml")
+                      for i in range(3)]
+        sources = [source for source in db.get_data_sources() if source['id'] in source_ids]
+        feeds = ConditionalFeeds()
+
+        first = FeedRefresher(db, feeds).refresh_all(sources)
+        db.flush_writes()
+        states = db.get_fetch_states(source_ids)
+        if first['new_items'] != 9 or any(etag for _, etag, _ in feeds.requests) or \
+                sorted(states) != sorted(source_ids) or states[source_ids[0]]['http_status'] != 200:
+            print(f"❌ Primera descarga incorrecta: {first}, {states}")
+            return False
+        print("✅ Primera descarga completa con ETag y Last-Modified guardados por fuente")
+
+        feeds.requests.clear()
+        second = FeedRefresher(db, feeds).refresh_all(sources)
+        db.flush_writes()
+        states = db.get_fetch_states(source_ids)
+        sent = {etag for _, etag, _ in feeds.requests}
+        if second['not_modified'] != 3 or second['new_items'] != 0 or feeds.parsed != 3 or None in sent:
+            print(f"❌ La segunda consulta no fue condicional: {second}, {feeds.requests}")
+            return False
+        state = states[source_ids[0]]
+        if state['http_status'] != 304 or not state['etag'] or \
+                state['last_modified'] != "Sat, 17 Oct 2026 10:00:00 GMT":
+            print(f"❌ Un 304 no debe borrar los validadores: {state}")
+            return False
+        print("✅ 304 sin parsear ni ingerir, conservando los validadores")
+
+        # Un error no sustituye los validadores
+        db.update_fetch_state(source_ids[1], sources[1]['url'], 503, wait=True)
+        if db.get_fetch_states([source_ids[1]])[source_ids[1]]['etag'] != f'"v1-{sources[1]["url"]}"':
+            print("❌ Un error borró los validadores")
+            return False
+
+        # Validadores de otra URL de feed: no se envían
+        db.update_fetch_state(source_ids[2], "https://antigua.ejemplo.com/feed.xml", 200,
+                              etag='"otro"', wait=True)
+        feeds.requests.clear()
+        FeedRefresher(db, feeds).refresh_all(sources[2:])
+        if feeds.requests != [(sources[2]['url'], None, None)]:
+            print(f"❌ Se enviaron validadores de otra URL: {feeds.requests}")
+            return False
+        print("✅ Validadores conservados tras un error e ignorados si cambió la URL del feed")
+
+        # Si la inserción falla no se guardan los validadores: la siguiente
+        # consulta es completa y las entradas no se pierden tras un 304
+        failing_db = FailingInsertDatabase()
+        source_id = failing_db.add_data_source("Inserción fallida", 'rss', "https://fallida.ejemplo.com/feed.xml")
+        source = next(source for source in failing_db.get_data_sources() if source['id'] == source_id)
+        summary = FeedRefresher(failing_db, feeds).refresh_all([source])
+        failing_db.flush_writes()
+        state = failing_db.get_fetch_states([source_id]).get(source_id, {})
+        if list(summary['errors']) != [source_id] or state.get('etag') or state.get('last_modified'):
+            print(f"❌ Se guardaron validadores de una inserción fallida: {summary}")
+            return False
+        feeds.requests.clear()
+        retry = FeedRefresher(db, feeds).refresh_all([source])
+        if feeds.requests != [(source['url'], None, None)] or retry['new_items'] != 3:
+            print(f"❌ La consulta tras el fallo no fue completa: {feeds.requests}, {retry}")
+            return False
+        print("✅ Tras una inserción fallida la siguiente consulta no envía If-None-Match")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en peticiones condicionales: {e}")
+        return False
+
+class YouTubeFeeds(ConditionalFeeds):
+    """YouTube simulado: resolver un canal cuesta varias descargas"""
+
+    CHANNEL_ID = "UC" + "x" * 22
+
+    def __init__(self):
+        super().__init__()
+        self.resolutions = 0
+        self.broken_urls = set()
+
+    def get_youtube_rss_url(self, channel_url):
+        self.resolutions += 1
+        return f"https://www.youtube.com/feeds/videos.xml?channel_id={self.CHANNEL_ID}"
+
+    def parse_feed(self, feed_url, etag=None, modified=None):
+        if feed_url in self.broken_urls:
+            raise ValueError("404 Client Error")
+        return super().parse_feed(feed_url, etag, modified)
+
+def test_youtube_resolution_cache():
+    """Prueba la caché persistente de la resolución canal → feed de YouTube"""
+    print("\n📺 Probando caché de resolución de YouTube...")
+
+    try:
+        from utils.timestamps import now_epoch
+
+        db = DatabaseManager()
+        source_id = db.add_data_source("Canal cacheado", 'youtube', "https://www.youtube.com/@canal_cacheado")
+        feeds = YouTubeFeeds()
+
+        def load_source():
+            return next(source for source in db.get_data_sources() if source['id'] == source_id)
+
+        FeedRefresher(db, feeds).refresh_all([load_source()])
+        db.flush_writes()
+        source = load_source()
+        if feeds.resolutions != 1 or source['channel_id'] != YouTubeFeeds.CHANNEL_ID or \
+                not source['feed_url'] or not source['feed_resolved_ts']:
+            print(f"❌ La resolución no se guardó en la fuente: {source}")
+            return False
+        print(f"✅ Feed y channel id guardados en la fuente ({source['channel_id']})")
+
+        for _ in range(3):
+            FeedRefresher(db, feeds).refresh_all([load_source()])
+        if feeds.resolutions != 1:
+            print(f"❌ Se resolvió de nuevo sin necesidad: {feeds.resolutions} resoluciones")
+            return False
+        print("✅ Actualizaciones siguientes sin resolver el canal (una descarga por canal)")
+
+        # TTL vencido: se resuelve otra vez
+        db.update_feed_resolution(source_id, source['feed_url'], source['channel_id'], wait=True)
+        with db.get_connection() as conn:
+            conn.execute("UPDATE data_sources SET feed_resolved_ts = ? WHERE id = ?",
+                         (now_epoch() - 31 * 86400, source_id))
+        FeedRefresher(db, feeds).refresh_all([load_source()])
+        if feeds.resolutions != 2:
+            print(f"❌ La resolución caducada no se renovó: {feeds.resolutions}")
+            return False
+
+        # El feed guardado deja de funcionar: se resuelve y se reintenta
+        db.update_feed_resolution(source_id, "https://www.youtube.com/feeds/videos.xml?user=viejo",
+                                  None, wait=True)
+        feeds.broken_urls.add("https://www.youtube.com/feeds/videos.xml?user=viejo")
+        summary = FeedRefresher(db, feeds).refresh_all([load_source()])
+        db.flush_writes()
+        if summary['errors'] or feeds.resolutions != 3 or load_source()['channel_id'] != YouTubeFeeds.CHANNEL_ID:
+            print(f"❌ No se recuperó de un feed guardado roto: {summary}")
+            return False
+        print("✅ Se resuelve de nuevo al caducar el TTL o al fallar el feed guardado")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en caché de resolución de YouTube: {e}")
+        return False
+
+class CadenceFeeds(ConditionalFeeds):
+    """Feeds simulados con una cadencia de publicación por URL"""
+
+    def __init__(self, cadences, now):
+        super().__init__()
+        self.cadences = cadences
+        self.now = now
+        self.broken_urls = set()
+
+    def parse_feed(self, feed_url, etag=None, modified=None):
+        from datetime import datetime, timezone
+
+        if feed_url in self.broken_urls:
+            raise ValueError("503 Server Error")
+        feed_data = super().parse_feed(feed_url)
+        for i, entry in enumerate(feed_data['entries']):
+            entry['published_date'] = datetime.fromtimestamp(
+                self.now - i * self.cadences[feed_url], tz=timezone.utc
+            )
+        return feed_data
+
+def test_adaptive_polling():
+    """Prueba la planificación de cada fuente según su cadencia y sus fallos"""
+    print("\n🗓️ Probando planificación adaptativa...")
+
+    try:
+        import json
+        import random
+        from services.poll_scheduler import PollScheduler, estimate_cadence
+        from utils.timestamps import now_epoch
+
+        day = 86400
+        scheduler = PollScheduler(rng=random.Random(1))
+        now = now_epoch()
+        daily = [now - i * day for i in range(10)]
+        yearly = [now - i * 365 * day for i in range(10)]
+        bursty = [now - i * day for i in range(8)] + [now - 7 * day - 60, now - 300 * day]
+        if estimate_cadence(daily) != day or estimate_cadence(bursty) != day or estimate_cadence([now]) is not None:
+            print("❌ Cadencia estimada incorrecta")
+            return False
+        intervals = {
+            'diaria': scheduler.interval(daily, now=now),
+            'anual': scheduler.interval(yearly, now=now),
+            'sin historial': scheduler.interval(now=now),
+            'diaria callada 10 días': scheduler.interval([ts - 10 * day for ts in daily], now=now),
+        }
+        expected = {'diaria': 12 * 3600, 'anual': 24 * 3600, 'sin historial': 3600,
+                    'diaria callada 10 días': 24 * 3600}
+        if intervals != expected:
+            print(f"❌ Intervalos incorrectos: {intervals}")
+            return False
+        backoff = [scheduler.interval(daily, failures=n, now=now) / 60 for n in (1, 2, 3, 10)]
+        if backoff != [30, 60, 120, 24 * 60]:
+            print(f"❌ Espera tras fallos incorrecta: {backoff}")
+            return False
+        jittered = [scheduler.next_check(daily, now=now) - now for _ in range(200)]
+        if min(jittered) < 12 * 3600 * 0.9 or max(jittered) > 12 * 3600 * 1.1 or len(set(jittered)) < 100:
+            print(f"❌ Jitter fuera de rango: {min(jittered)}-{max(jittered)}")
+            return False
+        print("✅ Espera según cadencia y silencio, acotada, con jitter y espera exponencial tras fallos")
+
+        # Consultas en una semana frente al timer fijo de 60 minutos
+        histories = [daily] * 5 + [[now - i * 7 * day for i in range(10)]] * 10 + [yearly] * 5
+        checks = 0
+        for history in histories:
+            clock = now
+            while clock < now + 7 * day:
+                clock = scheduler.next_check(history, now=clock)
+                checks += 1
+        fixed = len(histories) * 7 * 24
+        if checks * 10 > fixed:
+            print(f"❌ La planificación apenas reduce consultas: {checks} frente a {fixed}")
+            return False
+        print(f"✅ {checks} consultas en una semana frente a {fixed} con el timer fijo")
+
+        db = DatabaseManager()
+        names = ("diaria", "anual", "rota")
+        source_ids = [db.add_data_source(f"Planificada {name}", 'rss', f"https://{name}.planificada.com/feed.xml")
+                      for name in names]
+        sources = [source for source in db.get_data_sources() if source['id'] in source_ids]
+        feeds = CadenceFeeds({source['url']: day if 'diaria' in source['url'] else 365 * day
+                              for source in sources}, now)
+        broken = next(source for source in sources if source['id'] == source_ids[2])
+        feeds.broken_urls.add(broken['url'])
+
+        # Solo participan las fuentes de esta prueba
+        with db.get_connection() as conn:
+            conn.execute("UPDATE data_sources SET active = 0 WHERE id NOT IN (SELECT value FROM json_each(?))",
+                         (json.dumps(source_ids),))
+
+        due_ids = {source['id'] for source in db.get_due_sources(now)}
+        if due_ids != set(source_ids):
+            print("❌ Las fuentes nuevas deben consultarse en el primer tick")
+            return False
+
+        summary = FeedRefresher(db, feeds).refresh_all(sources)
+        db.flush_writes()
+        states = db.get_fetch_states(source_ids)
+        by_name = {name: states[source_id] for name, source_id in zip(names, source_ids)}
+        waits = {name: (state['next_check_ts'] - now) / 3600 for name, state in by_name.items()}
+        if len(summary['errors']) != 1 or by_name['rota']['failure_count'] != 1 or \
+                by_name['diaria']['failure_count'] != 0 or not 10 <= waits['diaria'] <= 14 or \
+                not 21 <= waits['anual'] <= 27 or not 0.4 <= waits['rota'] <= 0.6:
+            print(f"❌ Planificación incorrecta: {waits}, {by_name}")
+            return False
+        print(f"✅ Próxima consulta: diaria {waits['diaria']:.1f} h, anual {waits['anual']:.1f} h, "
+              f"rota {waits['rota'] * 60:.0f} min")
+
+        due = [source['id'] for source in db.get_due_sources(now + 14 * 3600)]
+        if sorted(due) != sorted([source_ids[0], source_ids[2]]):
+            print(f"❌ Fuentes pendientes incorrectas: {due}")
+            return False
+        FeedRefresher(db, feeds).refresh_due(now=now + 14 * 3600)
+        db.flush_writes()
+        states = db.get_fetch_states(source_ids)
+        if states[source_ids[2]]['failure_count'] != 2 or states[source_ids[1]]['checked_ts'] != \
+                by_name['anual']['checked_ts']:
+            print(f"❌ El tick no consultó solo las pendientes: {states}")
+            return False
+        feeds.broken_urls.clear()
+        FeedRefresher(db, feeds).refresh_all([broken])
+        db.flush_writes()
+        if db.get_fetch_states([source_ids[2]])[source_ids[2]]['failure_count'] != 0:
+            print("❌ Una descarga correcta no reinició los fallos")
+            return False
+        print("✅ Cada tick consulta solo las fuentes pendientes; los fallos se acumulan y se reinician")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en planificación adaptativa: {e}")
+        return False
+
+def main():
+    """Función principal de pruebas"""
+    print("🚀 PyPodcast - Pruebas de actualización de feeds")
+    print("=" * 50)
+
+    DatabaseManager().initialize_database()
+
+    tests = [
+        ("Actualización concurrente", test_concurrent_refresh),
+        ("Peticiones condicionales", test_conditional_get),
+        ("Caché de resolución de YouTube", test_youtube_resolution_cache),
+        ("Planificación adaptativa", test_adaptive_polling),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ Error crítico en {test_name}: {e}")
+
+    DatabaseManager().close_connections()
+
+    print("\n" + "=" * 50)
+    print(f"📊 Resultados: {passed}/{total} pruebas pasaron")
+
+    return passed == total
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para las sesiones HTTP compartidas
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Añadir directorio raíz al path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import requests
+from requests.adapters import HTTPAdapter
+from utils.config import config_manager
+from utils.http_session import (
+    BROTLI_AVAILABLE, RETRY_STATUSES, create_http_session, get_http_session, reset_http_session
+)
+
+class RecordingAdapter(HTTPAdapter):
+    """Adaptador que registra las peticiones y responde 200 sin conectarse"""
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append((request, kwargs))
+        response = requests.Response()
+        response.status_code = 200
+        response.request = request
+        response.url = request.url
+        response._content = b""
+        return response
+
+def test_shared_session():
+    """Prueba que los servicios comparten sesión y el pool de conexiones"""
+    print("\n🔗 Probando sesión compartida...")
+
+    try:
+        from services.rss_manager import RSSManager
+        from services.web_extractor import WebExtractor
+
+        reset_http_session()
+        session = get_http_session()
+        if RSSManager().session is not session or WebExtractor().session is not session:
+            print("❌ RSSManager y WebExtractor no usan la misma sesión")
+            return False
+        print("✅ RSSManager y WebExtractor reutilizan la sesión del hilo")
+
+        other = {}
+        thread = threading.Thread(target=lambda: other.update(session=RSSManager().session))
+        thread.start()
+        thread.join()
+        adapter = session.get_adapter("https://ejemplo.com/feed.xml")
+        if other['session'] is session or \
+                other['session'].get_adapter("https://ejemplo.com/feed.xml") is not adapter:
+            print("❌ Cada hilo debe tener su sesión sobre el mismo pool de conexiones")
+            return False
+        print("✅ Una sesión por hilo, todas sobre el mismo HTTPAdapter")
+
+        reset_http_session()
+        if get_http_session() is session:
+            print("❌ reset_http_session no descartó la sesión anterior")
+            return False
+        print("✅ reset_http_session crea sesiones nuevas")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en sesión compartida: {e}")
+        return False
+
+def test_retry_configuration():
+    """Prueba la política de reintentos del adaptador"""
+    print("\n🔁 Probando reintentos...")
+
+    try:
+        retry = create_http_session().get_adapter("https://ejemplo.com").max_retries
+        backoff = float(config_manager.get('network.retry_backoff_seconds', 0.5))
+        if set(retry.status_forcelist) != set(RETRY_STATUSES) or retry.backoff_factor != backoff or \
+                retry.total != int(config_manager.get('network.max_retries', 3)):
+            print(f"❌ Configuración de reintentos incorrecta: {retry}")
+            return False
+        print(f"✅ Reintentos para {sorted(retry.status_forcelist)} con espera exponencial de {backoff} s")
+
+        if not retry.is_retry('GET', 503) or not retry.is_retry('HEAD', 429) or \
+                retry.is_retry('POST', 503) or retry.is_retry('GET', 404):
+            print("❌ Solo deben reintentarse GET/HEAD con respuestas transitorias")
+            return False
+        if not retry.respect_retry_after_header:
+            print("❌ Se debe respetar Retry-After")
+            return False
+        print("✅ Sin reintentos para POST ni para errores definitivos; se respeta Retry-After")
+
+        class SlowDownResponse:
+            headers = {'Retry-After': '3600'}
+
+            def getheader(self, name, default=None):
+                return self.headers.get(name, default)
+
+        max_retry_after = float(config_manager.get('network.max_retry_after_seconds', 60))
+        if retry.get_retry_after(SlowDownResponse()) != max_retry_after or \
+                retry.increment('GET', '/', error=None, _pool=None).max_retry_after != max_retry_after:
+            print("❌ La espera de Retry-After debe estar acotada")
+            return False
+        print(f"✅ Retry-After acotado a {max_retry_after:g} s")
+
+        adapter = create_http_session().get_adapter("https://ejemplo.com")
+        if adapter._pool_connections != int(config_manager.get('network.pool_hosts', 64)) or \
+                adapter._pool_maxsize != int(config_manager.get('network.max_concurrent_fetches', 8)):
+            print("❌ El pool debe guardar un pool por host y una conexión por hilo de descarga")
+            return False
+        print("✅ Pools para los hosts esperados y una conexión por hilo de descarga")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en reintentos: {e}")
+        return False
+
+def test_request_defaults():
+    """Prueba el timeout por defecto y la cabecera Accept-Encoding"""
+    print("\n⏱️ Probando valores por defecto de las peticiones...")
+
+    try:
+        adapter = RecordingAdapter()
+        session = create_http_session(adapter)
+        session.get("https://ejemplo.com/feed.xml")
+        session.get("https://ejemplo.com/lento.xml", timeout=60)
+
+        expected = (float(config_manager.get('network.connect_timeout', 10)),
+                    float(config_manager.get('network.timeout', 30)))
+        timeouts = [kwargs['timeout'] for _, kwargs in adapter.sent]
+        if timeouts != [expected, 60]:
+            print(f"❌ Timeouts incorrectos: {timeouts}")
+            return False
+        print(f"✅ Timeout por defecto {expected} y el indicado en la petición")
+
+        encoding = adapter.sent[0][0].headers.get('Accept-Encoding', '')
+        if 'gzip' not in encoding or ('br' in encoding) != BROTLI_AVAILABLE:
+            print(f"❌ Accept-Encoding incorrecto: {encoding!r}")
+            return False
+        user_agent = adapter.sent[0][0].headers.get('User-Agent')
+        if user_agent != config_manager.get('network.user_agent', 'PyPodcast/1.0.0'):
+            print(f"❌ User-Agent incorrecto: {user_agent!r}")
+            return False
+        print(f"✅ Accept-Encoding: {encoding}")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error en valores por defecto: {e}")
+        return False
+
+def main():
+    """Función principal de pruebas"""
+    print("🚀 PyPodcast - Pruebas de sesiones HTTP")
+    print("=" * 50)
+
+    tests = [
+        ("Sesión compartida", test_shared_session),
+        ("Reintentos", test_retry_configuration),
+        ("Valores por defecto de las peticiones", test_request_defaults),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ Error crítico en {test_name}: {e}")
+
+    reset_http_session()
+
+    print("\n" + "=" * 50)
+    print(f"📊 Resultados: {passed}/{total} pruebas pasaron")
+
+    return passed == total
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -25,26 +25,74 @@ class ConfigManager:
             "database": {
                 "path": "data/pypodcast.db",
                 "backup_enabled": True,
-                "backup_interval_hours": 24
+                "backup_interval_hours": 24,
+                "busy_timeout_ms": 5000,
+                "cache_size_kb": 16384,
+                "mmap_size_mb": 256,
+                "item_cache_size": 500,
+                "stats_counters": True,
+                "migration_batch_size": 5000,
+                "startup_migration_batches": 20,
+                "body_compression": "zstd",
+                "write_batch_ms": 5,
+                "write_batch_max": 200,
+                "log_retention_days": 90,
+                "log_retention_max_rows": 100000,
+                "backup_dir": "data/backups",
+                "backup_keep": 3,
+                "optimize_interval_hours": 24,
+                "incremental_vacuum_interval_hours": 24,
+                "vacuum_pages_per_step": 1000,
+                "vacuum_convert_enabled": False,
+                "vacuum_convert_free_ratio": 0.25,
+                "log_retention_interval_hours": 24,
+                "change_log_max_rows": 10000,
+                "change_log_trim_interval_hours": 1,
+                "archive_path": None,
+                "archive_after_days": 180,
+                "archive_batch_size": 500,
+                "archive_interval_hours": 24,
+                "delete_batch_size": 500,
+                "profiling": False,
+                "slow_query_ms": 100,
+                "slow_query_log_size": 100,
+                "read_progress_steps": 1000
             },
             "audio": {
                 "output_dir": "podcasts",
                 "format": "wav",  # Cambiado a WAV para compatibilidad con pygame
                 "quality": "high",
                 "voice": "Jorge",  # Voz en español de macOS
-                "rate": 150  # Palabras por minuto (velocidad más natural)
+                "rate": 150,  # Palabras por minuto (velocidad más natural)
+                "trash_dir": None,  # Por defecto <output_dir>/.trash
+                "trash_files_per_step": 50,
+                "trash_step_sleep_ms": 20
             },
             "network": {
                 "timeout": 30,
+                "connect_timeout": 10,
                 "max_retries": 3,
-                "user_agent": "PyPodcast/1.0.0"
+                "retry_backoff_seconds": 0.5,
+                "user_agent": "PyPodcast/1.0.0",
+                "max_concurrent_fetches": 8,
+                "max_fetches_per_host": 2,
+                "pool_hosts": 64,
+                "max_retry_after_seconds": 60,
+                "youtube_resolve_ttl_days": 30,
+                "poll_min_minutes": 15,
+                "poll_max_hours": 24,
+                "poll_cadence_factor": 0.5,
+                "poll_jitter": 0.1,
+                "poll_history_items": 10
             },
             "ui": {
                 "theme": "light",
                 "window_width": 1200,
                 "window_height": 800,
                 "auto_refresh": True,
-                "refresh_interval_minutes": 60
+                "refresh_interval_minutes": 60,
+                "scheduler_tick_minutes": 5,
+                "page_size": 100
             },
             "content": {
                 "max_summary_length": 500,
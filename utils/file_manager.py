@@ -5,7 +5,7 @@ Utilidades para gestión de archivos y eliminación segura
 import os
 import shutil
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Set
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -59,6 +59,36 @@ class FileManager:
         
         return results
     
+    @staticmethod
+    def find_existing_files(file_paths: Iterable[str]) -> Set[str]:
+        """
+        Comprueba en bloque qué archivos existen
+
+        Lee cada directorio implicado una sola vez con os.scandir en lugar
+        de consultar el sistema de archivos por cada ruta.
+
+        Args:
+            file_paths: Rutas de archivos a comprobar
+
+        Returns:
+            Conjunto con las rutas (tal como se indicaron) que existen
+        """
+        by_directory: Dict[str, List[str]] = {}
+        for file_path in file_paths:
+            if file_path:
+                by_directory.setdefault(os.path.dirname(file_path), []).append(file_path)
+
+        existing = set()
+        for directory, paths in by_directory.items():
+            try:
+                with os.scandir(directory or '.') as entries:
+                    names = {entry.name for entry in entries if entry.is_file()}
+            except OSError:
+                continue
+            existing.update(path for path in paths if os.path.basename(path) in names)
+
+        return existing
+
     @staticmethod
     def format_file_size(size_bytes: int) -> str:
         """Formatea el tamaño de archivo en unidades legibles"""
@@ -0,0 +1,149 @@
+"""
+Sesiones HTTP con un pool de conexiones persistentes compartido, reintentos y compresión
+"""
+
+import threading
+from typing import Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils.config import config_manager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# brotli es opcional: sin él urllib3 no sabe descomprimir "br"
+try:
+    import brotli  # noqa: F401
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+# Respuestas transitorias que se reintentan (respetando Retry-After)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+class HttpSession(requests.Session):
+    """Sesión de requests con timeout por defecto
+
+    ``requests`` no tiene un timeout de sesión: sin él una petición puede
+    quedarse colgada indefinidamente. Cada petición usa ``timeout`` salvo
+    que indique el suyo.
+    """
+
+    def __init__(self, timeout: Tuple[float, float]):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+class CappedRetry(Retry):
+    """Retry que limita la espera indicada por Retry-After
+
+    Un servidor puede pedir horas de espera: el hilo que descarga se quedaría
+    bloqueado. Con el tope, el reintento falla pronto y la planificación de
+    la fuente aplica su propia espera tras el error.
+    """
+
+    def __init__(self, *args, max_retry_after: float = 60, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.max_retry_after = self.max_retry_after
+        return retry
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+def create_http_adapter() -> HTTPAdapter:
+    """Crea el adaptador de transporte según la sección ``network``
+
+    Reintentos con espera exponencial (``max_retries``,
+    ``retry_backoff_seconds``) para errores de conexión y respuestas
+    transitorias de GET/HEAD, con Retry-After acotado a
+    ``max_retry_after_seconds``. urllib3 guarda un pool por host: se
+    conservan los de hasta ``pool_hosts`` hosts (los feeds suelen estar en
+    hosts distintos) con hasta ``max_concurrent_fetches`` conexiones cada
+    uno, una por hilo de descarga.
+    """
+    retry = CappedRetry(
+        total=int(config_manager.get('network.max_retries', 3)),
+        backoff_factor=float(config_manager.get('network.retry_backoff_seconds', 0.5)),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+        max_retry_after=float(config_manager.get('network.max_retry_after_seconds', 60))
+    )
+    return HTTPAdapter(
+        max_retries=retry,
+        pool_connections=int(config_manager.get('network.pool_hosts', 64)),
+        pool_maxsize=int(config_manager.get('network.max_concurrent_fetches', 8))
+    )
+
+def create_http_session(adapter: HTTPAdapter = None) -> HttpSession:
+    """Crea una sesión configurada según la sección ``network``
+
+    Timeout por defecto (``connect_timeout``, ``timeout``), negociación
+    gzip/brotli y el adaptador indicado (o uno nuevo) para http y https.
+    """
+    timeout = (float(config_manager.get('network.connect_timeout', 10)),
+               float(config_manager.get('network.timeout', 30)))
+    adapter = adapter or create_http_adapter()
+
+    session = HttpSession(timeout)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': config_manager.get('network.user_agent', 'PyPodcast/1.0.0'),
+        'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
+    })
+    return session
+
+_adapter: Optional[HTTPAdapter] = None
+_generation = 0
+_lock = threading.Lock()
+_local = threading.local()
+
+def get_http_session() -> HttpSession:
+    """Obtiene la sesión del hilo actual, compartida por todos los servicios
+
+    ``requests.Session`` no garantiza ser segura entre hilos (cookies y
+    estado de redirecciones), así que cada hilo tiene la suya. Todas montan
+    el mismo ``HTTPAdapter``, cuyo pool de conexiones de urllib3 sí lo es:
+    los hilos de actualización reutilizan las mismas conexiones (sin repetir
+    DNS, TCP ni TLS).
+    """
+    global _adapter
+    session = getattr(_local, 'session', None)
+    if session is not None and _local.generation == _generation:
+        return session
+
+    with _lock:
+        if _adapter is None:
+            _adapter = create_http_adapter()
+        _local.session = create_http_session(_adapter)
+        _local.generation = _generation
+        return _local.session
+
+def reset_http_session():
+    """Cierra el pool compartido; cada hilo crea otra sesión en su siguiente petición
+
+    Útil p. ej. tras cambiar la configuración de red.
+    """
+    global _adapter, _generation
+    with _lock:
+        adapter, _adapter = _adapter, None
+        _generation += 1
+    if adapter is not None:
+        adapter.close()
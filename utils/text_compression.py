@@ -0,0 +1,68 @@
+"""
+Compresión de textos largos (contenido, transcripciones y resúmenes)
+"""
+
+import sqlite3
+import zlib
+from typing import Optional
+from utils.config import config_manager
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Primer byte del blob: indica cómo está codificado el resto
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+# Por debajo de este tamaño no compensa comprimir
+MIN_COMPRESS_BYTES = 256
+
+def compress_text(text: Optional[str]) -> Optional[bytes]:
+    """Comprime un texto en un blob autodescriptivo (None se conserva)"""
+    if text is None:
+        return None
+
+    data = text.encode('utf-8')
+    if len(data) < MIN_COMPRESS_BYTES:
+        return bytes([CODEC_RAW]) + data
+
+    codec = config_manager.get('database.body_compression', 'zstd')
+    level = config_manager.get('database.body_compression_level', None)
+
+    if codec == 'zstd' and ZSTD_AVAILABLE:
+        compressor = zstandard.ZstdCompressor(level=level if level is not None else 6)
+        return bytes([CODEC_ZSTD]) + compressor.compress(data)
+
+    return bytes([CODEC_ZLIB]) + zlib.compress(data, level if level is not None else 6)
+
+def decompress_text(blob: Optional[bytes]) -> Optional[str]:
+    """Descomprime un blob creado con compress_text"""
+    if blob is None:
+        return None
+
+    # Valores de texto sin comprimir (bases de datos antiguas o escritos a mano)
+    if isinstance(blob, str):
+        return blob
+
+    codec, payload = blob[0], bytes(blob[1:])
+
+    if codec == CODEC_RAW:
+        data = payload
+    elif codec == CODEC_ZLIB:
+        data = zlib.decompress(payload)
+    elif codec == CODEC_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Texto comprimido con zstd pero el módulo zstandard no está instalado")
+        data = zstandard.ZstdDecompressor().decompress(payload)
+    else:
+        raise ValueError(f"Codificación de texto desconocida: {codec}")
+
+    return data.decode('utf-8')
+
+def register_sql_functions(conn: sqlite3.Connection):
+    """Registra pp_inflate() para que SQL (vistas, triggers, FTS) lea los textos comprimidos"""
+    conn.create_function('pp_inflate', 1, decompress_text, deterministic=True)
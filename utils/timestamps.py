@@ -0,0 +1,65 @@
+"""
+Conversión de fechas a segundos epoch (columnas INTEGER de la base de datos)
+"""
+
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+try:
+    from dateutil import parser as date_parser
+    DATEUTIL_AVAILABLE = True
+except ImportError:
+    DATEUTIL_AVAILABLE = False
+
+DateValue = Union[datetime, str, int, float, None]
+
+def parse_datetime(value: DateValue, assume_utc: bool = False) -> Optional[datetime]:
+    """Convierte un valor de fecha (datetime, texto o epoch) en datetime
+
+    Las fechas sin zona horaria se interpretan como hora local, o como UTC
+    con ``assume_utc`` (p. ej. los valores de ``CURRENT_TIMESTAMP``).
+    Retorna None si el valor está vacío o no se reconoce.
+    """
+    if value is None or value == '':
+        return None
+
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, tz=timezone.utc)
+    else:
+        text = str(value).strip()
+        try:
+            parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            if not DATEUTIL_AVAILABLE:
+                return None
+            try:
+                parsed = date_parser.parse(text)
+            except (ValueError, OverflowError):
+                return None
+
+    if parsed.tzinfo is None and assume_utc:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def to_epoch(value: DateValue, assume_utc: bool = False) -> Optional[int]:
+    """Convierte un valor de fecha en segundos epoch (None si no se reconoce)"""
+    parsed = parse_datetime(value, assume_utc)
+    if parsed is None:
+        return None
+    try:
+        return int(parsed.timestamp())
+    except (OverflowError, OSError, ValueError):
+        return None
+
+def format_datetime(value: DateValue) -> Optional[str]:
+    """Texto ISO de una fecha para las columnas de texto (sin adaptadores de sqlite3)"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        return value if isinstance(value, str) and value else None
+    return parsed.isoformat(sep=' ')
+
+def now_epoch() -> int:
+    """Segundos epoch actuales"""
+    return int(datetime.now(timezone.utc).timestamp())
@@ -0,0 +1,140 @@
+"""
+Papelera de archivos con borrado físico en segundo plano
+"""
+
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional
+from utils.config import config_manager
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class TrashReclaimer:
+    """Recupera en segundo plano el espacio de los archivos descartados
+
+    ``discard`` solo mueve los archivos a la papelera (un renombrado, sin
+    copiar datos) y un hilo los borra después en pasos pequeños con una
+    pausa entre ellos, de modo que eliminar gigas de audio no bloquea ni la
+    interfaz ni la base de datos. Lo que quede en la papelera al cerrar la
+    aplicación se borra en el siguiente arranque.
+    """
+
+    def __init__(self, trash_dir: Path = None):
+        self._trash_dir = Path(trash_dir) if trash_dir else None
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.files_reclaimed = 0
+        self.bytes_reclaimed = 0
+
+    @property
+    def trash_dir(self) -> Path:
+        """Directorio de la papelera (por defecto ``.trash`` dentro del de audio)"""
+        if self._trash_dir is None:
+            configured = config_manager.get('audio.trash_dir')
+            self._trash_dir = Path(configured) if configured else \
+                Path(config_manager.get('audio.output_dir', 'podcasts')) / '.trash'
+        return self._trash_dir
+
+    def start(self):
+        """Arranca el hilo de borrado (vacía lo pendiente de ejecuciones anteriores)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name="TrashReclaimer", daemon=True)
+            self._thread.start()
+        self._wake_event.set()
+
+    def stop(self, timeout: float = 5.0):
+        """Detiene el hilo de borrado; lo pendiente queda en la papelera"""
+        self._stop_event.set()
+        self._wake_event.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def discard(self, file_paths: Iterable[str]) -> int:
+        """Mueve archivos a la papelera para borrarlos en segundo plano
+
+        Los archivos inexistentes se ignoran. Si no se pueden mover (p. ej.
+        otro sistema de archivos) se borran directamente. Retorna el número
+        de archivos descartados.
+        """
+        self.trash_dir.mkdir(parents=True, exist_ok=True)
+        discarded = 0
+        for file_path in file_paths:
+            if not file_path:
+                continue
+            source = Path(file_path)
+            # Prefijo único: archivos de distintos directorios pueden llamarse igual
+            target = self.trash_dir / f"{uuid.uuid4().hex[:12]}_{source.name}"
+            try:
+                os.replace(source, target)
+                discarded += 1
+            except FileNotFoundError:
+                continue
+            except OSError:
+                try:
+                    source.unlink()
+                    discarded += 1
+                except OSError as e:
+                    logger.warning(f"No se pudo descartar {source}: {e}")
+
+        if discarded:
+            self.start()
+            self._wake_event.set()
+        return discarded
+
+    def _run(self):
+        """Bucle del hilo de borrado"""
+        while not self._stop_event.is_set():
+            self._wake_event.wait()
+            self._wake_event.clear()
+            if self._stop_event.is_set():
+                return
+            try:
+                self.reclaim()
+            except Exception as e:
+                logger.error(f"Error vaciando la papelera: {e}")
+
+    def reclaim(self) -> int:
+        """Borra los archivos de la papelera por pasos; retorna cuántos borró"""
+        files_per_step = int(config_manager.get('audio.trash_files_per_step', 50))
+        step_sleep = config_manager.get('audio.trash_step_sleep_ms', 20) / 1000
+
+        try:
+            entries = list(os.scandir(self.trash_dir))
+        except FileNotFoundError:
+            return 0
+
+        reclaimed = 0
+        for index, entry in enumerate(entries):
+            if self._stop_event.is_set():
+                break
+            if index and index % files_per_step == 0 and step_sleep:
+                time.sleep(step_sleep)
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+            except OSError as e:
+                logger.warning(f"No se pudo borrar {entry.path}: {e}")
+                continue
+            reclaimed += 1
+            self.files_reclaimed += 1
+            self.bytes_reclaimed += size
+
+        if reclaimed:
+            logger.info(f"Papelera: {reclaimed} archivos borrados")
+        return reclaimed
+
+# Instancia global de la papelera
+trash_reclaimer = TrashReclaimer()
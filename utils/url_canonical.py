@@ -0,0 +1,94 @@
+"""
+Normalización de URLs para detectar contenido duplicado entre feeds
+"""
+
+import hashlib
+import re
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Parámetros de seguimiento que no cambian el contenido enlazado
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_hsenc', '_hsmi', 'si'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+YOUTUBE_HOSTS = {'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com'}
+YOUTUBE_SHORT_HOSTS = {'youtu.be', 'www.youtu.be'}
+YOUTUBE_PATH_PREFIXES = ('/shorts/', '/embed/', '/live/', '/v/')
+YOUTUBE_VIDEO_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+
+def _youtube_video_id(host: str, path: str, query: str) -> Optional[str]:
+    """Extrae el id de vídeo de las distintas formas de URL de YouTube"""
+    video_id = None
+    if host in YOUTUBE_SHORT_HOSTS:
+        video_id = path.strip('/').split('/')[0]
+    elif host in YOUTUBE_HOSTS:
+        if path.rstrip('/') == '/watch':
+            video_id = dict(parse_qsl(query)).get('v')
+        else:
+            for prefix in YOUTUBE_PATH_PREFIXES:
+                if path.startswith(prefix):
+                    video_id = path[len(prefix):].split('/')[0]
+                    break
+
+    if video_id and YOUTUBE_VIDEO_ID.match(video_id):
+        return video_id
+    return None
+
+def canonicalize_url(url: str) -> str:
+    """Obtiene la forma canónica de una URL
+
+    - Los vídeos de YouTube (``youtu.be``, ``shorts``, ``embed``...) quedan
+      como ``https://www.youtube.com/watch?v=<id>``.
+    - Esquema y host en minúsculas y sin el puerto por defecto.
+    - Sin fragmento, sin parámetros de seguimiento (``utm_*``, ``fbclid``...)
+      y con el resto de parámetros ordenados.
+    - Sin barra final (salvo la raíz).
+
+    Las URLs que no se pueden analizar se retornan sin cambios (sin espacios).
+    """
+    url = (url or '').strip()
+    try:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = (parts.hostname or '').lower()
+        port = parts.port
+    except ValueError:
+        return url
+
+    if not scheme or not host:
+        return url
+
+    video_id = _youtube_video_id(host, parts.path, parts.query)
+    if video_id:
+        return f"https://www.youtube.com/watch?v={video_id}"
+
+    netloc = host
+    if parts.username or parts.password:
+        credentials = parts.username or ''
+        if parts.password:
+            credentials += f":{parts.password}"
+        netloc = f"{credentials}@{netloc}"
+    if port and port != DEFAULT_PORTS.get(scheme):
+        netloc += f":{port}"
+
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+
+    params = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query = urlencode(sorted(params))
+
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+def url_hash(url: str) -> int:
+    """Hash de 64 bits (entero con signo, apto para SQLite) de la URL canónica"""
+    digest = hashlib.blake2b(canonicalize_url(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)